@@ -0,0 +1,80 @@
+"""
+Mede o atraso do event loop enquanto paginas de tamanhos variados têm os
+formularios extraidos: no proprio loop, num ThreadPoolExecutor e num
+ProcessPoolExecutor.
+
+Uso: python -m benchmarks.bench_event_loop [--small 40] [--large 4] [--size 1] [--parser lxml]
+"""
+import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import time
+
+import httpx
+from loguru import logger
+
+from benchmarks.bench_parsers import build_page
+from selenium_form_killer import Page, SeleniumKiller
+
+TICK = 0.001
+
+
+async def ticker(lags: list[float], stop: asyncio.Event) -> None:
+    # Deveria acordar a cada 1 ms; o que passar disso é o tempo que o loop ficou preso.
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+def responses(small: int, large: int, size: float) -> list[httpx.Response]:
+    request = httpx.Request("GET", "https://foo.bar/")
+    pages = [build_page(0.05, seed=i) for i in range(small)]
+    pages += [build_page(size, seed=i) for i in range(large)]
+    return [httpx.Response(200, html=html, request=request) for html in pages]
+
+
+async def run(label: str, executor, pages: list[httpx.Response], parser: str) -> None:
+    killer = SeleniumKiller(executor=executor, parser=parser)
+    lags: list[float] = []
+    stop = asyncio.Event()
+    tick = asyncio.ensure_future(ticker(lags, stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    # Page novo a cada rodada para nada vir do cache de forms.
+    await asyncio.gather(*(Page(killer, response).aforms() for response in pages))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    await killer.close()
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0
+    print(
+        f"{label:>8}: total {elapsed * 1000:7.0f} ms | atraso max {lags[-1] * 1000:7.1f} ms"
+        f" | p99 {p99 * 1000:6.1f} ms"
+    )
+
+
+async def main(small: int, large: int, size: float, parser: str) -> None:
+    pages = responses(small, large, size)
+    print(f"{small} paginas de 50 KB e {large} de {size} MB, parser {parser}")
+    await run("inline", None, pages, parser)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        await run("thread", executor, pages, parser)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        # Sobe os processos antes de medir.
+        await asyncio.get_running_loop().run_in_executor(executor, time.sleep, 0)
+        await run("process", executor, pages, parser)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small", type=int, default=40)
+    parser.add_argument("--large", type=int, default=4)
+    parser.add_argument(
+        "--size", type=float, default=1.0, help="tamanho das paginas grandes em MB"
+    )
+    parser.add_argument("--parser", default="lxml")
+    args = parser.parse_args()
+    logger.remove()
+    asyncio.run(main(args.small, args.large, args.size, args.parser))
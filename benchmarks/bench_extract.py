@@ -0,0 +1,77 @@
+"""
+Compara a extração em uma passada (walk_forms) com as buscas por form (scan_forms),
+que fazem uma busca de campos e uma de captcha em cada form. As duas extraem os
+mesmos campos; a coluna "usa" mostra qual o extract_forms escolhe para o backend.
+
+Uso: python -m benchmarks.bench_extract [--forms 300] [--repeat 5]
+"""
+import argparse
+import time
+
+from loguru import logger
+
+from selenium_form_killer.parsers.backends import PARSERS, get_backend
+from selenium_form_killer.parsers.walker import scan_forms, walk_forms
+
+
+def build_page(forms: int) -> str:
+    parts = ["<html><body>"]
+    for index in range(forms):
+        parts.append(f'<div class="card"><h2>Form {index}</h2><p>{"texto " * 30}</p>')
+        parts.append(f'<form id="f{index}" action="/enviar/{index}" method="post">')
+        parts += [
+            f'<div class="linha"><label>c{i}</label><input name="c{i}" value="{i}"></div>'
+            for i in range(10)
+        ]
+        parts.append('<select name="uf"><option>SP</option><option selected>RJ</option></select>')
+        parts.append('<textarea name="obs">texto</textarea>')
+        parts.append(f'<div class="g-recaptcha" data-sitekey="key-{index}"></div>')
+        parts.append('<button name="ok">Enviar</button></form></div>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def multi_scan(backend, document) -> int:
+    return sum(len(form.inputs) for form in scan_forms(backend, document))
+
+
+def single_pass(backend, document) -> int:
+    return sum(len(form.inputs) for form in walk_forms(backend, document))
+
+
+def best(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench(forms: int, repeat: int) -> None:
+    html = build_page(forms)
+    logger.remove()  # mede só a extração
+    print(f"pagina: {len(html) / 1024:.0f} KB, {forms} forms, parse fora da medição")
+    for name in PARSERS:
+        try:
+            backend = get_backend(name)
+            document = backend.parse(html)
+        except Exception as error:
+            print(f"{name:>12}: indisponivel ({error.__class__.__name__})")
+            continue
+        assert multi_scan(backend, document) == single_pass(backend, document)
+        old = best(lambda: multi_scan(backend, document), repeat)
+        new = best(lambda: single_pass(backend, document), repeat)
+        used = "buscas por form" if backend.per_form_scan else "uma passada"
+        print(
+            f"{name:>12}: varias buscas {old * 1000:8.1f} ms"
+            f" | uma passada {new * 1000:8.1f} ms | {old / new:4.1f}x | usa: {used}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--forms", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    bench(args.forms, args.repeat)
@@ -0,0 +1,78 @@
+"""
+Mede memoria e tempo de construção de um Form com muitos inputs.
+
+Compara o FormInput com __slots__ com uma classe equivalente com __dict__.
+
+Uso: python -m benchmarks.bench_forms [--inputs 1000] [--repeat 200]
+"""
+import argparse
+import time
+import tracemalloc
+
+from selenium_form_killer.forms import Form, FormInput
+
+
+class DictFormInput:
+    # Como o FormInput era antes: atributos num __dict__ e strings sem interning.
+    def __init__(self, name: str, value: str, type: str = "text") -> None:
+        self.type = type
+        self.name = name
+        self.value = value
+
+
+def raw_inputs(inputs: int) -> list[tuple[str, str, str]]:
+    # Strings novas a cada chamada, como sairiam do parser.
+    return [
+        ("".join(["campo", str(i)]), f"{i:08x}", "".join(["hid", "den"]))
+        for i in range(inputs)
+    ]
+
+
+def build(input_class, raw: list[tuple[str, str, str]]) -> Form:
+    return Form(
+        killer=None,
+        inputs=[
+            input_class(name=name, value=value, type=type) for name, value, type in raw
+        ],
+        action="/enviar",
+        method="post",
+    )
+
+
+def memory(input_class, inputs: int, forms: int = 10) -> float:
+    # Varias copias do mesmo form, como varias paginas do mesmo site. As strings do
+    # parser são descartadas; só fica o que os objetos seguram.
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    built = [build(input_class, raw_inputs(inputs)) for _ in range(forms)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del built
+    return size / forms
+
+
+def construction(input_class, inputs: int, repeat: int) -> float:
+    raw = raw_inputs(inputs)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build(input_class, raw)
+    return (time.perf_counter() - start) / repeat
+
+
+def bench(inputs: int, repeat: int) -> None:
+    print(f"form com {inputs} inputs")
+    for label, input_class in (("__slots__", FormInput), ("__dict__", DictFormInput)):
+        size = memory(input_class, inputs)
+        elapsed = construction(input_class, inputs, repeat)
+        print(
+            f"{label:10} {size / 1024:8.1f} KiB/form | {elapsed * 1000:6.3f} ms/form"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--inputs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    bench(args.inputs, args.repeat)
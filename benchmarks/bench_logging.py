@@ -0,0 +1,75 @@
+"""
+Mede o custo dos logs por input na extração de um form grande.
+
+Compara o caminho antigo (um `logger.info` com f-string por input, sempre) com o
+atual (um `logger.trace` por input, só se algum sink aceita TRACE), sem sinks, com
+um sink DEBUG (o nivel dos sinks do killer) e com um sink TRACE. Os sinks escrevem
+na memoria, para não medir o disco.
+
+Uso: python -m benchmarks.bench_logging [--inputs 1000] [--repeat 20]
+"""
+import argparse
+import io
+import time
+from typing import Callable, Optional
+
+from loguru import logger
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.forms import FormInput
+from selenium_form_killer.parsers.backends import get_backend
+from selenium_form_killer.parsers.walker import scan_form
+
+PARSER = "html.parser"
+SINKS = (("sem sinks", None), ("sink DEBUG", "DEBUG"), ("sink TRACE", "TRACE"))
+
+
+def build_form(inputs: int) -> str:
+    fields = "".join(
+        f'<input type="hidden" name="campo{i}" value="{i:08x}">' for i in range(inputs)
+    )
+    return f'<html><body><form id="grande" action="/enviar" method="post">{fields}</form></body></html>'
+
+
+def old_extract_inputs(killer: SeleniumKiller, form, parser: str) -> list[FormInput]:
+    # Como era antes: a mesma extração, com um log formatado por input.
+    streamed = scan_form(get_backend(parser), form)
+    inputs = [FormInput(**form_input) for form_input in streamed.inputs]
+    for form_input in inputs:
+        killer.logger.info(f"Extracting inputs: {form_input}")
+    return inputs
+
+
+def measure(extract: Callable[[], object], repeat: int) -> float:
+    extract()  # aquecimento: caches do parser, handlers do loguru, ...
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract()
+    return (time.perf_counter() - start) / repeat
+
+
+def use_sink(level: Optional[str]) -> None:
+    logger.remove()
+    if level is not None:
+        logger.add(io.StringIO(), level=level, format="{message}")
+
+
+def bench(inputs: int, repeat: int) -> None:
+    killer = SeleniumKiller()
+    form = killer.soup(build_form(inputs), parser=PARSER).find("form")
+    print(f"form com {inputs} inputs, parse fora da medição")
+    print(f"{'':12} {'antes (info)':>16} {'agora (trace)':>16}")
+    for name, level in SINKS:
+        use_sink(level)
+        old = measure(lambda: old_extract_inputs(killer, form, PARSER), repeat)
+        new = measure(lambda: killer.extract_inputs(form, parser=PARSER), repeat)
+        print(f"{name:12} {old * 1000:13.2f} ms {new * 1000:13.2f} ms")
+    logger.remove()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--inputs", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    bench(args.inputs, args.repeat)
@@ -0,0 +1,79 @@
+"""
+Compara os backends de parser na extração de formularios de paginas grandes.
+
+Uso: python -m benchmarks.bench_parsers [--repeat 5] [--size 2]
+"""
+import argparse
+import random
+import time
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.parsers.backends import PARSERS, get_backend
+
+
+def build_page(megabytes: float = 2.0, seed: int = 42) -> str:
+    """Gera uma pagina parecida com um portal real: menus, tabelas, scripts e varios forms."""
+    rng = random.Random(seed)
+    parts = [
+        "<!DOCTYPE html><html><head><title>Portal</title>",
+        "<script>" + "var data = {};" * 2000 + "</script>",
+        "<style>" + ".c{color:red}" * 2000 + "</style></head><body>",
+    ]
+    size = sum(len(part) for part in parts)
+    target = int(megabytes * 1024 * 1024)
+    block = 0
+    while size < target:
+        block += 1
+        chunk = [f'<div class="row" id="row-{block}"><ul>']
+        chunk += [f'<li><a href="/item/{block}/{i}">Item {i}</a></li>' for i in range(20)]
+        chunk.append("</ul><table>")
+        chunk += [
+            f"<tr><td>{rng.random()}</td><td><span>{rng.randint(0, 10**6)}</span></td></tr>"
+            for _ in range(20)
+        ]
+        chunk.append("</table>")
+        if block % 10 == 0:
+            chunk.append(f'<form id="form-{block}" action="/submit/{block}" method="post">')
+            chunk += [
+                f'<input type="hidden" name="h{i}" value="{rng.getrandbits(64):x}">'
+                for i in range(30)
+            ]
+            chunk.append('<input type="text" name="q"><textarea name="obs"></textarea>')
+            chunk.append(f'<div class="g-recaptcha" data-sitekey="key-{block}"></div>')
+            chunk.append("</form>")
+        chunk.append("</div>")
+        html = "".join(chunk)
+        parts.append(html)
+        size += len(html)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def bench(html: str, repeat: int) -> None:
+    killer = SeleniumKiller()
+    killer.logger.remove()  # mede só o parse, sem o custo dos logs
+    print(f"pagina: {len(html) / 1024 / 1024:.2f} MB")
+    for name in PARSERS:
+        try:
+            get_backend(name).parse("<p></p>")
+        except Exception as error:
+            print(f"{name:>12}: indisponivel ({error.__class__.__name__})")
+            continue
+        timings = []
+        for _ in range(repeat):
+            killer._html_documents.clear()
+            start = time.perf_counter()
+            forms = killer.extract_forms(html, parser=name)
+            timings.append(time.perf_counter() - start)
+        print(
+            f"{name:>12}: melhor {min(timings) * 1000:8.1f} ms"
+            f" | media {sum(timings) / len(timings) * 1000:8.1f} ms | forms {len(forms)}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size", type=float, default=2.0, help="tamanho da pagina em MB")
+    args = parser.parse_args()
+    bench(build_page(args.size), args.repeat)
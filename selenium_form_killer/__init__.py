@@ -1,3 +1,4 @@
 from .killer import SeleniumKiller
+from .page import Page
 
-__all__ = ["SeleniumKiller"]
+__all__ = ["SeleniumKiller", "Page"]
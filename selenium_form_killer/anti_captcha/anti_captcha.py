@@ -1,11 +1,71 @@
 import asyncio
+import random
+import time
+from typing import Any, Iterable, Optional
 
 import httpx
 
+API_URL = "https://api.anti-captcha.com"
+HEADERS = {
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+}
+# Uma imagem costuma levar de 5 a 10 segundos para ser resolvida.
+INITIAL_DELAY = 5.0
+POLL_INTERVAL = 1.0
+MAX_INTERVAL = 5.0
+BACKOFF = 1.5
+JITTER = 0.2
+
+
+class AntiCaptchaError(Exception):
+    """Erro retornado pela API do anti-captcha (errorId diferente de 0)."""
+
+
+def task_id_from(response: httpx.Response) -> int:
+    data = response.json()
+    if data.get("errorId"):
+        raise AntiCaptchaError(data.get("errorDescription") or data.get("errorCode"))
+    return data["taskId"]
+
 
 class AntiCaptcha:
-    def __init__(self, api_key: str):
+    """
+    Cliente do anti-captcha.com.
+
+    O httpx.AsyncClient é criado no primeiro uso e reaproveitado entre as chamadas,
+    então as conexões ficam abertas. Use com `async with` ou chame `aclose()` no fim.
+
+    O resultado só é consultado depois de `initial_delay` segundos, o tempo comum de
+    uma resolução. Depois disso o intervalo entre as consultas cresce de
+    `poll_interval` até `max_interval`.
+
+    Example:
+        async with AntiCaptcha(api_key) as anti_captcha:
+            textos = await anti_captcha.solve_many(imagens)
+    """
+
+    api_url = API_URL
+    soft_id = 0
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 30,
+        client: Optional[httpx.AsyncClient] = None,
+        initial_delay: float = INITIAL_DELAY,
+        poll_interval: float = POLL_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+    ):
         self.__api_key = api_key
+        self.timeout = timeout
+        self.initial_delay = initial_delay
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self._poller: Optional[TaskPoller] = None
+        self._client = client
+        # Um client recebido de fora é fechado por quem criou.
+        self._owns_client = client is None
 
     @property
     def api_key(self):
@@ -15,9 +75,31 @@ class AntiCaptcha:
     def api_key(self, api_key):
         self.__api_key = api_key
 
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url, headers=HEADERS, timeout=self.timeout
+            )
+            self._owns_client = True
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AntiCaptcha":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
     async def create_task(
         self,
-        client: httpx.AsyncClient,
+        client: Optional[httpx.AsyncClient] = None,
         *,
         img_base_64: str,
         phase: bool = False,
@@ -27,48 +109,68 @@ class AntiCaptcha:
         min_length: int = 0,
         max_length: int = 0,
     ) -> httpx.Response:
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
+        task = {
+            "type": "ImageToTextTask",
+            "body": img_base_64,
+            "phrase": phase,
+            "case": case,
+            "numeric": numeric,
+            "math": math,
+            "minLength": min_length,
+            "maxLength": max_length,
         }
+        return await self.create(task, client)
 
+    async def create(
+        self, task: dict[str, Any], client: Optional[httpx.AsyncClient] = None
+    ) -> httpx.Response:
+        """Cria uma tarefa de qualquer tipo da API (o dict `task` do createTask)."""
         json_data = {
             "clientKey": self.__api_key,
-            "task": {
-                "type": "ImageToTextTask",
-                "body": img_base_64,
-                "phrase": phase,
-                "case": case,
-                "numeric": numeric,
-                "math": math,
-                "minLength": min_length,
-                "maxLength": max_length,
-            },
-            "softId": 0,
+            "task": task,
+            "softId": self.soft_id,
         }
-
-        return await client.post(
-            "https://api.anti-captcha.com/createTask",
+        return await (client or self.client).post(
+            f"{self.api_url}/createTask",
             json=json_data,
-            headers=headers,
+            headers=HEADERS,
         )
 
-    async def task_result(self, client: httpx.AsyncClient, task_id: str) -> dict:
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-        }
-
+    async def task_result(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        task_id: Optional[str] = None,
+    ) -> httpx.Response:
         json_data = {
             "clientKey": self.__api_key,
             "taskId": task_id,
         }
-        return await client.post(
-            "https://api.anti-captcha.com/getTaskResult",
+        return await (client or self.client).post(
+            f"{self.api_url}/getTaskResult",
             json=json_data,
-            headers=headers,
+            headers=HEADERS,
         )
 
+    def solution(self, solution: dict[str, Any]) -> Any:
+        """O que o solver retorna da `solution` de uma tarefa pronta: o texto da imagem."""
+        return solution["text"]
+
+    async def solve_task(self, task: dict[str, Any], ready_wait: float = 30) -> Any:
+        """Cria a tarefa e espera a solução pelo poller compartilhado."""
+        response = await self.create(task)
+        return await self.poller.wait(task_id_from(response), ready_wait)
+
+    @property
+    def poller(self) -> "TaskPoller":
+        if self._poller is None:
+            self._poller = TaskPoller(
+                self,
+                initial_delay=self.initial_delay,
+                poll_interval=self.poll_interval,
+                max_interval=self.max_interval,
+            )
+        return self._poller
+
     async def solver(
         self,
         img_base_64: str,
@@ -80,36 +182,185 @@ class AntiCaptcha:
         max_length: int = 0,
         ready_wait: float = 30,
     ):
-        async with httpx.AsyncClient(timeout=30) as client:
-            task = await self.create_task(
-                client=client,
-                img_base_64=img_base_64,
-                phase=phase,
-                case=case,
-                numeric=numeric,
-                math=math,
-                min_length=min_length,
-                max_length=max_length,
-            )
-            result_task = task.json()["taskId"]
-            time_to_wait = ready_wait * 2
-            for _ in range(time_to_wait):
-                result = await self.task_result(client=client, task_id=result_task)
-                if result.json()["status"] == "ready":
-                    return result.json()["solution"]["text"]
-                else:
-                    await asyncio.sleep(0.5)
-            raise TimeoutError("O captcha demorou mais tempo que o esperado.")
+        task = await self.create_task(
+            img_base_64=img_base_64,
+            phase=phase,
+            case=case,
+            numeric=numeric,
+            math=math,
+            min_length=min_length,
+            max_length=max_length,
+        )
+        return await self.poller.wait(task_id_from(task), ready_wait)
+
+    async def solve_many(
+        self,
+        images: Iterable[str],
+        ready_wait: float = 30,
+        return_exceptions: bool = False,
+        **options: Any,
+    ) -> list[Any]:
+        """
+        Resolve varias imagens de uma vez.
+
+        As tarefas são criadas em paralelo e consultadas juntas pelo mesmo poller,
+        todas pelo mesmo client. O resultado vem na mesma ordem das imagens.
+
+        Keyword Arguments:
+            ready_wait -- Segundos de espera por tarefa (default: {30})
+            return_exceptions -- Coloca o erro no lugar do texto em vez de levantar
+            options -- Repassados para o create_task (phase, case, numeric, ...)
+
+        Returns:
+            list: Texto de cada captcha, ou a exceção com return_exceptions=True.
+        """
+
+        async def solve(image: str) -> str:
+            task = await self.create_task(img_base_64=image, **options)
+            return await self.poller.wait(task_id_from(task), ready_wait)
+
+        return await asyncio.gather(
+            *(solve(image) for image in images), return_exceptions=return_exceptions
+        )
 
     async def get_balance(self) -> float:
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(
-                "https://api.anti-captcha.com/getBalance",
-                json={"clientKey": self.__api_key},
+        response = await self.client.post(
+            f"{self.api_url}/getBalance",
+            json={"clientKey": self.__api_key},
+        )
+        try:
+            return float(response.json()["balance"])
+        except KeyError:
+            KeyError(
+                "O AntiCaptcha retornou um valor inválido ou a API KEY esta errada."
             )
-            try:
-                return float(response.json()["balance"])
-            except KeyError:
-                KeyError(
-                    "O AntiCaptcha retornou um valor inválido ou a API KEY esta errada."
-                )
+
+
+class TaskPoller:
+    """
+    Consulta o resultado de todas as tarefas pendentes num unico loop.
+
+    Cada tarefa tem o seu proximo horario de consulta e o seu prazo. O loop dorme
+    até a proxima tarefa vencer e consulta juntas todas as que venceram, então
+    muitas tarefas em paralelo não viram muitos loops de polling.
+    """
+
+    def __init__(
+        self,
+        anti_captcha: AntiCaptcha,
+        initial_delay: float = INITIAL_DELAY,
+        poll_interval: float = POLL_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+    ) -> None:
+        self.anti_captcha = anti_captcha
+        self.initial_delay = initial_delay
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        # task_id -> [future, proxima consulta, intervalo atual, prazo]
+        self._pending: dict[Any, list[Any]] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.requests = 0
+
+    async def wait(self, task_id: Any, timeout: float = 30) -> str:
+        """Espera a tarefa ficar pronta e retorna o texto. TimeoutError depois do prazo."""
+        now = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        deadline = now + timeout
+        self._pending[task_id] = [
+            future,
+            min(now + self.initial_delay, deadline),
+            self.poll_interval,
+            deadline,
+        ]
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        else:
+            self._wakeup.set()
+        try:
+            return await future
+        finally:
+            self._pending.pop(task_id, None)
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for future, *_ in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    def _jitter(self, interval: float) -> float:
+        return interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+    async def _run(self) -> None:
+        while self._pending:
+            now = time.monotonic()
+            due = [
+                task_id
+                for task_id, (_, next_check, _, _) in self._pending.items()
+                if next_check <= now
+            ]
+            if not due:
+                next_check = min(entry[1] for entry in self._pending.values())
+                self._wakeup.clear()
+                try:
+                    # Acorda antes se outra tarefa entrar na fila.
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=max(next_check - now, 0)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self.requests += len(due)
+            responses = await asyncio.gather(
+                *(self.anti_captcha.task_result(task_id=task_id) for task_id in due),
+                return_exceptions=True,
+            )
+            now = time.monotonic()
+            for task_id, response in zip(due, responses):
+                try:
+                    self._update(task_id, response, now)
+                except Exception as error:
+                    # Resposta inesperada (sem json, por exemplo) vai para quem espera.
+                    if task_id in self._pending:
+                        self._finish(task_id, exception=error)
+
+    def _update(self, task_id: Any, response: Any, now: float) -> None:
+        entry = self._pending.get(task_id)
+        if entry is None:
+            return
+        future, _, interval, deadline = entry
+        if future.done():
+            # Quem esperava desistiu (cancelado).
+            self._pending.pop(task_id)
+            return
+        if isinstance(response, BaseException):
+            self._finish(task_id, exception=response)
+            return
+        data = response.json()
+        if data.get("errorId"):
+            error = data.get("errorDescription") or data.get("errorCode")
+            self._finish(task_id, exception=AntiCaptchaError(error))
+        elif data.get("status") == "ready":
+            self._finish(task_id, result=self.anti_captcha.solution(data["solution"]))
+        elif deadline <= now:
+            error = TimeoutError("O captcha demorou mais tempo que o esperado.")
+            self._finish(task_id, exception=error)
+        else:
+            # Não passa do prazo: a ultima consulta acontece no limite.
+            entry[1] = min(now + self._jitter(interval), deadline)
+            entry[2] = min(interval * BACKOFF, self.max_interval)
+
+    def _finish(
+        self,
+        task_id: Any,
+        result: Optional[str] = None,
+        exception: Optional[BaseException] = None,
+    ) -> None:
+        future = self._pending.pop(task_id)[0]
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import TYPE_CHECKING, AsyncGenerator, Optional
+
+import httpx
+from loguru import logger
+
+if TYPE_CHECKING:
+    from selenium_form_killer.transport.pool import ConnectionPool
+
+# Segundos antes de expirar em que o token começa a ser renovado em segundo plano.
+REFRESH_MARGIN = 30.0
+KEY_TOKEN = "access_token"
+
+
+def credentials_key(url: str, payload: dict, key_token: str) -> str:
+    """Chave do token: url e hash das credenciais, sem guardar a senha na chave."""
+    credentials = json.dumps(payload, sort_keys=True, default=str)
+    digest = hashlib.blake2b(
+        f"{key_token}\0{credentials}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return f"{url}#{digest}"
+
+
+class Token:
+    __slots__ = ("value", "expires_at", "refresh_at")
+
+    def __init__(
+        self,
+        value: str,
+        expires_at: Optional[float],
+        refresh_at: Optional[float] = None,
+    ) -> None:
+        self.value = value
+        self.expires_at = expires_at
+        self.refresh_at = refresh_at if refresh_at is not None else expires_at
+
+    def remaining(self, now: float) -> float:
+        return float("inf") if self.expires_at is None else self.expires_at - now
+
+
+class TokenCache:
+    """
+    Tokens de login compartilhados por (url, hash das credenciais).
+
+    A validade vem do `expires_in` da resposta; sem ele o token vale até o servidor
+    responder 401. Faltando `refresh_margin` segundos para expirar, o token atual
+    continua sendo usado e um novo login começa em segundo plano. Para tokens que
+    vivem menos que 2 * `refresh_margin`, a renovação começa na metade da validade.
+    Logins da mesma chave ao mesmo tempo viram um só: 200 workers começando juntos
+    fazem 1 login. Os logins em andamento são separados por event loop, então o
+    cache pode ser usado por varios `asyncio.run` no mesmo processo.
+
+    Keyword Arguments:
+        refresh_margin -- Segundos antes de expirar para renovar (default: {30})
+
+    Example:
+        tokens = TokenCache()
+        killers = await asyncio.gather(
+            *(SeleniumKiller.afrom_auth_data(url, payload, token_cache=tokens) for _ in range(200))
+        )
+    """
+
+    def __init__(self, refresh_margin: float = REFRESH_MARGIN) -> None:
+        self.refresh_margin = refresh_margin
+        self.logins = 0
+        self._tokens: dict[str, Token] = {}
+        self._inflight: dict[tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+
+    async def token(
+        self,
+        url: str,
+        payload: dict,
+        key_token: str = KEY_TOKEN,
+        pool: Optional[ConnectionPool] = None,
+    ) -> str:
+        """Retorna o token da chave, fazendo login só se não houver um valido."""
+        key = credentials_key(url, payload, key_token)
+        token = self._tokens.get(key)
+        if token is not None:
+            now = time.monotonic()
+            if token.remaining(now) > 0:
+                if token.refresh_at is not None and now >= token.refresh_at:
+                    self._login(key, url, payload, key_token, pool)
+                return token.value
+        return await asyncio.shield(self._login(key, url, payload, key_token, pool))
+
+    async def refresh(
+        self,
+        url: str,
+        payload: dict,
+        key_token: str = KEY_TOKEN,
+        pool: Optional[ConnectionPool] = None,
+        stale: Optional[str] = None,
+    ) -> str:
+        """
+        Descarta o token `stale` (recusado pelo servidor) e faz login de novo.
+
+        Se outro worker já trocou o token, o novo é retornado sem outro login.
+        """
+        key = credentials_key(url, payload, key_token)
+        token = self._tokens.get(key)
+        if token is not None and token.value == stale:
+            del self._tokens[key]
+        return await self.token(url, payload, key_token, pool)
+
+    def invalidate(self, url: str, payload: dict, key_token: str = KEY_TOKEN) -> None:
+        self._tokens.pop(credentials_key(url, payload, key_token), None)
+
+    def _login(
+        self,
+        key: str,
+        url: str,
+        payload: dict,
+        key_token: str,
+        pool: Optional[ConnectionPool],
+    ) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get((loop, key))
+        if task is None:
+            self._drop_closed_loops()
+            task = loop.create_task(self._fetch(key, url, payload, key_token, pool))
+            task.add_done_callback(lambda task: self._done((loop, key), task))
+            self._inflight[(loop, key)] = task
+        return task
+
+    def _drop_closed_loops(self) -> None:
+        # Tasks de um loop já fechado nunca terminam; sem isso ficariam aqui para sempre.
+        for inflight in [inflight for inflight in self._inflight if inflight[0].is_closed()]:
+            del self._inflight[inflight]
+
+    def _done(
+        self, inflight: tuple[asyncio.AbstractEventLoop, str], task: asyncio.Task
+    ) -> None:
+        key = inflight[1]
+        if self._inflight.get(inflight) is task:
+            del self._inflight[inflight]
+        # Lê a exceção para o asyncio não reclamar dos refresh sem ninguém esperando.
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Login failed for {}: {!r}", key, task.exception())
+
+    async def _fetch(
+        self,
+        key: str,
+        url: str,
+        payload: dict,
+        key_token: str,
+        pool: Optional[ConnectionPool],
+    ) -> str:
+        # Cliente separado para não sujar os cookies do killer; com pool as conexões
+        # são as mesmas dos killers.
+        transport = pool.transport() if pool is not None else None
+        self.logins += 1
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.post(url, data=payload)
+        response.raise_for_status()
+        data = response.json()
+        expires_in = data.get("expires_in")
+        expires_at = refresh_at = None
+        if expires_in is not None:
+            lifetime = float(expires_in)
+            expires_at = time.monotonic() + lifetime
+            # Com a margem maior que a validade, todo token já nasceria vencido e
+            # cada request dispararia outro login.
+            refresh_at = expires_at - min(self.refresh_margin, lifetime / 2)
+        self._tokens[key] = Token(data[key_token], expires_at, refresh_at)
+        return data[key_token]
+
+
+# Cache usado quando o afrom_auth_data não recebe um.
+TOKEN_CACHE = TokenCache()
+
+
+class TokenAuth(httpx.Auth):
+    """
+    Coloca o token atual do TokenCache em cada request da sessão.
+
+    Assim os killers passam a usar o token renovado sem serem recriados. Se o
+    servidor responder 401, o token é trocado e o request é repetido uma vez.
+    """
+
+    def __init__(
+        self,
+        cache: TokenCache,
+        url: str,
+        payload: dict,
+        key_token: str = KEY_TOKEN,
+        pool: Optional[ConnectionPool] = None,
+    ) -> None:
+        self.cache = cache
+        self.url = url
+        self.payload = payload
+        self.key_token = key_token
+        self.pool = pool
+
+    async def token(self) -> str:
+        return await self.cache.token(self.url, self.payload, self.key_token, self.pool)
+
+    async def async_auth_flow(
+        self, request: httpx.Request
+    ) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        token = await self.token()
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401:
+            token = await self.cache.refresh(
+                self.url, self.payload, self.key_token, self.pool, stale=token
+            )
+            request.headers["Authorization"] = f"Bearer {token}"
+            yield request
+
+    def sync_auth_flow(self, request: httpx.Request):
+        raise RuntimeError("TokenAuth só funciona com o httpx.AsyncClient")
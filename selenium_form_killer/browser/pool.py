@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable, Optional
+from urllib.parse import urlsplit
+
+# O playwright é pesado para importar e só é necessario no render.
+if TYPE_CHECKING:
+    from playwright.async_api import (
+        Browser,
+        BrowserContext,
+        Page as BrowserPage,
+        Playwright,
+    )
+
+LAUNCH_OPTIONS = {
+    "args": ["--disable-web-security"],
+    "ignore_default_args": [
+        "--disable-extensions",
+        "--disable-default-apps",
+        "--disable-component-extensions-with-background-pages",
+    ],
+}
+# Dados por origem que continuam no contexto depois que a pagina fecha; o
+# sessionStorage é da aba e morre com ela.
+CLEAR_STORAGE_TYPES = (
+    "local_storage,indexeddb,websql,cache_storage,service_workers,file_systems"
+)
+CONTEXT_OPTIONS = {
+    "bypass_csp": True,
+    "java_script_enabled": True,
+    "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/105.0.5195.100 Mobile/15E148 Safari/604.1",
+    "accept_downloads": True,
+}
+
+
+class BrowserPool:
+    """
+    Mantem um Chromium aberto e reaproveita os contextos entre as renderizações.
+
+    Cada tarefa recebe um contexto só para ela enquanto usa a pagina. Ao devolver,
+    os cookies, as permissões e o storage (localStorage, IndexedDB, ...) das origens
+    visitadas são apagados e, depois de `max_context_uses` usos, o contexto é
+    fechado e outro é criado. Se a limpeza falhar o contexto é fechado. O mesmo pool pode ser compartilhado por
+    varios SeleniumKiller.
+
+    Example:
+        async with BrowserPool(max_pages=8) as pool:
+            killer = SeleniumKiller(browser_pool=pool)
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        max_pages: int = 4,
+        max_context_uses: int = 50,
+        launch_options: Optional[dict[str, Any]] = None,
+        context_options: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_context_uses = max_context_uses
+        self.launch_options = {**LAUNCH_OPTIONS, **(launch_options or {})}
+        self.context_options = {**CONTEXT_OPTIONS, **(context_options or {})}
+        self._semaphore = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._idle: list[tuple[BrowserContext, int]] = []
+
+    async def start(self) -> Browser:
+        """Abre o navegador, se ainda não estiver aberto. É chamado sozinho no primeiro uso."""
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+
+                    self._playwright = await async_playwright().start()
+                self._idle = []
+                self._browser = await self._playwright.chromium.launch(
+                    headless=self.headless, **self.launch_options
+                )
+            return self._browser
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[BrowserPage]:
+        """Entrega uma pagina nova num contexto exclusivo. O contexto é `page.context`."""
+        async with self._semaphore:
+            context, uses = await self._acquire_context()
+            page = await context.new_page()
+            origins: set[str] = set()
+            page.on("framenavigated", lambda frame: _add_origin(origins, frame.url))
+            try:
+                yield page
+            finally:
+                await self._release_context(context, uses + 1, page, origins)
+
+    async def _acquire_context(self) -> tuple[BrowserContext, int]:
+        browser = await self.start()
+        while self._idle:
+            context, uses = self._idle.pop()
+            if context.browser is browser:
+                return context, uses
+        return await browser.new_context(**self.context_options), 0
+
+    async def _release_context(
+        self, context: BrowserContext, uses: int, page: BrowserPage, origins: set[str]
+    ) -> None:
+        try:
+            if uses >= self.max_context_uses:
+                await page.close()
+                await context.close()
+                return
+            await _clear_storage(context, page, origins)
+            await page.close()
+            await context.clear_cookies()
+            await context.clear_permissions()
+        except Exception:
+            # Navegador caiu ou a limpeza falhou: o contexto não volta para o pool,
+            # senão a proxima tarefa herdaria o login desta.
+            try:
+                await context.close()
+            except Exception:
+                pass
+            return
+        self._idle.append((context, uses))
+
+    async def close(self) -> None:
+        async with self._lock:
+            for context, _ in self._idle:
+                try:
+                    await context.close()
+                except Exception:
+                    pass
+            self._idle = []
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+def _add_origin(origins: set[str], url: str) -> None:
+    parts = urlsplit(url)
+    if parts.scheme in ("http", "https"):
+        origins.add(f"{parts.scheme}://{parts.netloc}")
+
+
+async def _clear_storage(
+    context: BrowserContext, page: BrowserPage, origins: Iterable[str]
+) -> None:
+    """Apaga o storage das origens pelo CDP, que não depende de navegar até cada uma."""
+    origins = sorted(origins)
+    if not origins:
+        return
+    cdp = await context.new_cdp_session(page)
+    try:
+        for origin in origins:
+            await cdp.send(
+                "Storage.clearDataForOrigin",
+                {"origin": origin, "storageTypes": CLEAR_STORAGE_TYPES},
+            )
+    finally:
+        await cdp.detach()
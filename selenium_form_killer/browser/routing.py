@@ -0,0 +1,138 @@
+from typing import Any, Iterable, Optional
+
+import httpx
+
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+TRACKER_PATTERNS = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "connect.facebook.net",
+    "facebook.com/tr",
+    "hotjar.com",
+    "clarity.ms",
+    "segment.io",
+    "mixpanel.com",
+    "newrelic.com",
+    "nr-data.net",
+)
+# Headers que não valem mais depois que o httpx descompacta o corpo.
+HOP_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection")
+
+
+class RenderStats:
+    """Contadores de uma renderização: o que foi bloqueado e o que foi baixado."""
+
+    def __init__(self) -> None:
+        self.blocked_requests = 0
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+        # Liberadas que falharam (timeout, conexão recusada, ...) e foram abortadas.
+        self.failed_requests = 0
+        self.blocked_by_type: dict[str, int] = {}
+        # Status do ultimo documento carregado no frame principal.
+        self.status_code: Optional[int] = None
+
+    def __repr__(self) -> str:
+        return (
+            f"<RenderStats: blocked={self.blocked_requests} allowed={self.allowed_requests}"
+            f" failed={self.failed_requests} allowed_bytes={self.allowed_bytes}>"
+        )
+
+
+class RoutePolicy:
+    """
+    Decide quais requisições do navegador são bloqueadas durante o render.
+
+    Por padrão bloqueia imagens, fontes, midia e os rastreadores mais comuns.
+    Com via_session=True as requisições liberadas são feitas pela sessão httpx do
+    killer, usando os mesmos cookies e proxies.
+
+    Keyword Arguments:
+        block_resource_types -- Tipos do playwright: "image", "font", "media", "stylesheet", ...
+        block_patterns -- Trechos de url bloqueados
+        via_session -- Faz as requisições liberadas pela sessão do killer
+    """
+
+    def __init__(
+        self,
+        block_resource_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+        block_patterns: Iterable[str] = TRACKER_PATTERNS,
+        via_session: bool = False,
+    ) -> None:
+        self.block_resource_types = frozenset(block_resource_types)
+        self.block_patterns = tuple(block_patterns)
+        self.via_session = via_session
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.block_resource_types:
+            return True
+        return any(pattern in url for pattern in self.block_patterns)
+
+    async def handle(
+        self,
+        route: Any,
+        stats: RenderStats,
+        session: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            stats.blocked_requests += 1
+            stats.blocked_by_type[request.resource_type] = (
+                stats.blocked_by_type.get(request.resource_type, 0) + 1
+            )
+            await route.abort("blockedbyclient")
+            return
+        stats.allowed_requests += 1
+        via_session = self.via_session and session is not None
+        try:
+            if via_session:
+                response = await session.request(
+                    request.method,
+                    request.url,
+                    headers=strip_headers(request.headers, ("host", "cookie")),
+                    content=request.post_data_buffer,
+                )
+                body = response.content
+            else:
+                response = await route.fetch()
+                body = await response.body()
+        except Exception:
+            # Sem abort o navegador fica esperando a requisição até o timeout da pagina.
+            stats.failed_requests += 1
+            await route.abort("failed")
+            return
+        stats.allowed_bytes += len(body)
+        if via_session:
+            await fulfill(route, response)
+        else:
+            await route.fulfill(response=response, body=body)
+
+
+def strip_headers(headers: Any, names: Iterable[str]) -> dict[str, str]:
+    names = tuple(names)
+    return {key: value for key, value in headers.items() if key.lower() not in names}
+
+
+def browser_headers(headers: httpx.Headers) -> dict[str, str]:
+    # O playwright recebe um dict; varios Set-Cookie vão separados por quebra de linha.
+    result: dict[str, str] = {}
+    for key, value in headers.multi_items():
+        key = key.lower()
+        if key in HOP_HEADERS:
+            continue
+        if key in result:
+            result[key] += ("\n" if key == "set-cookie" else ", ") + value
+        else:
+            result[key] = value
+    return result
+
+
+async def fulfill(route: Any, response: httpx.Response) -> None:
+    """Responde a requisição do navegador com um response do httpx."""
+    await route.fulfill(
+        status=response.status_code,
+        headers=browser_headers(response.headers),
+        body=response.content,
+    )
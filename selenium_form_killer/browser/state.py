@@ -0,0 +1,44 @@
+from http.cookiejar import Cookie
+from typing import Any
+
+STORAGE_SCRIPT = """() => ({
+    localStorage: Object.fromEntries(Object.entries(window.localStorage)),
+    sessionStorage: Object.fromEntries(Object.entries(window.sessionStorage)),
+})"""
+
+
+def to_browser_cookie(cookie: Cookie) -> dict[str, Any]:
+    """Converte um cookie do httpx (cookiejar) para o formato do playwright."""
+    return dict(
+        name=cookie.name,
+        value=cookie.value,
+        domain=cookie.domain,
+        path=cookie.path,
+        expires=cookie.expires or -1,
+        secure=cookie.secure,
+        httpOnly=cookie.has_nonstandard_attr("HttpOnly"),
+    )
+
+
+def to_jar_cookie(cookie: dict[str, Any]) -> Cookie:
+    """Converte um cookie do playwright para ser guardado no cookiejar do httpx."""
+    domain = cookie["domain"]
+    expires = cookie.get("expires", -1)
+    return Cookie(
+        version=0,
+        name=cookie["name"],
+        value=cookie["value"],
+        port=None,
+        port_specified=False,
+        domain=domain,
+        domain_specified=domain.startswith("."),
+        domain_initial_dot=domain.startswith("."),
+        path=cookie.get("path", "/"),
+        path_specified=True,
+        secure=cookie.get("secure", False),
+        expires=int(expires) if expires and expires > 0 else None,
+        discard=expires is None or expires < 0,
+        comment=None,
+        comment_url=None,
+        rest={"HttpOnly": ""} if cookie.get("httpOnly") else {},
+    )
@@ -0,0 +1,71 @@
+import time
+from typing import Any, Literal, Optional
+
+WaitUntil = Literal["load", "domcontentloaded", "networkidle", "timeout"]
+
+
+class Deadline:
+    """
+    Prazo unico para varios passos no navegador.
+
+    Cada passo recebe só o tempo que sobrou, então a soma nunca passa do timeout.
+    """
+
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        self.at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        return max(self.at - time.monotonic(), 0.0)
+
+    def ms(self) -> float:
+        # No playwright timeout=0 significa esperar para sempre.
+        return max(self.remaining(), 0.001) * 1000
+
+
+async def wait_for_page(
+    page: Any,
+    timeout: float,
+    wait_until: Optional[WaitUntil] = "networkidle",
+    selector: Optional[str] = None,
+    predicate: Optional[str] = None,
+    min_forms: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+) -> bool:
+    """
+    Espera a pagina ficar pronta pelas condições informadas, na ordem abaixo.
+
+    O timeout (em segundos) é o limite para todas as condições juntas. Se estourar,
+    a espera termina e o HTML atual é usado, como acontecia com o tempo fixo.
+
+    Keyword Arguments:
+        wait_until -- Estado de carregamento: "load", "domcontentloaded", "networkidle",
+            ou "timeout" para esperar o timeout inteiro (comportamento antigo)
+        selector -- Seletor CSS que precisa aparecer na pagina
+        predicate -- Expressão JS que precisa ser verdadeira, ex: "() => window.ready"
+        min_forms -- Quantidade minima de <form> na pagina
+        deadline -- Prazo já em andamento, no lugar do timeout (ex: depois de um clique)
+
+    Returns:
+        bool: False se o timeout estourou antes das condições serem atendidas.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    remaining = (deadline or Deadline(timeout)).ms
+
+    try:
+        if wait_until == "timeout":
+            await page.wait_for_timeout(remaining())
+        elif wait_until:
+            await page.wait_for_load_state(wait_until, timeout=remaining())
+        if selector:
+            await page.wait_for_selector(selector, timeout=remaining())
+        if predicate:
+            await page.wait_for_function(predicate, timeout=remaining())
+        if min_forms:
+            await page.wait_for_function(
+                "n => document.forms.length >= n", arg=min_forms, timeout=remaining()
+            )
+    except PlaywrightTimeoutError:
+        return False
+    return True
@@ -1,17 +1,70 @@
-from capmonstercloudclient import CapMonsterClient, ClientOptions
-from capmonstercloudclient.requests.baseRequest import BaseRequest
+from typing import Any, Optional
 
-from selenium_form_killer.log.logger import get_logger
+import httpx
+from loguru import logger
 
-logger = get_logger()
+from selenium_form_killer.anti_captcha.anti_captcha import AntiCaptcha
+
+API_URL = "https://api.capmonster.cloud"
+# Prazo e primeira consulta do capmonstercloudclient para reCAPTCHA, hCaptcha e a
+# maioria das tarefas.
+READY_WAIT = 180
+INITIAL_DELAY = 1.0
+
+
+class CapMonster(AntiCaptcha):
+    """
+    Cliente do capmonster.cloud.
+
+    A API (createTask e getTaskResult) é a mesma do anti-captcha, então o client
+    httpx e o poller também são: as conexões ficam abertas entre as chamadas e são
+    fechadas com `async with` ou `aclose()`. O poller retorna a `solution` inteira.
+
+    Example:
+        async with CapMonster(api_key) as capmonster:
+            token = await capmonster.recaptcha_v2(sitekey, url)
+    """
+
+    api_url = API_URL
+    soft_id = 55
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 30,
+        client: Optional[httpx.AsyncClient] = None,
+        initial_delay: float = INITIAL_DELAY,
+        **options: Any,
+    ) -> None:
+        super().__init__(
+            api_key, timeout=timeout, client=client, initial_delay=initial_delay, **options
+        )
+
+    def solution(self, solution: dict[str, Any]) -> dict[str, Any]:
+        return solution
+
+    async def recaptcha_v2(
+        self, sitekey: str, url: str, ready_wait: float = READY_WAIT
+    ) -> str:
+        task = {"type": "RecaptchaV2Task", "websiteURL": url, "websiteKey": sitekey}
+        solution = await self.solve_task(task, ready_wait)
+        return solution["gRecaptchaResponse"]
 
 
 async def captcha_token(
-    request_captcha: BaseRequest, api_key: str, client_timeout: int = 30
-) -> dict[str, str]:
-    client_options = ClientOptions(api_key=api_key, client_timeout=client_timeout)
-    cap_monster_client = CapMonsterClient(options=client_options)
-    logger.info("Solving captcha...")
-    response = await cap_monster_client.solve_captcha(request_captcha)
-    logger.info("Captcha solved!")
-    return response
+    request_captcha: Any, api_key: str, client_timeout: int = 30, **client_options: Any
+) -> dict[str, Any]:
+    """
+    Resolve um request do capmonstercloudclient (ex: RecaptchaV2Request) e retorna
+    a `solution`. Abre e fecha um client por chamada; para varias resoluções use um
+    CapMonster com `async with`.
+    """
+    async with CapMonster(
+        api_key, timeout=client_timeout, **client_options
+    ) as cap_monster_client:
+        logger.info("Solving captcha...")
+        response = await cap_monster_client.solve_task(
+            request_captcha.getTaskDict(), READY_WAIT
+        )
+        logger.info("Captcha solved!")
+        return response
@@ -1,4 +1,6 @@
-from typing import Optional, Sequence
+from sys import intern
+from typing import TYPE_CHECKING, Optional, Sequence
+from selenium_form_killer.template import FormTemplate
 from selenium_form_killer.util.util import join_url_action
 
 from selenium_form_killer.types.selenium_types import (
@@ -7,8 +9,16 @@ from selenium_form_killer.types.selenium_types import (
     FormABC,
 )
 
+if TYPE_CHECKING:
+    from selenium_form_killer.page import Page
+
+
+FORM_FIELDS = ("inputs", "action", "method", "id", "name", "button", "captcha", "url_base")
+
 
 class Form(FormABC):
+    __slots__ = ("__killer",)
+
     def __init__(
         self,
         killer: "SeleniumKillerABC",
@@ -31,6 +41,47 @@ class Form(FormABC):
         self.url_base = url_base
         self.__killer = killer
 
+    @property
+    def killer(self) -> "SeleniumKillerABC":
+        return self.__killer
+
+    def bind(self, killer: "SeleniumKillerABC") -> "Form":
+        """Liga o form a um killer; usado depois de carregar um form do pickle."""
+        self.__killer = killer
+        return self
+
+    def __getstate__(self) -> dict:
+        # O killer (sessão, locks, logger) não vai para o pickle.
+        return {field: getattr(self, field) for field in FORM_FIELDS}
+
+    def __setstate__(self, state: dict) -> None:
+        for field, value in state.items():
+            setattr(self, field, value)
+        self.__killer = None
+
+    def copy(self, killer: Optional["SeleniumKillerABC"] = None) -> "Form":
+        """Copia com inputs novos, ligada ao killer informado (default: o mesmo)."""
+        return Form(
+            killer or self.__killer,
+            [FormInput(input.name, input.value, input.type) for input in self.inputs],
+            self.action,
+            self.method,
+            id=self.id,
+            name=self.name,
+            captcha=self.captcha,
+            button=dict(self.button) if self.button else self.button,
+            url_base=self.url_base,
+        )
+
+    def compile(self, dynamic: Optional[Sequence[str]] = None) -> FormTemplate:
+        """
+        Compila o formulario num FormTemplate para envios em massa.
+
+        Keyword Arguments:
+            dynamic -- Inputs que mudam a cada pagina (default: hidden com valor)
+        """
+        return FormTemplate(self, dynamic=dynamic)
+
     def pretty_print(self) -> None:
         from pprint import pprint
 
@@ -75,6 +126,10 @@ class Form(FormABC):
     def get_inputs_by_index(self, index: list[int]) -> list["FormInput"]:
         return [self.inputs[indice] for indice in index]
 
+    def to_dict(self) -> dict[str, str]:
+        """Nome e valor de todos os inputs, como seriam enviados."""
+        return {input.name: input.value for input in self.inputs}
+
     async def submit(
         self,
         url: Optional[str] = None,
@@ -83,51 +138,63 @@ class Form(FormABC):
         input_data: str | list["FormInput"] | list[int] | None = "all",
         input_query_params: str | list["FormInput"] | list[int] | None = None,
         **kwargs,
-    ) -> "SeleniumKillerABC":
-        self.__killer.logger.info(f"Submitting form: {self}")
+    ) -> "Page":
+        """
+        Envia o formulario pela sessão do killer e retorna o Page do response.
+
+        O formulario não é alterado, então pode ser enviado varias vezes ao mesmo tempo.
+        Se o form tem captcha, nenhum token foi informado e o killer tem um
+        presolver, o token pronto do presolver é usado.
+        """
+        self.__killer.logger.info("Submitting form: {}", self)
         if not self.method and not method:
             raise ValueError(
                 "method is required" + "Form: " + str(self) + "Not have method"
             )
-        elif method:
-            self.method = method
+        method = method or self.method
+        inputs = self.inputs
         if input_query_params == "all":
-            params = {}
-            params.update({input.to_dict() for input in self.inputs})
-            kwargs["params"] = params
+            kwargs["params"] = self.to_dict()
         elif isinstance(input_query_params, list):
             if isinstance(input_query_params[0], int):
-                inputs = self.get_inputs_by_index(input_query_params)
-                params = {input.name: input.value for input in inputs}
+                query_inputs = self.get_inputs_by_index(input_query_params)
+                params = {input.name: input.value for input in query_inputs}
                 kwargs["params"] = params
             elif isinstance(input_data[0], FormInput):
-                kwargs["params"] = {input.name: input.value for input in self.inputs}
+                kwargs["params"] = self.to_dict()
 
         if input_data == "all":
             pass
         elif isinstance(input_data, list):
             if isinstance(input_data[0], int):
-                self.inputs = [self.inputs[indice] for indice in input_data]
+                inputs = [self.inputs[indice] for indice in input_data]
             elif isinstance(input_data[0], FormInput):
-                self.inputs = input_data
+                inputs = input_data
         elif isinstance(input_data, dict):
-            self.inputs = [FormInput(name=k, value=v) for k, v in input_data.items()]
+            inputs = [FormInput(name=k, value=v) for k, v in input_data.items()]
         elif not input_data:
-            self.inputs = []
-        kwargs["data"] = {input.name: input.value for input in self.inputs}
+            inputs = []
+        kwargs["data"] = {input.name: input.value for input in inputs}
 
+        presolver = getattr(self.__killer, "presolver", None)
+        if not token and self.captcha and presolver is not None:
+            token = {presolver.field: await presolver.token(self.captcha, self.url_base)}
         if token:
             kwargs["data"].update(token)
 
         if not url:
             url = join_url_action(self.url_base, self.action)
-        await self.__killer.send_request(method=self.method, url=url, **kwargs)
-        return self.__killer
+        return await self.__killer.send_request(method=method, url=url, **kwargs)
 
 
 class FormInput(FormInputABC):
+    __slots__ = ()
+
     def __init__(self, name: str, value: str, type: str = "text") -> None:
-        self.type = type
+        # Poucos types se repetem em todas as paginas; interning guarda uma copia só.
+        # Os names não: vêm do site, não têm limite e strings internadas não são
+        # liberadas.
+        self.type = intern(type) if type else type
         self.name = name
         self.value = value
 
@@ -136,3 +203,6 @@ class FormInput(FormInputABC):
 
     def to_dict(self) -> dict:
         return {self.name: self.value}
+
+    def as_tuple(self) -> tuple[str, str, str]:
+        return (self.name, self.value, self.type)
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import asyncio
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+
+from selenium_form_killer.browser.routing import HOP_HEADERS
+from selenium_form_killer.util.cache import LRUCache
+
+if TYPE_CHECKING:
+    from selenium_form_killer.forms import Form
+    from selenium_form_killer.types.selenium_types import SeleniumKillerABC
+
+# Extensão do response que diz de onde ele veio: "hit", "revalidated" ou "miss".
+CACHE_STATUS = "cache_status"
+# Status que podem ser guardados sem ordem explicita do servidor (RFC 9110 15.1).
+CACHEABLE_STATUS = frozenset({200, 203, 204, 300, 301, 308, 404, 405, 410, 414, 501})
+# Sem max-age/Expires, a pagina vale 10% do tempo desde o Last-Modified (RFC 9111 4.2.2).
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX = 24 * 60 * 60.0
+
+
+def parse_cache_control(value: Optional[str]) -> dict[str, Optional[str]]:
+    """Diretivas do Cache-Control em minusculo; as sem valor ficam com None."""
+    directives: dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def seconds(value: Optional[str]) -> Optional[int]:
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_key(request: httpx.Request) -> str:
+    """
+    Chave do request: metodo, url, cookies e Authorization.
+
+    Os cookies entram na chave para uma sessão nunca receber a pagina de outra.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (
+        request.method,
+        str(request.url),
+        request.headers.get("cookie", ""),
+        request.headers.get("authorization", ""),
+    ):
+        digest.update(part.encode("utf-8", "surrogateescape"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class CacheEntry:
+    """Response guardado: corpo já descompactado, headers e quando foi recebido."""
+
+    __slots__ = ("url", "status_code", "headers", "content", "stored_at", "vary")
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        headers: list[tuple[str, str]],
+        content: bytes,
+        stored_at: float,
+        vary: dict[str, Optional[str]],
+    ) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+        self.vary = vary
+
+    @classmethod
+    def from_response(
+        cls, request: httpx.Request, response: httpx.Response, now: float
+    ) -> "CacheEntry":
+        headers = [
+            (key, value)
+            for key, value in response.headers.multi_items()
+            if key.lower() not in HOP_HEADERS
+        ]
+        vary = {
+            name.strip().lower(): request.headers.get(name.strip())
+            for name in response.headers.get("vary", "").split(",")
+            if name.strip()
+        }
+        return cls(str(request.url), response.status_code, headers, response.content, now, vary)
+
+    @property
+    def response_headers(self) -> httpx.Headers:
+        return httpx.Headers(self.headers)
+
+    def matches(self, request: httpx.Request) -> bool:
+        """Os headers listados no Vary são os mesmos do request guardado."""
+        return all(request.headers.get(name) == value for name, value in self.vary.items())
+
+    def freshness_lifetime(self) -> float:
+        headers = self.response_headers
+        directives = parse_cache_control(headers.get("cache-control"))
+        max_age = seconds(directives.get("max-age"))
+        if max_age is not None:
+            return max_age
+        date = http_date(headers.get("date")) or self.stored_at
+        if "expires" in headers:
+            # Expires invalido (ex: "0") significa já expirado.
+            expires = http_date(headers["expires"])
+            return max(expires - date, 0) if expires is not None else 0
+        last_modified = http_date(headers.get("last-modified"))
+        if last_modified is not None:
+            return min(max(date - last_modified, 0) * HEURISTIC_FRACTION, HEURISTIC_MAX)
+        return 0
+
+    def age(self, now: float) -> float:
+        return max(now - self.stored_at, 0) + (seconds(self.response_headers.get("age")) or 0)
+
+    def is_fresh(self, request: httpx.Request, now: float) -> bool:
+        response_directives = parse_cache_control(self.response_headers.get("cache-control"))
+        request_directives = parse_cache_control(request.headers.get("cache-control"))
+        if "no-cache" in response_directives or "no-cache" in request_directives:
+            return False
+        age = self.age(now)
+        request_max_age = seconds(request_directives.get("max-age"))
+        if request_max_age is not None and age > request_max_age:
+            return False
+        return age < self.freshness_lifetime()
+
+    def validators(self) -> dict[str, str]:
+        """Headers do request condicional: If-None-Match e If-Modified-Since."""
+        headers = self.response_headers
+        conditional = {}
+        if "etag" in headers:
+            conditional["If-None-Match"] = headers["etag"]
+        if "last-modified" in headers:
+            conditional["If-Modified-Since"] = headers["last-modified"]
+        return conditional
+
+    def refresh(self, response: httpx.Response, now: float) -> None:
+        """Atualiza os headers guardados com os do 304 (RFC 9111 4.3.4)."""
+        updated = {
+            key.lower()
+            for key in response.headers.keys()
+            if key.lower() not in HOP_HEADERS and not key.lower().startswith("content-")
+        }
+        headers = [(key, value) for key, value in self.headers if key.lower() not in updated]
+        headers += [
+            (key, value)
+            for key, value in response.headers.multi_items()
+            if key.lower() in updated
+        ]
+        self.headers = headers
+        self.stored_at = now
+
+    def to_response(self, request: httpx.Request, status: str) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+            extensions={CACHE_STATUS: status},
+        )
+
+
+def is_storable(request: httpx.Request, response: httpx.Response, entry: CacheEntry) -> bool:
+    if request.method != "GET" or response.status_code not in CACHEABLE_STATUS:
+        return False
+    if response.history:
+        return False
+    if "no-store" in parse_cache_control(response.headers.get("cache-control")):
+        return False
+    if "no-store" in parse_cache_control(request.headers.get("cache-control")):
+        return False
+    # Um Set-Cookie repetido do cache entregaria a sessão de um killer para outro.
+    if "set-cookie" in response.headers:
+        return False
+    if response.headers.get("vary", "").strip() == "*":
+        return False
+    return entry.freshness_lifetime() > 0 or bool(entry.validators())
+
+
+class MemoryStorage:
+    """Guarda os responses na memoria, descartando o menos usado."""
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._entries = LRUCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries.set(key, entry)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key)
+
+    async def close(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteStorage:
+    """
+    Guarda os responses num arquivo sqlite, que sobrevive entre execuções.
+
+    As operações no arquivo rodam numa thread para não travar o event loop.
+    """
+
+    def __init__(self, path: str = "killer_cache.sqlite") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, status_code INTEGER, headers TEXT,"
+                " content BLOB, stored_at REAL, vary TEXT)"
+            )
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, status_code, headers, content, stored_at, vary"
+                " FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        url, status_code, headers, content, stored_at, vary = row
+        return CacheEntry(
+            url,
+            status_code,
+            [tuple(header) for header in json.loads(headers)],
+            content,
+            stored_at,
+            json.loads(vary),
+        )
+
+    def _set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.url,
+                    entry.status_code,
+                    json.dumps(entry.headers),
+                    entry.content,
+                    entry.stored_at,
+                    json.dumps(entry.vary),
+                ),
+            )
+
+    def _delete(self, key: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        await asyncio.to_thread(self._set, key, entry)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class HTTPCache:
+    """
+    Cache HTTP privado (RFC 9111) usado pelo `send_request` nos GETs.
+
+    Respeita Cache-Control (no-store, no-cache, max-age) e Expires; quando a pagina
+    expira e tem ETag/Last-Modified, o killer envia If-None-Match/If-Modified-Since
+    e, num 304, reaproveita o corpo guardado e os forms já extraidos, sem outro parse.
+    A chave considera os cookies e o Authorization do request, e os headers do Vary.
+    Responses com Set-Cookie não são guardados. O mesmo cache pode ser compartilhado
+    por varios SeleniumKiller.
+
+    Keyword Arguments:
+        storage -- MemoryStorage ou SQLiteStorage (default: {MemoryStorage()})
+        forms_size -- Paginas com forms extraidos mantidas na memoria (default: {256})
+
+    Example:
+        cache = HTTPCache(SQLiteStorage("cache.sqlite"))
+        killer = SeleniumKiller(cache=cache)
+    """
+
+    def __init__(self, storage: Optional[Any] = None, forms_size: int = 256) -> None:
+        self.storage = storage if storage is not None else MemoryStorage()
+        self._forms = LRUCache(maxsize=forms_size)
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    async def send(
+        self, session: httpx.AsyncClient, request: httpx.Request, **options: Any
+    ) -> httpx.Response:
+        """Responde do cache, revalida ou faz o request, guardando o response."""
+        key = cache_key(request)
+        now = time.time()
+        entry = await self.storage.get(key)
+        if entry is not None and not entry.matches(request):
+            entry = None
+        if entry is not None and entry.is_fresh(request, now):
+            self.hits += 1
+            return entry.to_response(request, "hit")
+        if entry is not None:
+            for name, value in entry.validators().items():
+                request.headers.setdefault(name, value)
+        response = await session.send(request, **options)
+        now = time.time()
+        if entry is not None and response.status_code == 304:
+            self.revalidated += 1
+            entry.refresh(response, now)
+            await self.storage.set(key, entry)
+            return entry.to_response(request, "revalidated")
+        self.misses += 1
+        response.extensions = {**response.extensions, CACHE_STATUS: "miss"}
+        self._forms.pop(key)
+        new_entry = CacheEntry.from_response(request, response, now)
+        if is_storable(request, response, new_entry):
+            await self.storage.set(key, new_entry)
+        elif entry is not None:
+            await self.storage.delete(key)
+        return response
+
+    def forms(self, request: httpx.Request, killer: SeleniumKillerABC) -> Optional[list[Form]]:
+        """Copias dos forms já extraidos desse response, ligadas ao killer."""
+        forms = self._forms.get(cache_key(request))
+        if forms is None:
+            return None
+        return [form.copy(killer) for form in forms]
+
+    def remember_forms(self, request: httpx.Request, forms: list[Form]) -> None:
+        self._forms.set(cache_key(request), [form.copy() for form in forms])
+
+    async def aclose(self) -> None:
+        await self.storage.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"<HTTPCache: hits={self.hits} revalidated={self.revalidated}"
+            f" misses={self.misses}>"
+        )
@@ -1,25 +1,88 @@
+from __future__ import annotations
+
 import asyncio
+import codecs
+from concurrent.futures import Executor
+from contextlib import AsyncExitStack, asynccontextmanager
+import hashlib
 import os
 from tempfile import NamedTemporaryFile
-from typing import Any, Literal, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Literal,
+    Optional,
+)
 from urllib.parse import urlencode
 import warnings
-import webbrowser
 
-import chardet
 import httpx
-import requests
-from bs4 import BeautifulSoup
 from typing_extensions import override, Self
 
+from selenium_form_killer.auth.auth import KEY_TOKEN, TOKEN_CACHE, TokenAuth, TokenCache
+from selenium_form_killer.browser.pool import BrowserPool
+from selenium_form_killer.browser.routing import (
+    RenderStats,
+    RoutePolicy,
+    browser_headers,
+)
+from selenium_form_killer.browser.state import (
+    STORAGE_SCRIPT,
+    to_browser_cookie,
+    to_jar_cookie,
+)
+from selenium_form_killer.browser.wait import Deadline, WaitUntil, wait_for_page
 from selenium_form_killer.forms import Form, FormInput
+from selenium_form_killer.http_cache.http_cache import CACHE_STATUS, HTTPCache
+from selenium_form_killer.log.logger import is_enabled
+from selenium_form_killer.page import Page
+from selenium_form_killer.parsers.backends import (
+    DEFAULT_PARSER,
+    ParserBackend,
+    get_backend,
+    get_soup_backend,
+)
+from selenium_form_killer.parsers.stream import FormStreamParser, StreamedForm
+from selenium_form_killer.parsers.walker import (
+    extract_forms,
+    extract_streamed_forms,
+    form_actions,
+    scan_form,
+)
+from selenium_form_killer.presolver.presolver import (
+    CaptchaPresolver,
+    find_sitekeys,
+    find_sitekeys_in_bytes,
+)
+from selenium_form_killer.session.session import (
+    Probe,
+    Relogin,
+    SessionExpiredError,
+    decode_session,
+    encode_session,
+    is_valid,
+    restore,
+    snapshot,
+)
+from selenium_form_killer.transport.pool import ConnectionPool
 from selenium_form_killer.types.generic_types import ActionTypes
 from selenium_form_killer.types.selenium_types import (
     FormInputABC,
     SeleniumKillerABC,
 )
-from selenium_form_killer.util.util import get_base_url, join_url_action
-from playwright.async_api import async_playwright
+from selenium_form_killer.util.encoding import META_SCAN_BYTES, Detector
+from selenium_form_killer.util.util import is_html_response, join_url_action
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+# Abaixo disso o parse é rapido o bastante para ficar no event loop.
+OFFLOAD_THRESHOLD = 256 * 1024
+# Opções do session.request que não fazem parte do httpx.Request.
+SEND_OPTIONS = ("auth", "follow_redirects")
 
 
 class SeleniumKiller(SeleniumKillerABC):
@@ -28,9 +91,64 @@ class SeleniumKiller(SeleniumKillerABC):
         headers: dict[str, str] = {},
         verbose: bool = False,
         proxies: dict[str, str] = {},
+        html_cache_size: int = 16,
+        parser: str = DEFAULT_PARSER,
+        encoding_detector: Optional[Detector] = None,
+        browser_pool: Optional[BrowserPool] = None,
+        route_policy: Optional[RoutePolicy] = None,
+        log_file: Optional[str] = None,
+        pool: Optional[ConnectionPool] = None,
+        presolver: Optional[CaptchaPresolver] = None,
+        executor: Optional[Executor] = None,
+        offload_threshold: int = OFFLOAD_THRESHOLD,
+        cache: Optional[HTTPCache] = None,
         **client_options: dict[str, Any],
     ) -> None:
-        super().__init__(headers=headers, verbose=verbose, proxies=proxies, **client_options)
+        """
+        Keyword Arguments:
+            verbose -- Mostra os logs no stderr
+            log_file -- Arquivo que recebe os logs deste killer, ex: "killer.log"
+                (default: {None}, nenhum)
+            parser -- Parser usado na extração de formularios (default: {"html.parser"})
+            browser_pool -- BrowserPool compartilhado para o render
+            route_policy -- O que o navegador bloqueia durante o render
+            pool -- ConnectionPool compartilhado; as conexões são reaproveitadas
+                entre killers, mas cookies e headers continuam separados
+            presolver -- CaptchaPresolver; nas paginas do `prime_urls` dele os
+                captchas começam a ser resolvidos assim que o sitekey aparece
+            executor -- ThreadPoolExecutor ou ProcessPoolExecutor usado pelo aforms()
+                para decodificar, fazer o parse e extrair os forms de paginas grandes,
+                e pela busca de sitekeys do presolver. Só o aforms() usa o executor:
+                `page.forms` e `killer.forms` continuam fazendo o parse no event loop
+            offload_threshold -- Paginas menores que isso (em bytes) são processadas
+                no proprio event loop (default: {262144})
+            cache -- HTTPCache usado nos GETs; num 304 os forms já extraidos são
+                reaproveitados sem outro parse
+            client_options -- Repassados para o httpx.AsyncClient
+        """
+        super().__init__(
+            headers=headers,
+            verbose=verbose,
+            proxies=proxies,
+            html_cache_size=html_cache_size,
+            parser=parser,
+            encoding_detector=encoding_detector,
+            log_file=log_file,
+            pool=pool,
+            **client_options,
+        )
+        self._browser_pool = browser_pool
+        self._owns_browser_pool = False
+        self.route_policy = route_policy or RoutePolicy()
+        self.render_stats: Optional[RenderStats] = None
+        self.browser_storage: dict[str, dict[str, str]] = {}
+        self._log_host: Optional[str] = None
+        self.presolver = presolver
+        self.executor = executor
+        self.offload_threshold = offload_threshold
+        self.cache = cache
+        # Tarefas em segundo plano do killer; a referencia evita o garbage collector.
+        self._background: set[asyncio.Task] = set()
 
     @classmethod
     def from_auth_data(
@@ -55,22 +173,160 @@ class SeleniumKiller(SeleniumKillerABC):
             headers = {"Authorization": f"Bearer {token}"}
             return cls(headers=headers, verbose=True)
 
-    def find(self, *args, html: Optional[str] = None, **kwargs) -> BeautifulSoup:
-        self.logger.info(f"find element with args: {args}, kwargs: {kwargs}")
-        soup = self.soup(html)
+    @classmethod
+    async def afrom_auth_data(
+        cls,
+        url: str,
+        payload: dict,
+        key_token: Optional[str] = None,
+        token_cache: Optional[TokenCache] = None,
+        **killer_options: Any,
+    ) -> "SeleniumKiller":
+        """
+        Versão async do from_auth_data, com o token em cache e renovado sozinho.
+
+        O token fica no TokenCache por (url, hash das credenciais) até o `expires_in`
+        da resposta, e é renovado em segundo plano pouco antes de expirar. Varios
+        killers criados ao mesmo tempo com as mesmas credenciais fazem um login só.
+        Cada request da sessão leva o token atual; num 401 o login é refeito uma vez.
+
+        Keyword Arguments:
+            key_token -- Chave do JSON de resposta com o token (default: {"access_token"})
+            token_cache -- TokenCache compartilhado (default: cache do processo)
+            killer_options -- Repassados para o SeleniumKiller; com `pool` o login
+                usa as mesmas conexões
+
+        Example:
+            killer = await SeleniumKiller.afrom_auth_data(url, {"username": "...", "password": "..."})
+        """
+        auth = TokenAuth(
+            token_cache or TOKEN_CACHE,
+            url,
+            payload,
+            key_token or KEY_TOKEN,
+            pool=killer_options.get("pool"),
+        )
+        token = await auth.token()
+        headers = {**killer_options.pop("headers", {}), "Authorization": f"Bearer {token}"}
+        killer_options.setdefault("verbose", True)
+        return cls(headers=headers, auth=auth, **killer_options)
+
+    def export_session(self, content: bool = False) -> str:
+        """
+        Exporta a sessão para outro killer continuar de onde este parou.
+
+        Vão juntos os cookies, os headers da sessão, o storage do navegador e a url,
+        status e headers do response atual, num texto compacto (JSON + zlib + base64).
+        O texto tem os cookies de login, então deve ser guardado como uma senha.
+        Killers com auth (como os do afrom_auth_data) não podem ser exportados.
+
+        Keyword Arguments:
+            content -- Inclui o HTML da pagina atual, para os forms continuarem
+                disponiveis no killer restaurado (default: {False})
+
+        Example:
+            blob = killer.export_session()
+            killer = SeleniumKiller.from_session(blob)
+        """
+        return encode_session(snapshot(self, content=content))
+
+    @classmethod
+    def from_session(cls, blob: str, **killer_options: Any) -> "SeleniumKiller":
+        """
+        Cria um killer com a sessão exportada pelo export_session, sem refazer o login.
+
+        Keyword Arguments:
+            killer_options -- Repassados para o SeleniumKiller; os headers informados
+                sobrescrevem os da sessão
+        """
+        data = decode_session(blob)
+        headers = {**data["headers"], **killer_options.pop("headers", {})}
+        killer = cls(headers=headers, **killer_options)
+        restore(killer, data)
+        return killer
+
+    @classmethod
+    async def afrom_session(
+        cls,
+        blob: str,
+        probe: Optional[Probe] = None,
+        relogin: Optional[Relogin] = None,
+        **killer_options: Any,
+    ) -> "SeleniumKiller":
+        """
+        Igual ao from_session, mas confere se a sessão ainda vale.
+
+        Se o probe falhar, os cookies são apagados e o relogin é chamado com o killer;
+        sem relogin é levantado SessionExpiredError. Depois de um relogin vale
+        exportar a sessão de novo para os proximos workers.
+
+        Keyword Arguments:
+            probe -- Url que só responde 2xx logado (sem seguir redirect), ou uma
+                coroutine que recebe o killer e retorna bool
+            relogin -- Coroutine que recebe o killer e faz o login de novo
+
+        Example:
+            killer = await SeleniumKiller.afrom_session(blob, probe="https://foo.bar/conta", relogin=login)
+        """
+        killer = cls.from_session(blob, **killer_options)
+        try:
+            if probe is None or await is_valid(killer, probe):
+                return killer
+            killer.logger.warning("Restored session is no longer valid")
+            if relogin is None:
+                raise SessionExpiredError("A sessão exportada expirou")
+            killer.session.cookies.clear()
+            killer.browser_storage = {}
+            await relogin(killer)
+        except BaseException:
+            await killer.close()
+            raise
+        return killer
+
+    def find(
+        self, *args, html: Optional[str] = None, parser: Optional[str] = None, **kwargs
+    ) -> BeautifulSoup:
+        self.logger.info("find element with args: {}, kwargs: {}", args, kwargs)
+        soup = self.soup(html, parser=parser)
         return soup.find(*args, **kwargs)
 
     def find_all(
-        self, *args, html: Optional[str] = None, **kwargs
+        self, *args, html: Optional[str] = None, parser: Optional[str] = None, **kwargs
     ) -> list[BeautifulSoup]:
-        self.logger.info(f"find elements with args: {args}, kwargs: {kwargs}")
-        soup = self.soup(html)
+        self.logger.info("find elements with args: {}, kwargs: {}", args, kwargs)
+        soup = self.soup(html, parser=parser)
         return soup.find_all(*args, **kwargs)
 
-    def soup(self, html: Optional[str] = None) -> BeautifulSoup:
-        html_text = html or self._response.text
-        soup = BeautifulSoup(html_text, "html.parser")
-        return soup
+    def soup(
+        self, html: Optional[str] = None, parser: Optional[str] = None
+    ) -> BeautifulSoup:
+        """
+        Retorna o documento parseado do response atual ou do html informado.
+
+        O documento do response fica em cache na pagina atual. Os htmls passados
+        explicitamente ficam num cache LRU indexado pelo hash do conteudo.
+        O objeto retornado é compartilhado, então não deve ser alterado.
+
+        Keyword Arguments:
+            parser -- Sobrescreve o parser da instancia. Parsers que não geram
+                BeautifulSoup (selectolax) usam o html.parser aqui.
+        """
+        return self._parse(html, get_soup_backend(parser or self.parser))
+
+    def _parse(self, html: Optional[str], backend: ParserBackend) -> Any:
+        if html:
+            key = (
+                backend.name,
+                hashlib.blake2b(
+                    html.encode("utf-8", "surrogatepass"), digest_size=16
+                ).digest(),
+            )
+            document = self._html_documents.get(key)
+            if document is None:
+                document = backend.parse(html)
+                self._html_documents.set(key, document)
+            return document
+        return self.page.document(backend.name)
 
     async def __aenter__(self):
         self.logger.info("Entering async context")
@@ -83,47 +339,132 @@ class SeleniumKiller(SeleniumKillerABC):
             self.logger.critical(
                 f"Exiting async context with exc_type:{exc_type}, exc_val:{exc_val}, exc_tb:{exc_tb}"
             )
-        await self.session.aclose()
-        self.logger.info("Session closed")
+        await self.close()
 
     async def close(self):
         """
-        Fecha a sessão do httpx.
+        Fecha a sessão do httpx e o navegador, se ele foi aberto por este killer.
+        Um browser_pool ou pool de conexões compartilhado não é fechado aqui.
         """
         self.logger.info("Session closed")
+        for task in list(self._background):
+            task.cancel()
         await self.session.aclose()
+        if self._owns_browser_pool and self._browser_pool is not None:
+            await self._browser_pool.close()
+            self._browser_pool = None
 
     @property
     def forms(self) -> list["Form"]:
-        return self._forms
+        """
+        Formularios da pagina atual.
+
+        São extraidos somente no primeiro acesso e ficam em cache até o proximo response.
+        Responses que não são HTML (JSON, downloads, etc.) não são parseados.
+        O parse roda no event loop; para paginas grandes use `await killer.aforms()`.
+        """
+        if self.page is None:
+            return []
+        return self.page.forms
 
     @forms.setter
     def forms(self, value: str) -> None:
-        self.logger.info(f"Forms: {value}")
-        self._forms = value
+        self.logger.info("Forms: {}", value)
+        if self.page is None:
+            raise RuntimeError(
+                "Nenhuma pagina carregada: faça um get/post antes de definir os forms"
+            )
+        self.page._forms = value
 
-    async def _requests(self, **kwargs) -> requests.Response:
-        self.logger.info(
-            f"Making request with kwargs: {kwargs}",
-        )
+    async def _requests(self, **kwargs) -> httpx.Response:
+        self.logger.info("Making request with kwargs: {}", kwargs)
         return await self.session.request(**kwargs)
 
-    async def __handle_response(self, response: requests.Response) -> None:
-        encoding = chardet.detect(response.content)["encoding"]
-        response.encoding = encoding
-        self.headers = response.headers
-        self.cookies = response.cookies
-        self.status_code = response.status_code
-        self.response = response
-        self.forms = self.extract_forms()
-        self.url_base = get_base_url(str(response.url))
-        return self
+    def _resolve_encoding(self, response: httpx.Response) -> httpx.Response:
+        response.encoding = self.encoding_resolver.resolve(
+            response.content,
+            content_type=response.headers.get("content-type"),
+            host=response.url.host,
+        )
+        return response
+
+    async def _cached_requests(self, method: str, url: str, **kwargs) -> httpx.Response:
+        self.logger.info("Making request through cache with kwargs: {}", kwargs)
+        options = {name: kwargs.pop(name) for name in SEND_OPTIONS if name in kwargs}
+        request = self.session.build_request(method=method, url=url, **kwargs)
+        response = await self.cache.send(self.session, request, **options)
+        self.logger.info("Cache {}: {}", response.extensions[CACHE_STATUS], url)
+        return response
+
+    async def __handle_response(
+        self, response: httpx.Response, forms: Optional[list["Form"]] = None
+    ) -> Page:
+        page = Page(self, self._resolve_encoding(response), forms)
+        if response.url.host != self._log_host:
+            self._log_host = response.url.host
+            self.logger = self.logger.bind(host=self._log_host)
+        if (
+            self.presolver is not None
+            and is_html_response(response)
+            and self.presolver.should_prime(page.url)
+        ):
+            self._scan_sitekeys(page)
+        # Uma unica atribuição: requisições concorrentes nunca deixam o killer com
+        # headers de um response e forms de outro.
+        self.page = page
+        return page
+
+    def _presolve(self, sitekeys: Iterable[str], url: str) -> None:
+        for sitekey in sitekeys:
+            self.presolver.prime(sitekey, url)
+
+    def _scan_sitekeys(self, page: Page) -> None:
+        content = page.content
+        if len(content) < self.offload_threshold:
+            self._presolve(find_sitekeys(page.text), page.url)
+            return
+        # Paginas grandes: a busca é feita nos bytes, sem decodificar a pagina, e
+        # no executor quando existe um.
+        encoding = page.response.encoding
+        if self.executor is None:
+            self._presolve(find_sitekeys_in_bytes(content, encoding), page.url)
+            return
+        task = asyncio.ensure_future(
+            self._scan_sitekeys_in_executor(content, encoding, page.url)
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    async def _scan_sitekeys_in_executor(
+        self, content: bytes, encoding: Optional[str], url: str
+    ) -> None:
+        sitekeys = await asyncio.get_running_loop().run_in_executor(
+            self.executor, find_sitekeys_in_bytes, content, encoding
+        )
+        self._presolve(sitekeys, url)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning("Background task failed: {!r}", task.exception())
 
     async def send_request(
         self, method: Literal["GET", "POST"], url: str, **kwargs
-    ) -> requests.Response:
-        response = await self._requests(method=method, url=url, **kwargs)
-        return await self.__handle_response(response)
+    ) -> Page:
+        """
+        Faz a requisição e retorna o Page do response, que também vira a pagina atual.
+
+        Com `cache`, os GETs passam pelo HTTPCache; se o response veio do cache,
+        os forms já extraidos dele são reaproveitados.
+        """
+        if self.cache is None or method.upper() != "GET":
+            response = await self._requests(method=method, url=url, **kwargs)
+            return await self.__handle_response(response)
+        response = await self._cached_requests(method, url, **kwargs)
+        forms = None
+        if response.extensions[CACHE_STATUS] != "miss":
+            forms = self.cache.forms(response.request, self)
+        return await self.__handle_response(response, forms)
 
     async def get(
         self,
@@ -133,11 +474,17 @@ class SeleniumKiller(SeleniumKillerABC):
         params: Optional[dict] = dict(),
         use_referer: bool = True,
         **kwargs,
-    ) -> Self:
+    ) -> Page:
         self.logger.info(
-            f"Making get request with url: {url}, headers:{headers}, cookies:{cookies}, params: {params}, use_referer: {use_referer}, kwargs: {kwargs}"
+            "Making get request with url: {}, headers:{}, cookies:{}, params: {}, use_referer: {}, kwargs: {}",
+            url,
+            headers,
+            cookies,
+            params,
+            use_referer,
+            kwargs,
         )
-        await self.make_request(
+        return await self.make_request(
             method="GET",
             url=url,
             headers=headers,
@@ -147,13 +494,91 @@ class SeleniumKiller(SeleniumKillerABC):
             **kwargs,
         )
 
-        return self
+    async def map_get(
+        self,
+        urls: Iterable[str],
+        concurrency: int = 50,
+        per_host: Optional[int] = None,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[Page | BaseException]:
+        """
+        Faz GET em varias urls ao mesmo tempo e retorna as paginas na mesma ordem das urls.
+
+        As requisições usam a mesma sessão (pool de conexões e cookies) do killer, mas
+        o estado do killer (response, forms, ...) não é alterado: cada url vira um Page.
+
+        Keyword Arguments:
+            concurrency -- Maximo de requisições simultaneas (default: {50})
+            per_host -- Maximo de requisições simultaneas por host (default: {None})
+            return_exceptions -- Retorna os erros no lugar das paginas em vez de levantar
+
+        Example:
+            pages = await killer.map_get(urls, concurrency=50, per_host=5)
+        """
+        return [
+            page
+            async for page in self.iter_get(
+                urls,
+                concurrency=concurrency,
+                per_host=per_host,
+                ordered=True,
+                return_exceptions=return_exceptions,
+                **kwargs,
+            )
+        ]
+
+    async def iter_get(
+        self,
+        urls: Iterable[str],
+        concurrency: int = 50,
+        per_host: Optional[int] = None,
+        ordered: bool = False,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[Page | BaseException]:
+        """
+        Igual ao map_get, mas devolve cada pagina assim que fica pronta.
+
+        Com ordered=True as paginas saem na ordem das urls.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        hosts: dict[str, asyncio.Semaphore] = {}
+
+        async def fetch(url: str) -> Page:
+            if not per_host:
+                async with semaphore:
+                    response = await self._requests(method="GET", url=url, **kwargs)
+                return Page(self, self._resolve_encoding(response))
+            host = httpx.URL(url).host
+            host_semaphore = hosts.setdefault(host, asyncio.Semaphore(per_host))
+            # A vaga do host vem antes da global: quem espera o proprio host não
+            # segura vagas globais que outros hosts poderiam usar.
+            async with host_semaphore, semaphore:
+                response = await self._requests(method="GET", url=url, **kwargs)
+            return Page(self, self._resolve_encoding(response))
+
+        tasks = [asyncio.ensure_future(fetch(url)) for url in urls]
+        self.logger.info(f"Fetching {len(tasks)} urls with concurrency: {concurrency}")
+        try:
+            for task in tasks if ordered else asyncio.as_completed(tasks):
+                try:
+                    yield await task
+                except Exception as error:
+                    if not return_exceptions:
+                        raise
+                    yield error
+        finally:
+            for task in tasks:
+                task.cancel()
 
     def _prepare_form_to_request(
         self, form: "Form", fields_delete: Optional[list["FormInput"]]
     ) -> dict[str, str]:
         self.logger.info(
-            f"Preparing form to request with form: {form}, fields_delete: {fields_delete}",
+            "Preparing form to request with form: {}, fields_delete: {}",
+            form,
+            fields_delete,
         )
         data = {"data": {}}
         data["method"] = form.method.upper()
@@ -181,8 +606,8 @@ class SeleniumKiller(SeleniumKillerABC):
         form: Optional["Form"] = None,
         exclude_forms: Optional[list["FormInput"]] = None,
         **kwargs,
-    ) -> Self:
-        self.logger.info(f"Making post request with url: {url} e kwargs: {kwargs}")
+    ) -> Page:
+        self.logger.info("Making post request with url: {} e kwargs: {}", url, kwargs)
 
         return await self.make_request(
             method="POST",
@@ -199,101 +624,239 @@ class SeleniumKiller(SeleniumKillerABC):
             **kwargs,
         )
 
-    async def render(self, timeout: int = 5, debug: bool = False) -> Self:
+    async def render(
+        self,
+        timeout: float = 5,
+        debug: bool = False,
+        wait_until: Optional[WaitUntil] = "networkidle",
+        selector: Optional[str] = None,
+        predicate: Optional[str] = None,
+        min_forms: Optional[int] = None,
+        route_policy: Optional[RoutePolicy] = None,
+    ) -> Self:
         """Renderiza a pagina que precisa de javascript para funcionar.
         Quando o modo debug for True o navegador vai desabilitar o headless.
 
+        O navegador vem do browser_pool do killer e continua aberto entre as chamadas.
+        A renderização termina assim que as condições de espera são atendidas; o
+        timeout é só o limite maximo.
+
         Keyword Arguments:
-            timeout -- Tempo para aguardar a pagina a renderizar em segundos (default: {5})
+            timeout -- Tempo maximo para aguardar a pagina renderizar em segundos (default: {5})
             debug -- Habilita o modo debug (default: {False})
+            wait_until -- "load", "domcontentloaded", "networkidle" ou "timeout" (default: {"networkidle"})
+            selector -- Espera o seletor CSS aparecer
+            predicate -- Espera a expressão JS ser verdadeira
+            min_forms -- Espera a pagina ter pelo menos essa quantidade de forms
+            route_policy -- Sobrescreve o route_policy do killer. Os contadores de bytes
+                e requisições bloqueadas ficam em killer.render_stats
 
         Returns:
             self
         """
-        _timeout = timeout * 1000
         self.logger.info(f"Renderizando a pagina com timeout: {timeout}")
-        os_name = os.name
-        if os_name == "nt":
-            warnings.warn("A renderização no windows está muito lenta")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True if not debug else False,
-                args=["--disable-web-security"],
-                ignore_default_args=[
-                    "--disable-extensions",
-                    "--disable-default-apps",
-                    "--disable-component-extensions-with-background-pages",
-                ],
+        async with self._browser_page(debug) as page:
+            await page.context.add_cookies(self._browser_cookies())
+            stats = await self._load_in_browser(page, route_policy)
+            await self._wait_for_page(
+                page, timeout, wait_until, selector, predicate, min_forms
             )
-            context = await browser.new_context(
-                bypass_csp=True,
-                java_script_enabled=True,
-                user_agent="Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/105.0.5195.100 Mobile/15E148 Safari/604.1",
-                accept_downloads=True,
-            )
-            for cookie in self.cookies.jar._cookies:
-                cookies = tuple(self.cookies.jar._cookies[cookie].values())
-                values = tuple(cookies[0].values())[0]
-                cookie = dict(
-                    name=values.name,
-                    value=values.value,
-                    domain=values.domain,
-                    path=values.path,
-                    expires=values.expires or -1,
-                )
-                await context.add_cookies([cookie])
-            page = await context.new_page()
-            if os_name == "nt":
-                await page.set_content(
-                    self.response.content.decode("utf-8"), wait_until="domcontentloaded"
-                )
-            else:
-                await page.set_content(self.response.content.decode("utf-8"))
-            await page.wait_for_timeout(_timeout)
             html = await page.content()
-            await browser.close()
-            self._response = httpx.Response(
-                content=html.encode("utf-8"), status_code=self.status_code, text=html
-            )
-            return self
+            await self._sync_from_browser(page)
+        self._set_rendered_response(html, page.url, stats.status_code)
+        return self
 
     async def click_by_browser(
-        self, element_click: str, timeout: int = 5, debug: bool = False
+        self,
+        element_click: str,
+        timeout: float = 5,
+        debug: bool = False,
+        wait_until: Optional[WaitUntil] = "networkidle",
+        selector: Optional[str] = None,
+        predicate: Optional[str] = None,
+        min_forms: Optional[int] = None,
+        route_policy: Optional[RoutePolicy] = None,
+        fill: Optional[dict[str, str]] = None,
+        expect_navigation: bool = False,
+        expect_response: Optional[str | Callable[[Any], bool]] = None,
     ) -> Self:
-        _timeout = timeout * 1000
-        self.logger.info(f"Renderizando a pagina com timeout: {timeout}")
-        os_name = os.name
-        if os_name == "nt":
-            warnings.warn("A renderização no windows está muito lenta")
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True if not debug else False,
-                args=["--disable-web-security"],
-                ignore_default_args=[
-                    "--disable-extensions",
-                    "--disable-default-apps",
-                    "--disable-component-extensions-with-background-pages",
-                ],
+        """Abre a pagina atual no navegador, preenche os campos e clica no elemento.
+
+        Depois do clique espera a navegação ou as requisições (XHR) terminarem pelas
+        mesmas condições do render. Os cookies do navegador, o localStorage /
+        sessionStorage (em killer.browser_storage) e a url final voltam para a sessão
+        httpx, então as proximas requisições podem seguir sem o navegador.
+
+        O timeout vale para tudo junto: preencher, clicar e esperar a pagina.
+        Sem expect_navigation/expect_response a espera pode terminar na hora, com o
+        documento de antes do clique, se ele já estava carregado.
+
+        Arguments:
+            element_click -- Seletor do elemento que vai ser clicado
+
+        Keyword Arguments:
+            fill -- Campos preenchidos antes do clique: {seletor: valor}
+            expect_navigation -- O clique navega para outra pagina; espera a navegação
+                começar antes das condições do render
+            expect_response -- Url (glob ou regex) ou predicado do response (XHR)
+                que o clique dispara; espera esse response chegar
+            Os demais são iguais aos do render.
+
+        Returns:
+            self
+        """
+        self.logger.info(f"Clicando em {element_click} com timeout: {timeout}")
+        deadline = Deadline(timeout)
+        async with self._browser_page(debug) as page:
+            await page.context.add_cookies(self._browser_cookies())
+            stats = await self._load_in_browser(page, route_policy)
+            for field, value in (fill or {}).items():
+                await page.fill(field, value, timeout=deadline.ms())
+            await self._click(
+                page, element_click, deadline, expect_navigation, expect_response
             )
-            context = await browser.new_context(
-                bypass_csp=True,
-                java_script_enabled=True,
-                user_agent="Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/105.0.5195.100 Mobile/15E148 Safari/604.1",
+            await self._wait_for_page(
+                page,
+                timeout,
+                wait_until,
+                selector,
+                predicate,
+                min_forms,
+                deadline=deadline,
             )
-            page = await context.new_page()
-            if os_name == "nt":
-                await page.set_content(
-                    self.response.content.decode("utf-8"), wait_until="domcontentloaded"
-                )
-            else:
-                await page.set_content(self.response.content.decode("utf-8"))
-            await page.wait_for_timeout(_timeout)
             html = await page.content()
-            await browser.close()
-            self._response = httpx.Response(
-                content=html.encode("utf-8"), status_code=self.status_code, text=html
+            await self._sync_from_browser(page)
+        self._set_rendered_response(html, page.url, stats.status_code)
+        return self
+
+    async def _sync_from_browser(self, page: Any) -> None:
+        for cookie in await page.context.cookies():
+            self.session.cookies.jar.set_cookie(to_jar_cookie(cookie))
+        try:
+            self.browser_storage = await page.evaluate(STORAGE_SCRIPT)
+        except Exception as error:
+            # Paginas about:blank ou com origem opaca não têm storage.
+            self.logger.warning(f"Não foi possivel ler o storage do navegador: {error}")
+
+    async def _click(
+        self,
+        page: Any,
+        element_click: str,
+        deadline: Deadline,
+        expect_navigation: bool,
+        expect_response: Optional[str | Callable[[Any], bool]],
+    ) -> None:
+        from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+        clicked = False
+        try:
+            # Ao sair do bloco o playwright espera os eventos registrados.
+            async with AsyncExitStack() as stack:
+                # As esperas são registradas antes do clique para não perder o evento.
+                if expect_navigation:
+                    await stack.enter_async_context(
+                        page.expect_navigation(wait_until="commit", timeout=deadline.ms())
+                    )
+                if expect_response is not None:
+                    await stack.enter_async_context(
+                        page.expect_response(expect_response, timeout=deadline.ms())
+                    )
+                await page.click(element_click, timeout=deadline.ms())
+                clicked = True
+        except PlaywrightTimeoutError:
+            if not clicked:
+                raise
+            self.logger.warning(
+                f"Timeout de {deadline.timeout}s esperando o resultado do clique"
             )
-            return self
+
+    async def _wait_for_page(
+        self, page: Any, timeout: float, *conditions, deadline: Optional[Deadline] = None
+    ) -> None:
+        if not await wait_for_page(page, timeout, *conditions, deadline=deadline):
+            self.logger.warning(f"Timeout de {timeout}s esperando a pagina renderizar")
+
+    @property
+    def browser_pool(self) -> BrowserPool:
+        """Pool de navegadores usado pelo render. Criado no primeiro uso se não foi informado."""
+        if self._browser_pool is None:
+            self._browser_pool = BrowserPool()
+            self._owns_browser_pool = True
+        return self._browser_pool
+
+    @asynccontextmanager
+    async def _browser_page(self, debug: bool = False) -> AsyncIterator[Any]:
+        if os.name == "nt":
+            warnings.warn("A renderização no windows está muito lenta")
+        if not debug:
+            async with self.browser_pool.page() as page:
+                yield page
+            return
+        # O modo debug abre uma janela visivel, que não faz sentido manter no pool.
+        async with BrowserPool(headless=False, max_pages=1) as pool:
+            async with pool.page() as page:
+                yield page
+
+    def _browser_cookies(self) -> list[dict[str, Any]]:
+        return [to_browser_cookie(cookie) for cookie in self.session.cookies.jar]
+
+    async def _load_in_browser(
+        self, page: Any, route_policy: Optional[RoutePolicy] = None
+    ) -> RenderStats:
+        """
+        Abre o response atual no navegador sem baixar a pagina de novo.
+
+        A primeira navegação é respondida com o response do killer, assim a pagina
+        fica na url certa (links relativos, cookies, origem). As demais requisições
+        passam pelo route_policy.
+        """
+        policy = route_policy or self.route_policy
+        stats = self.render_stats = RenderStats()
+        stats.status_code = self.status_code
+        response = self.response
+        document_served = False
+
+        def on_response(browser_response: Any) -> None:
+            request = browser_response.request
+            if request.is_navigation_request() and request.frame == page.main_frame:
+                stats.status_code = browser_response.status
+
+        async def handle(route: Any) -> None:
+            nonlocal document_served
+            request = route.request
+            if (
+                not document_served
+                and request.is_navigation_request()
+                and request.frame == page.main_frame
+            ):
+                document_served = True
+                headers = browser_headers(response.headers)
+                headers["content-type"] = "text/html; charset=utf-8"
+                await route.fulfill(
+                    status=response.status_code,
+                    headers=headers,
+                    body=response.text.encode("utf-8"),
+                )
+                return
+            await policy.handle(route, stats, self.session)
+
+        await page.route("**/*", handle)
+        page.on("response", on_response)
+        await page.goto(str(response.url), wait_until="commit")
+        return stats
+
+    def _set_rendered_response(
+        self, html: str, url: Optional[str] = None, status_code: Optional[int] = None
+    ) -> None:
+        request = self.response.request
+        if url and url != str(request.url):
+            request = httpx.Request("GET", url)
+        self.response = httpx.Response(
+            content=html.encode("utf-8"),
+            status_code=status_code or self.status_code,
+            headers={"Content-Type": "text/html; charset=utf-8"},
+            request=request,
+        )
 
     async def make_request(
         self,
@@ -309,10 +872,20 @@ class SeleniumKiller(SeleniumKillerABC):
         form: Optional["Form"] = False,
         exclude_forms: Optional[list["FormInput"]] = None,
         **httpx_options: dict[str, str],
-    ) -> Self:
-        if use_referer and self.response:
-            self.logger.info(f"Using referer:{str(self.response.url)}")
-            self.response.headers["Referer"] = str(self.response.url)
+    ) -> Page:
+        """
+        Monta e envia a requisição, retornando o Page do response.
+
+        Os dicionarios recebidos não são alterados, então a mesma instancia pode
+        fazer varias requisições ao mesmo tempo.
+        """
+        headers = dict(headers or {})
+        data = dict(data or {})
+        token = token or {}
+        current_page = self.page
+        if use_referer and current_page:
+            self.logger.info("Using referer:{}", current_page.url)
+            headers.setdefault("Referer", current_page.url)
         if inputs:
             if not isinstance(inputs, list):
                 inputs = [FormInput(**input) for input in inputs.items()]
@@ -324,10 +897,10 @@ class SeleniumKiller(SeleniumKillerABC):
             request_data = self._prepare_form_to_request(form, exclude_forms)
             request_data["data"].update(data)
             request_data["data"].update(token)
+            request_data.setdefault("headers", headers)
             request_data.update(httpx_options)
-            await self.send_request(**request_data)
-            return self
-        await self.send_request(
+            return await self.send_request(**request_data)
+        return await self.send_request(
             method=method,
             url=url,
             headers=headers,
@@ -336,7 +909,6 @@ class SeleniumKiller(SeleniumKillerABC):
             params=params,
             **httpx_options,
         )
-        return self
 
     def open_response_in_browser(self) -> bool:
         """
@@ -349,74 +921,183 @@ class SeleniumKiller(SeleniumKillerABC):
         with NamedTemporaryFile(suffix=".html", delete=False) as f:
             self.logger.info(f"Abrindo a resposta em um browser em: {f.name}")
             f.write(self.response.content)
+            import webbrowser
+
             return webbrowser.open(f.name, 2, False)
 
-    def extract_inputs(self, formulario: BeautifulSoup) -> list[FormInputABC]:
-        inputs = formulario.find_all(["input", "textarea"])
-        _inputs = []
-        for input_tag in inputs:
-            nome = input_tag.get("name")
-            valor = input_tag.get("value", "")
-            if input_tag.get("type"):
-                _type = input_tag.get("type")
-            else:
-                _type = "text"
-            form_input = FormInput(name=nome, value=valor, type=_type)
-            self.logger.info(f"Extracting inputs: {form_input}")
-            _inputs.append(form_input)
-        return _inputs
-
-    def extract_actions(self, formulario: BeautifulSoup) -> ActionTypes:
-        form_action: ActionTypes = {
-            "action": None,
-            "id": None,
-            "name": None,
-            "method": None,
-        }
-        form_action["action"] = formulario.get("action")
-        form_action["id"] = formulario.get("id")
-        form_action["name"] = formulario.get("name")
-        form_action["method"] = formulario.get("method")
-        self.logger.info(f"Extracting actions from form:{form_action}")
+    def extract_inputs(
+        self, formulario: BeautifulSoup, parser: Optional[str] = None
+    ) -> list[FormInputABC]:
+        """
+        Inputs de um form já encontrado, com as mesmas regras do extract_forms
+        (input, textarea e select). Campos de fora ligados por `form=` não entram.
+        """
+        backend = get_backend(parser or self.parser)
+        inputs = [
+            FormInput(**form_input)
+            for form_input in scan_form(backend, formulario).inputs
+        ]
+        # Um log por input domina o tempo de extração; o nivel é checado uma vez só.
+        if is_enabled("TRACE"):
+            for form_input in inputs:
+                self.logger.trace("Extracting inputs: {}", form_input)
+        return inputs
+
+    def extract_actions(
+        self, formulario: BeautifulSoup, parser: Optional[str] = None
+    ) -> ActionTypes:
+        backend = get_backend(parser or self.parser)
+        form_action = form_actions(backend.attributes(formulario))
+        self.logger.info("Extracting actions from form:{}", form_action)
         return form_action
 
-    def extract_captcha(self, formulario: BeautifulSoup) -> str | None:
-        captchas = formulario.find_all(
-            class_=lambda value: value and "captcha" in value
-        )
-        for captcha in captchas:
-            if data_site := captcha.get("data-sitekey"):
+    def extract_captcha(
+        self, formulario: BeautifulSoup, parser: Optional[str] = None
+    ) -> str | None:
+        backend = get_backend(parser or self.parser)
+        for captcha in backend.captchas(formulario):
+            if data_site := backend.get(captcha, "data-sitekey"):
                 self.logger.info(
-                    f"Extracting captcha from form: {captcha} data-sitekey: {data_site}"
+                    "Extracting captcha from form: {} data-sitekey: {}", captcha, data_site
                 )
                 return data_site
             else:
                 self.logger.error(
-                    f"Extracting captcha from form: {captcha} not found data-sitekey"
+                    "Extracting captcha from form: {} not found data-sitekey", captcha
                 )
         return None
 
     @override
-    def extract_forms(self, html: Optional[str] = None) -> list["Form"]:
-        self.logger.info("Extracting forms")
-        forms = []
-        for formulario in self.find_all("form", html=html):
-            _captcha = self.extract_captcha(formulario)
-            extract_actions = self.extract_actions(formulario)
-            _inputs = self.extract_inputs(formulario)
-
-            forms.append(
-                Form(
-                    killer=self,
-                    inputs=_inputs,
-                    captcha=_captcha,
-                    button=None,
-                    url_base=str(self.response.url),
-                    **extract_actions,
-                )
-            )
+    def extract_forms(
+        self, html: Optional[str] = None, parser: Optional[str] = None
+    ) -> list["Form"]:
+        backend = get_backend(parser or self.parser)
+        url_base = str(self.response.url) if self.response else self.url_base
+        return self._forms_from_document(
+            self._parse(html, backend), backend.name, url_base
+        )
+
+    async def aforms(self) -> list["Form"]:
+        """Formularios da pagina atual, usando o executor para paginas grandes."""
+        return await self.page.aforms() if self.page else []
+
+    async def _load_forms(self, page: Page) -> list["Form"]:
+        response = page.response
+        if (
+            self.executor is None
+            or len(response.content) < self.offload_threshold
+            or not is_html_response(response)
+        ):
+            return page.forms
+        self.logger.debug("Extracting forms in executor: {} bytes", len(response.content))
+        # A função recebe só bytes e strings, assim serve para thread ou processo.
+        streamed = await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            extract_streamed_forms,
+            response.content,
+            response.encoding,
+            get_backend(self.parser).name,
+        )
+        return [self._build_form(form, page.url) for form in streamed]
+
+    def _forms_from_document(
+        self, document: Any, parser: str, url_base: Optional[str]
+    ) -> list["Form"]:
+        backend = get_backend(parser)
+        self.logger.info("Extracting forms with parser: {}", backend.name)
+        # Uma passada pelo documento, ou buscas nativas por form no selectolax.
+        forms = [
+            self._build_form(streamed, url_base)
+            for streamed in extract_forms(backend, document)
+        ]
+        self.logger.info("Extracted {} forms", len(forms))
         return forms
 
+    async def stream_forms(
+        self,
+        url: str,
+        method: Literal["GET", "POST"] = "GET",
+        stop_at: Optional[dict[str, str]] = None,
+        chunk_size: int = 16384,
+        **kwargs,
+    ) -> AsyncIterator["Form"]:
+        """
+        Baixa a pagina em streaming e devolve cada formulario assim que o </form> é lido.
+
+        Útil para paginas grandes: o corpo não é lido inteiro e, com stop_at, o download
+        é interrompido quando o formulario procurado aparece. O response atual do killer
+        não é alterado, só os cookies da sessão.
+
+        Keyword Arguments:
+            stop_at -- Atributos do formulario alvo, ex: {"id": "login"} ou {"action": "/auth"}
+            chunk_size -- Tamanho dos pedaços lidos do corpo em bytes (default: {16384})
+
+        Example:
+            async for form in killer.stream_forms(url, stop_at={"id": "login"}):
+                ...
+        """
+        self.logger.info(f"Streaming forms from url: {url}, stop_at: {stop_at}")
+        parser = FormStreamParser()
+        async with self.session.stream(method, url, **kwargs) as response:
+            url_base = str(response.url)
+            presolve = self.presolver is not None and self.presolver.should_prime(url_base)
+            async for chunk in self._decode_stream(response, chunk_size):
+                parser.feed(chunk)
+                if presolve:
+                    self._presolve(parser.pop_sitekeys(), url_base)
+                for streamed in parser.pop_completed():
+                    yield self._build_form(streamed, url_base)
+                    if stop_at and streamed.matches(stop_at):
+                        self.logger.info(f"Form found, stopping stream: {stop_at}")
+                        return
+            parser.close()
+            for streamed in parser.pop_completed():
+                yield self._build_form(streamed, url_base)
+                if stop_at and streamed.matches(stop_at):
+                    return
+
+    async def _decode_stream(
+        self, response: httpx.Response, chunk_size: int
+    ) -> AsyncIterator[str]:
+        # Segura os primeiros KB para achar o encoding (header, BOM ou <meta>) antes de decodificar.
+        decoder = None
+        head = b""
+        async for chunk in response.aiter_bytes(chunk_size):
+            if decoder is None:
+                head += chunk
+                if len(head) < META_SCAN_BYTES:
+                    continue
+                decoder = self._stream_decoder(head, response)
+                chunk, head = head, b""
+            yield decoder.decode(chunk)
+        if decoder is None:
+            decoder = self._stream_decoder(head, response)
+        yield decoder.decode(head, final=True)
+
+    def _stream_decoder(
+        self, head: bytes, response: httpx.Response
+    ) -> codecs.IncrementalDecoder:
+        encoding = self.encoding_resolver.resolve(
+            head,
+            content_type=response.headers.get("content-type"),
+            host=response.url.host,
+        )
+        return codecs.getincrementaldecoder(encoding)(errors="replace")
+
+    def _build_form(self, streamed: StreamedForm, url_base: str) -> "Form":
+        inputs = [FormInput(**form_input) for form_input in streamed.inputs]
+        if is_enabled("TRACE"):
+            for form_input in inputs:
+                self.logger.trace("Extracting inputs: {}", form_input)
+        return Form(
+            killer=self,
+            inputs=inputs,
+            captcha=streamed.captcha,
+            button=streamed.button,
+            url_base=url_base,
+            **streamed.actions,
+        )
+
     async def save_html(self, name: str) -> None:
         path = name
         if not name.endswith(".html"):
@@ -433,11 +1114,32 @@ class SeleniumKiller(SeleniumKillerABC):
 
     @property
     def response(self) -> httpx.Response | None:
-        return self._response
+        return self.page.response if self.page else None
 
     @response.setter
     def response(self, response: httpx.Response) -> None:
-        self._response = response
+        self.page = Page(self, response)
+
+    @property
+    def request(self) -> httpx.Request | None:
+        return self.page.request if self.page else None
+
+    @property
+    def headers(self) -> httpx.Headers | dict[str, str]:
+        """Headers do response atual ou, antes da primeira requisição, os headers da sessão."""
+        return self.page.headers if self.page else self.session.headers
+
+    @property
+    def cookies(self) -> httpx.Cookies | None:
+        return self.page.cookies if self.page else None
+
+    @property
+    def status_code(self) -> int | None:
+        return self.page.status_code if self.page else None
+
+    @property
+    def url_base(self) -> str | None:
+        return self.page.url_base if self.page else None
 
     def __repr__(self) -> str:
         if self.response:
@@ -1,27 +1,99 @@
+import threading
 from sys import stderr
+from typing import Any, Optional
 
 from loguru import logger
 
+# Nome sugerido para o arquivo de log; o arquivo só é criado quando pedido.
+LOG_FILE = "killer.log"
+LOG_FORMAT = (
+    "{time:DD-MM-YYYY at HH:mm:ss} | {name}:{function} | {level} | "
+    "{extra[context]} | {message}"
+)
+# Contexto de cada killer que aparece nos logs.
+CONTEXT_KEYS = ("killer_id", "host")
+# Chaves do extra que dizem para quais sinks vai o log de cada killer.
+VERBOSE_KEY = "_verbose"
+LOG_FILE_KEY = "_log_file"
 
-def get_logger(verbose=True):
-    logger.remove()
-    logger.add(
-        "killer.log",
-        enqueue=True,
-        format="{time:DD-MM-YYYY at HH:mm:ss} | {name}:{function} | {level} | {message}",
-        rotation="25 MB",
-        level="DEBUG",
-        backtrace=False,
-        diagnose=True,
-    )
-    if verbose:
-        logger.add(
-            sink=stderr,
-            enqueue=True,
-            format="{time:DD-MM-YYYY at HH:mm:ss} | {name}:{function} | {level} | {message}",
-            level="DEBUG",
-            backtrace=True,
-            diagnose=True,
-            colorize=True,
-        )
-    return logger
+_lock = threading.Lock()
+_sinks: dict[str, int] = {}
+
+
+def log_format(record: dict) -> str:
+    extra = record["extra"]
+    extra["context"] = " ".join(
+        f"{key}={extra[key]}" for key in CONTEXT_KEYS if extra.get(key) is not None
+    ) or "-"
+    return LOG_FORMAT + "\n{exception}"
+
+
+def configure_logging(verbose: bool = False, log_file: Optional[str] = None) -> None:
+    """
+    Adiciona os sinks do loguru pedidos, uma vez por processo.
+
+    Cada sink (um por arquivo e o stderr) só é adicionado na primeira vez que é
+    pedido. Os logs de um killer só vão para os sinks que ele pediu (veja o
+    get_logger); logs sem killer (presolver, auth, ...) vão para todos.
+
+    Keyword Arguments:
+        verbose -- Adiciona o sink no stderr (default: {False})
+        log_file -- Adiciona o sink nesse arquivo (default: {None}, nenhum)
+    """
+    with _lock:
+        if not _sinks:
+            # Só o handler padrão do loguru sai, os sinks do usuário ficam.
+            try:
+                logger.remove(0)
+            except ValueError:
+                pass
+            _sinks["default"] = 0
+        if log_file and log_file not in _sinks:
+            _sinks[log_file] = logger.add(
+                log_file,
+                enqueue=True,
+                format=log_format,
+                rotation="25 MB",
+                level="DEBUG",
+                backtrace=False,
+                diagnose=True,
+                filter=lambda record: record["extra"].get(LOG_FILE_KEY, log_file)
+                == log_file,
+            )
+        if verbose and "stderr" not in _sinks:
+            _sinks["stderr"] = logger.add(
+                sink=stderr,
+                enqueue=True,
+                format=log_format,
+                level="DEBUG",
+                backtrace=True,
+                diagnose=True,
+                colorize=True,
+                filter=lambda record: record["extra"].get(VERBOSE_KEY, True),
+            )
+
+
+def get_logger(verbose=True, log_file: Optional[str] = None, **context: Any):
+    """
+    Retorna o logger de um killer com o contexto informado.
+
+    `verbose` e `log_file` valem só para esse logger: outro killer do mesmo
+    processo com verbose=False ou outro arquivo não recebe estes logs.
+    """
+    configure_logging(verbose, log_file)
+    return logger.bind(**{VERBOSE_KEY: verbose, LOG_FILE_KEY: log_file}, **context)
+
+
+def is_enabled(level: str = "INFO") -> bool:
+    """
+    Retorna True se algum sink aceita mensagens desse nivel.
+
+    Serve para pular logs caros (um por input, por exemplo) quando ninguém vai ler.
+    O nivel minimo vem de um atributo interno do loguru (que também conta os sinks
+    adicionados fora do configure_logging); se ele não existir, retorna True e o
+    log é feito normalmente.
+    """
+    min_level = getattr(getattr(logger, "_core", None), "min_level", None)
+    if not isinstance(min_level, (int, float)):
+        return True
+    return min_level <= logger.level(level).no
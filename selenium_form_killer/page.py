@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Optional
+
+import httpx
+
+from selenium_form_killer.http_cache.http_cache import CACHE_STATUS
+from selenium_form_killer.parsers.backends import get_backend, get_soup_backend
+from selenium_form_killer.util.util import get_base_url, is_html_response
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+    from selenium_form_killer.forms import Form
+    from selenium_form_killer.killer import SeleniumKiller
+
+
+class Page:
+    """
+    Resultado de uma requisição, independente do estado do SeleniumKiller.
+
+    Guarda o response e faz o parse dos formularios só quando `forms` é acessado.
+    Varias paginas podem existir ao mesmo tempo usando a mesma sessão do killer.
+    """
+
+    __slots__ = ("_killer", "_response", "_forms", "_documents")
+
+    def __init__(
+        self,
+        killer: "SeleniumKiller",
+        response: httpx.Response,
+        forms: Optional[list["Form"]] = None,
+    ) -> None:
+        self._killer = killer
+        self._response = response
+        # Vem preenchido quando o response saiu do cache com os forms já extraidos.
+        self._forms: Optional[list["Form"]] = forms
+        self._documents: dict[str, Any] = {}
+
+    @property
+    def killer(self) -> "SeleniumKiller":
+        return self._killer
+
+    @property
+    def response(self) -> httpx.Response:
+        return self._response
+
+    @property
+    def request(self) -> httpx.Request:
+        return self._response.request
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self._response.headers
+
+    @property
+    def cookies(self) -> httpx.Cookies:
+        return self._response.cookies
+
+    @property
+    def url(self) -> str:
+        return str(self._response.url)
+
+    @property
+    def url_base(self) -> str:
+        return get_base_url(self.url)
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    @property
+    def forms(self) -> list["Form"]:
+        """Forms da pagina, extraidos no event loop; o aforms() usa o executor."""
+        if self._forms is None:
+            if not is_html_response(self._response):
+                self._forms = []
+            else:
+                backend = get_backend(self._killer.parser)
+                self._set_forms(
+                    self._killer._forms_from_document(
+                        self.document(backend.name), backend.name, self.url
+                    )
+                )
+        return self._forms
+
+    async def aforms(self) -> list["Form"]:
+        """
+        Igual ao `forms`, mas paginas grandes são processadas no executor do killer,
+        sem travar o event loop.
+        """
+        if self._forms is None:
+            forms = await self._killer._load_forms(self)
+            if self._forms is None:
+                self._set_forms(forms)
+        return self._forms
+
+    def _set_forms(self, forms: list["Form"]) -> None:
+        self._forms = forms
+        cache = getattr(self._killer, "cache", None)
+        if cache is not None and CACHE_STATUS in self._response.extensions:
+            cache.remember_forms(self.request, forms)
+
+    def document(self, parser: Optional[str] = None) -> Any:
+        """Documento parseado com o backend informado, em cache por parser."""
+        backend = get_backend(parser or self._killer.parser)
+        document = self._documents.get(backend.name)
+        if document is None:
+            document = backend.parse(self._response.text)
+            self._documents[backend.name] = document
+        return document
+
+    def soup(self, parser: Optional[str] = None) -> BeautifulSoup:
+        return self.document(get_soup_backend(parser or self._killer.parser).name)
+
+    def find(self, *args, parser: Optional[str] = None, **kwargs) -> BeautifulSoup:
+        return self.soup(parser).find(*args, **kwargs)
+
+    def find_all(
+        self, *args, parser: Optional[str] = None, **kwargs
+    ) -> list[BeautifulSoup]:
+        return self.soup(parser).find_all(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"<Page: url={self.url} status={self.status_code}>"
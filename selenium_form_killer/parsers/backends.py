@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+DEFAULT_PARSER = "html.parser"
+FORM_ELEMENT_TAGS = frozenset(("form", "input", "textarea", "select", "option", "button"))
+FORM_ELEMENTS_SELECTOR = ", ".join(sorted(FORM_ELEMENT_TAGS)) + ', [class*="captcha"]'
+FIELD_TAGS = ("input", "textarea", "select", "button")
+FIELDS_SELECTOR = ", ".join(FIELD_TAGS)
+
+
+def _is_form_element(tag: Any) -> bool:
+    if tag.name in FORM_ELEMENT_TAGS:
+        return True
+    classes = tag.attrs.get("class")
+    return bool(classes) and any("captcha" in value for value in classes)
+
+
+class ParserBackend(ABC):
+    """
+    Adaptador entre o SeleniumKiller e a biblioteca que faz o parse do HTML.
+
+    A extração de formularios só usa os metodos daqui, então qualquer backend
+    que implemente essa interface pode ser usado no lugar do html.parser.
+    """
+
+    name: str = ""
+    # Com True o extract_forms usa as buscas nativas por form (scan_forms) em vez do
+    # walk_forms, quando nenhum campo usa o atributo form=.
+    per_form_scan: bool = False
+
+    @abstractmethod
+    def parse(self, html: str) -> Any:
+        pass
+
+    @abstractmethod
+    def forms(self, document: Any) -> list[Any]:
+        pass
+
+    @abstractmethod
+    def inputs(self, form: Any) -> list[Any]:
+        pass
+
+    @abstractmethod
+    def captchas(self, form: Any) -> list[Any]:
+        pass
+
+    @abstractmethod
+    def get(self, node: Any, attribute: str, default: Optional[str] = None) -> Any:
+        pass
+
+    @abstractmethod
+    def fields(self, form: Any) -> list[Any]:
+        """input, textarea, select e button do form, na ordem do documento."""
+
+    @abstractmethod
+    def options(self, select: Any) -> list[Any]:
+        pass
+
+    @abstractmethod
+    def has_form_owners(self, document: Any) -> bool:
+        """True se algum elemento usa o atributo form=."""
+
+    # Usados pelo walk_forms, que extrai tudo numa passada só.
+
+    @abstractmethod
+    def form_elements(self, document: Any) -> list[Any]:
+        """Forms, campos, options e captchas do documento, na ordem em que aparecem."""
+
+    @abstractmethod
+    def tag(self, node: Any) -> str:
+        pass
+
+    @abstractmethod
+    def parent(self, node: Any) -> Any:
+        pass
+
+    @abstractmethod
+    def key(self, node: Any) -> Any:
+        """Identifica o elemento; dois objetos do mesmo elemento têm a mesma chave."""
+
+    @abstractmethod
+    def text(self, node: Any) -> str:
+        pass
+
+    @abstractmethod
+    def attributes(self, node: Any) -> dict[str, Any]:
+        """Atributos do elemento; atributo sem valor vem como "", igual ao get."""
+
+    @abstractmethod
+    def is_captcha(self, attributes: dict[str, Any]) -> bool:
+        """Recebe os atributos do elemento, como retornados por attributes()."""
+
+
+class BeautifulSoupBackend(ParserBackend):
+    def __init__(self, features: str = DEFAULT_PARSER) -> None:
+        from bs4 import BeautifulSoup
+
+        self.name = features
+        self.features = features
+        self._soup = BeautifulSoup
+
+    def parse(self, html: str) -> BeautifulSoup:
+        return self._soup(html, self.features)
+
+    def forms(self, document: BeautifulSoup) -> list[Any]:
+        return document.find_all("form")
+
+    def inputs(self, form: Any) -> list[Any]:
+        return form.find_all(["input", "textarea"])
+
+    def captchas(self, form: Any) -> list[Any]:
+        return form.find_all(class_=lambda value: value and "captcha" in value)
+
+    def get(self, node: Any, attribute: str, default: Optional[str] = None) -> Any:
+        return node.get(attribute, default)
+
+    def fields(self, form: Any) -> list[Any]:
+        return form.find_all(FIELD_TAGS)
+
+    def options(self, select: Any) -> list[Any]:
+        return select.find_all("option")
+
+    def has_form_owners(self, document: Any) -> bool:
+        return document.find(attrs={"form": True}) is not None
+
+    def form_elements(self, document: Any) -> list[Any]:
+        return document.find_all(_is_form_element)
+
+    def tag(self, node: Any) -> str:
+        return node.name
+
+    def parent(self, node: Any) -> Any:
+        return node.parent
+
+    def key(self, node: Any) -> Any:
+        return id(node)
+
+    def text(self, node: Any) -> str:
+        return node.get_text()
+
+    def attributes(self, node: Any) -> dict[str, Any]:
+        return node.attrs
+
+    def is_captcha(self, attributes: dict[str, Any]) -> bool:
+        # O bs4 entrega class como lista.
+        return any("captcha" in value for value in attributes.get("class", ()))
+
+
+class SelectolaxBackend(ParserBackend):
+    """Backend baseado no selectolax (lexbor). É o mais rapido, mas não gera BeautifulSoup."""
+
+    name = "selectolax"
+    # As buscas CSS do lexbor são nativas; andar pelos nós em Python sai mais caro.
+    per_form_scan = True
+
+    def __init__(self) -> None:
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError as error:
+            raise ImportError(
+                "O parser 'selectolax' precisa do pacote selectolax: pip install selectolax"
+            ) from error
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: str) -> Any:
+        return self._parser(html)
+
+    def forms(self, document: Any) -> list[Any]:
+        return document.css("form")
+
+    def inputs(self, form: Any) -> list[Any]:
+        return form.css("input, textarea")
+
+    def captchas(self, form: Any) -> list[Any]:
+        return form.css('[class*="captcha"]')
+
+    def get(self, node: Any, attribute: str, default: Optional[str] = None) -> Any:
+        attributes = node.attributes
+        if attribute not in attributes:
+            return default
+        # Atributo sem valor (<input value>) vem como None, o bs4 devolve "".
+        return attributes[attribute] or ""
+
+    def fields(self, form: Any) -> list[Any]:
+        return form.css(FIELDS_SELECTOR)
+
+    def options(self, select: Any) -> list[Any]:
+        return select.css("option")
+
+    def has_form_owners(self, document: Any) -> bool:
+        return document.css_first("[form]") is not None
+
+    def form_elements(self, document: Any) -> list[Any]:
+        return document.css(FORM_ELEMENTS_SELECTOR)
+
+    def tag(self, node: Any) -> str:
+        return node.tag
+
+    def parent(self, node: Any) -> Any:
+        return node.parent
+
+    def key(self, node: Any) -> Any:
+        # Cada acesso cria outro objeto Node; mem_id é o endereço do elemento.
+        return node.mem_id
+
+    def text(self, node: Any) -> str:
+        return node.text(deep=True)
+
+    def attributes(self, node: Any) -> dict[str, Any]:
+        attributes = node.attributes
+        if None in attributes.values():
+            return {
+                name: "" if value is None else value
+                for name, value in attributes.items()
+            }
+        return attributes
+
+    def is_captcha(self, attributes: dict[str, Any]) -> bool:
+        return "captcha" in attributes.get("class", "")
+
+
+PARSERS = {
+    "html.parser": lambda: BeautifulSoupBackend("html.parser"),
+    "lxml": lambda: BeautifulSoupBackend("lxml"),
+    "html5lib": lambda: BeautifulSoupBackend("html5lib"),
+    "selectolax": SelectolaxBackend,
+}
+
+_backends: dict[str, ParserBackend] = {}
+
+
+def get_backend(parser: Optional[str] = None) -> ParserBackend:
+    """
+    Retorna o backend registrado com o nome informado.
+
+    :param parser: "html.parser", "lxml", "html5lib" ou "selectolax"
+    """
+    parser = parser or DEFAULT_PARSER
+    backend = _backends.get(parser)
+    if backend is None:
+        try:
+            factory = PARSERS[parser]
+        except KeyError:
+            raise ValueError(
+                f"Parser desconhecido: {parser}. Use um destes: {', '.join(PARSERS)}"
+            ) from None
+        backend = _backends[parser] = factory()
+    return backend
+
+
+def get_soup_backend(parser: Optional[str] = None) -> BeautifulSoupBackend:
+    """Igual ao get_backend, mas parsers que não geram BeautifulSoup caem no html.parser."""
+    backend = get_backend(parser)
+    if not isinstance(backend, BeautifulSoupBackend):
+        backend = get_backend(DEFAULT_PARSER)
+    return backend
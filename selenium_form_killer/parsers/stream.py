@@ -0,0 +1,193 @@
+from html.parser import HTMLParser
+from typing import Optional
+
+from selenium_form_killer.types.generic_types import ActionTypes
+
+INPUT_TAGS = ("input", "textarea")
+SUBMIT_TYPES = ("submit", "image")
+
+
+def textarea_value(text: str) -> str:
+    # Como no navegador, a quebra de linha logo depois de <textarea> não conta.
+    return text[1:] if text.startswith("\n") else text
+
+
+def option_label(text: str) -> str:
+    """Valor de um <option> sem value: o texto com os espaços normalizados."""
+    return " ".join(text.split())
+
+
+def button_data(
+    name: Optional[str],
+    value: Optional[str],
+    type: Optional[str],
+    input: bool = False,
+) -> Optional[dict[str, Optional[str]]]:
+    """Dados do botão se ele envia o form; <button> sem type é submit."""
+    type = (type or ("text" if input else "submit")).lower()
+    if type not in SUBMIT_TYPES:
+        return None
+    return {"name": name, "value": value or "", "type": type}
+
+
+def select_inputs(
+    name: Optional[str], multiple: bool, options: list[tuple[str, bool]]
+) -> list[dict[str, Optional[str]]]:
+    """
+    Inputs enviados por um <select>: as opções selecionadas ou, num select simples
+    sem seleção, a primeira opção, como o navegador faz.
+    """
+    values = [value for value, selected in options if selected]
+    if not multiple:
+        values = values[-1:] or [value for value, _ in options[:1]]
+    return [{"name": name, "value": value, "type": "select"} for value in values]
+
+
+class StreamedForm:
+    """Dados de um formulario lido pelo FormStreamParser, ainda sem o killer associado."""
+
+    def __init__(self, actions: ActionTypes) -> None:
+        self.actions = actions
+        self.inputs: list[dict[str, Optional[str]]] = []
+        self.captcha: Optional[str] = None
+        self.button: Optional[dict[str, Optional[str]]] = None
+
+    def matches(self, target: dict[str, str]) -> bool:
+        return all(self.actions.get(key) == value for key, value in target.items())
+
+    def add_input(self, field: dict[str, Optional[str]]) -> None:
+        self.inputs.append(field)
+        if self.button is None:
+            self.button = button_data(
+                field["name"], field["value"], field["type"], input=True
+            )
+
+
+class FormStreamParser(HTMLParser):
+    """
+    Parser incremental de formularios.
+
+    Recebe o HTML em pedaços pelo feed() e guarda em `completed` cada formulario
+    assim que o </form> é lido, sem precisar do documento inteiro.
+    Segue as mesmas regras do extract_forms: input, textarea, select e button, e o
+    primeiro elemento com "captcha" na classe que tenha data-sitekey. Campos com
+    `form=` só entram se o form indicado ainda estiver aberto, porque os que já
+    fecharam foram entregues.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._open_forms: list[StreamedForm] = []
+        self.completed: list[StreamedForm] = []
+        # Sitekeys vistos desde o ultimo pop_sitekeys, antes do </form>.
+        self.sitekeys: list[str] = []
+        # Campo com texto ainda aberto: (form, tag, dados); o texto chega no handle_data.
+        self._text_field: Optional[tuple[StreamedForm, str, dict]] = None
+        self._select: Optional[tuple[StreamedForm, str, bool, list]] = None
+        self._option: Optional[list] = None
+
+    def _owner(self, attributes: dict[str, str]) -> Optional[StreamedForm]:
+        form_id = attributes.get("form")
+        if form_id:
+            for form in self._open_forms:
+                if form.actions["id"] == form_id:
+                    return form
+            return None
+        return self._open_forms[-1] if self._open_forms else None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        # Atributo sem valor vem como None, o bs4 trata como "".
+        attributes = {name: value if value is not None else "" for name, value in attrs}
+        if tag == "form":
+            self._open_forms.append(
+                StreamedForm(
+                    {
+                        "action": attributes.get("action"),
+                        "id": attributes.get("id"),
+                        "name": attributes.get("name"),
+                        "method": attributes.get("method"),
+                    }
+                )
+            )
+            return
+        if tag == "option":
+            if self._select is not None:
+                self._close_option()
+                self._option = [attributes.get("value"), "selected" in attributes, ""]
+            return
+        owner = self._owner(attributes)
+        if owner is not None:
+            if tag == "input":
+                owner.add_input(
+                    {
+                        "name": attributes.get("name"),
+                        "value": attributes.get("value", ""),
+                        "type": attributes.get("type") or "text",
+                    }
+                )
+            elif tag == "textarea":
+                field = {
+                    "name": attributes.get("name"),
+                    "value": "",
+                    "type": attributes.get("type") or "text",
+                }
+                self._text_field = (owner, tag, field)
+            elif tag == "select":
+                self._select = (owner, attributes.get("name"), "multiple" in attributes, [])
+            elif tag == "button":
+                if owner.button is None:
+                    owner.button = button_data(
+                        attributes.get("name"), attributes.get("value"), attributes.get("type")
+                    )
+        if "captcha" in attributes.get("class", "") and attributes.get("data-sitekey"):
+            self.sitekeys.append(attributes["data-sitekey"])
+            if self._open_forms and self._open_forms[-1].captcha is None:
+                self._open_forms[-1].captcha = attributes["data-sitekey"]
+
+    def handle_startendtag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag in ("textarea", "select", "option"):
+            self.handle_endtag(tag)
+
+    def handle_data(self, data: str) -> None:
+        if self._text_field is not None:
+            self._text_field[2]["value"] += data
+        elif self._option is not None:
+            self._option[2] += data
+
+    def _close_option(self) -> None:
+        if self._option is not None and self._select is not None:
+            value, selected, text = self._option
+            self._select[3].append((option_label(text) if value is None else value, selected))
+        self._option = None
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "textarea" and self._text_field is not None:
+            owner, _, field = self._text_field
+            field["value"] = textarea_value(field["value"])
+            owner.add_input(field)
+            self._text_field = None
+        elif tag == "option":
+            self._close_option()
+        elif tag == "select" and self._select is not None:
+            self._close_option()
+            owner, name, multiple, options = self._select
+            for field in select_inputs(name, multiple, options):
+                owner.inputs.append(field)
+            self._select = None
+        elif tag == "form" and self._open_forms:
+            self.completed.append(self._open_forms.pop())
+
+    def close(self) -> None:
+        super().close()
+        # Formularios sem </form> no fim do documento também contam, como no bs4.
+        while self._open_forms:
+            self.completed.append(self._open_forms.pop(0))
+
+    def pop_completed(self) -> list[StreamedForm]:
+        completed, self.completed = self.completed, []
+        return completed
+
+    def pop_sitekeys(self) -> list[str]:
+        sitekeys, self.sitekeys = self.sitekeys, []
+        return sitekeys
@@ -0,0 +1,206 @@
+from typing import Any, Optional, Union
+
+from selenium_form_killer.parsers.backends import ParserBackend, get_backend
+from selenium_form_killer.parsers.stream import (
+    StreamedForm,
+    button_data,
+    option_label,
+    select_inputs,
+    textarea_value,
+)
+
+
+class SelectRecord:
+    """Um <select> e as suas opções; vira input(s) só no fim do walk."""
+
+    __slots__ = ("name", "multiple", "options")
+
+    def __init__(self, name: Optional[str], multiple: bool) -> None:
+        self.name = name
+        self.multiple = multiple
+        # (value, selected)
+        self.options: list[tuple[str, bool]] = []
+
+
+def extract_streamed_forms(content: bytes, encoding: str, parser: str) -> list[StreamedForm]:
+    """
+    Decodifica, faz o parse e extrai os formularios de um corpo de response.
+
+    Só recebe e retorna objetos simples, então pode rodar num ProcessPoolExecutor.
+    """
+    backend = get_backend(parser)
+    html = content.decode(encoding or "utf-8", errors="replace")
+    return extract_forms(backend, backend.parse(html))
+
+
+def extract_forms(backend: ParserBackend, document: Any) -> list[StreamedForm]:
+    """
+    Extrai os formularios do documento pelo caminho mais rapido do backend.
+
+    Backends com buscas nativas (selectolax) fazem uma busca por form; os demais
+    percorrem o documento uma vez com o walk_forms. Se algum campo usa `form=`, o
+    walk_forms é usado sempre, porque só ele liga campos de fora ao form.
+    """
+    if backend.per_form_scan and not backend.has_form_owners(document):
+        return scan_forms(backend, document)
+    return walk_forms(backend, document)
+
+
+def scan_forms(backend: ParserBackend, document: Any) -> list[StreamedForm]:
+    """Uma busca de campos e uma de captcha por form. Ignora o atributo form=."""
+    return [scan_form(backend, form) for form in backend.forms(document)]
+
+
+def scan_form(backend: ParserBackend, node: Any) -> StreamedForm:
+    """Extrai um form só, com as mesmas regras do walk_forms para os campos dele."""
+    attributes_of = backend.attributes
+    attributes = attributes_of(node)
+    form = StreamedForm(form_actions(attributes))
+    for field in backend.fields(node):
+        tag = backend.tag(field)
+        attributes = attributes_of(field)
+        if tag == "select":
+            options = [option_entry(backend, option) for option in backend.options(field)]
+            form.inputs.extend(
+                select_inputs(attributes.get("name"), "multiple" in attributes, options)
+            )
+        elif tag == "button":
+            if form.button is None:
+                form.button = button_data(
+                    attributes.get("name"), attributes.get("value"), attributes.get("type")
+                )
+        else:
+            form.add_input(input_field(backend, field, tag, attributes))
+    for captcha in backend.captchas(node):
+        if sitekey := backend.get(captcha, "data-sitekey"):
+            form.captcha = sitekey
+            break
+    return form
+
+
+def form_actions(attributes: dict[str, Any]) -> dict[str, Optional[str]]:
+    return {
+        "action": attributes.get("action"),
+        "id": attributes.get("id"),
+        "name": attributes.get("name"),
+        "method": attributes.get("method"),
+    }
+
+
+def input_field(
+    backend: ParserBackend, node: Any, tag: str, attributes: dict[str, Any]
+) -> dict[str, Optional[str]]:
+    if tag == "textarea":
+        value = textarea_value(backend.text(node))
+    else:
+        value = attributes.get("value", "")
+    return {
+        "name": attributes.get("name"),
+        "value": value,
+        "type": attributes.get("type") or "text",
+    }
+
+
+def option_entry(backend: ParserBackend, node: Any) -> tuple[str, bool]:
+    attributes = backend.attributes(node)
+    value = attributes.get("value")
+    if value is None:
+        value = option_label(backend.text(node))
+    return value, "selected" in attributes
+
+
+def walk_forms(backend: ParserBackend, document: Any) -> list[StreamedForm]:
+    """
+    Extrai todos os formularios percorrendo o documento uma vez só.
+
+    O backend entrega, numa unica busca e na ordem do documento, os forms, os campos
+    (input, textarea, select, option e button) e os elementos de captcha. Cada campo
+    é ligado ao form que o contém ou ao form indicado no atributo `form=`, mesmo que
+    esteja fora dele, e entra no form na ordem do documento.
+    """
+    tag_of = backend.tag
+    parent_of = backend.parent
+    key_of = backend.key
+    attributes_of = backend.attributes
+    is_captcha = backend.is_captcha
+
+    forms: list[StreamedForm] = []
+    by_id: dict[str, StreamedForm] = {}
+    # Chave do elemento -> form que o contém (None fora de form), preenchido subindo
+    # pelos pais; irmãos e primos reaproveitam o caminho já visto.
+    owners: dict[Any, Optional[StreamedForm]] = {}
+    # O dono pode ser o id de um form que ainda não apareceu: resolvido no fim.
+    entries: list[tuple[Union[StreamedForm, str], str, Any]] = []
+    select_key: Any = None
+    select: Optional[SelectRecord] = None
+
+    def owner_of(node: Any) -> Optional[StreamedForm]:
+        visited = []
+        found = None
+        parent = parent_of(node)
+        while parent is not None:
+            key = key_of(parent)
+            if key in owners:
+                found = owners[key]
+                break
+            # Os forms entram em owners quando aparecem, antes dos seus campos.
+            visited.append(key)
+            parent = parent_of(parent)
+        for key in visited:
+            owners[key] = found
+        return found
+
+    for node in backend.form_elements(document):
+        tag = tag_of(node)
+        attributes = attributes_of(node)
+        if tag == "form":
+            form = StreamedForm(form_actions(attributes))
+            forms.append(form)
+            owners[key_of(node)] = form
+            if form.actions["id"]:
+                by_id.setdefault(form.actions["id"], form)
+            continue
+        if tag == "option":
+            # Opções de <datalist> ou fora de um <select> não contam.
+            if select is None:
+                continue
+            parent = parent_of(node)
+            if parent is not None and tag_of(parent) == "optgroup":
+                parent = parent_of(parent)
+            if parent is not None and key_of(parent) == select_key:
+                value = attributes.get("value")
+                if value is None:
+                    value = option_label(backend.text(node))
+                select.options.append((value, "selected" in attributes))
+            continue
+
+        if tag == "input" or tag == "textarea" or tag == "select" or tag == "button":
+            owner = attributes.get("form") or owner_of(node)
+            if owner is not None:
+                if tag == "input" or tag == "textarea":
+                    entries.append((owner, "input", input_field(backend, node, tag, attributes)))
+                elif tag == "select":
+                    select_key = key_of(node)
+                    select = SelectRecord(attributes.get("name"), "multiple" in attributes)
+                    entries.append((owner, "select", select))
+                else:
+                    button = button_data(
+                        attributes.get("name"), attributes.get("value"), attributes.get("type")
+                    )
+                    entries.append((owner, "button", button))
+        if is_captcha(attributes) and (sitekey := attributes.get("data-sitekey")):
+            form = owner_of(node)
+            if form is not None and form.captcha is None:
+                form.captcha = sitekey
+
+    for owner, kind, item in entries:
+        form = by_id.get(owner) if isinstance(owner, str) else owner
+        if form is None:
+            continue
+        if kind == "input":
+            form.add_input(item)
+        elif kind == "select":
+            form.inputs.extend(select_inputs(item.name, item.multiple, item.options))
+        elif form.button is None:
+            form.button = item
+    return forms
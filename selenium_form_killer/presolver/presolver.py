@@ -0,0 +1,186 @@
+import asyncio
+from collections import deque
+import re
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from loguru import logger
+
+# Recebe (sitekey, url da pagina) e retorna o token do captcha.
+Solver = Callable[[str, str], Awaitable[str]]
+Key = tuple[str, str]
+
+# Tokens do reCAPTCHA valem 120 segundos depois de gerados.
+TOKEN_TTL = 110.0
+SITEKEY_RE = re.compile(r"""data-sitekey\s*=\s*["']([^"']+)["']""")
+SITEKEY_BYTES_RE = re.compile(SITEKEY_RE.pattern.encode("ascii"))
+
+
+def find_sitekeys(html: str) -> list[str]:
+    """Sitekeys do HTML, sem repetir, na ordem em que aparecem."""
+    return list(dict.fromkeys(SITEKEY_RE.findall(html)))
+
+
+def find_sitekeys_in_bytes(content: bytes, encoding: Optional[str] = None) -> list[str]:
+    """
+    Igual ao find_sitekeys, mas direto no corpo do response, sem decodificar a
+    pagina inteira. Serve para encodings compativeis com ASCII (utf-8, latin-1, ...).
+    """
+    return list(
+        dict.fromkeys(
+            sitekey.decode(encoding or "utf-8", errors="replace")
+            for sitekey in SITEKEY_BYTES_RE.findall(content)
+        )
+    )
+
+
+class CaptchaPresolver:
+    """
+    Resolve captchas antes de o formulario ser enviado.
+
+    Assim que um sitekey aparece numa pagina (ou no meio de um stream) cuja url
+    contém um dos `prime_urls`, o killer chama `prime`, e a resolução começa em
+    segundo plano enquanto o resto do fluxo segue. Cada resolução é paga, então
+    nas outras paginas nada é resolvido antes: o token só é pedido no submit.
+    Para cada (sitekey, url) são mantidos `warm` tokens prontos ou em andamento; um
+    token que passou do `ttl` é descartado. O `Form.submit` usa um token pronto do
+    pool quando nenhum token é informado.
+
+    Keyword Arguments:
+        solver -- Coroutine que recebe (sitekey, url) e retorna o token
+        ttl -- Segundos que um token resolvido continua valido (default: {110})
+        warm -- Tokens mantidos por (sitekey, url) (default: {1})
+        field -- Campo do formulario que recebe o token (default: {"g-recaptcha-response"})
+        prime_urls -- Trechos de url das paginas em que o captcha começa a ser
+            resolvido ao carregar (default: {()}, nenhuma)
+
+    Example:
+        presolver = CaptchaPresolver(capmonster_solver(api_key), warm=2, prime_urls=["/login"])
+        killer = SeleniumKiller(presolver=presolver)
+    """
+
+    def __init__(
+        self,
+        solver: Solver,
+        ttl: float = TOKEN_TTL,
+        warm: int = 1,
+        field: str = "g-recaptcha-response",
+        prime_urls: Iterable[str] = (),
+    ) -> None:
+        self.solver = solver
+        self.ttl = ttl
+        self.warm = warm
+        self.field = field
+        self.prime_urls = tuple(prime_urls)
+        self._ready: dict[Key, deque[tuple[str, float]]] = {}
+        self._solving: dict[Key, set[asyncio.Task]] = {}
+
+    def should_prime(self, url: str) -> bool:
+        """Diz se os sitekeys da pagina começam a ser resolvidos quando ela carrega."""
+        return any(pattern in url for pattern in self.prime_urls)
+
+    def prime(self, sitekey: str, url: str) -> None:
+        """Começa a resolver em segundo plano até ter `warm` tokens para a chave."""
+        key = (sitekey, url)
+        missing = self.warm - self._available(key) - len(self._solving.get(key, ()))
+        for _ in range(missing):
+            self._start(key)
+
+    def take(self, sitekey: str, url: str) -> Optional[str]:
+        """Retorna um token pronto, ou None se não tiver nenhum."""
+        key = (sitekey, url)
+        self._discard_expired(key)
+        ready = self._ready.get(key)
+        if not ready:
+            return None
+        token, _ = ready.popleft()
+        # Repõe o que foi usado para o proximo envio.
+        if self.should_prime(url):
+            self.prime(sitekey, url)
+        return token
+
+    async def token(self, sitekey: str, url: str) -> str:
+        """Retorna um token pronto ou espera o que estiver mais perto de terminar."""
+        key = (sitekey, url)
+        while True:
+            token = self.take(sitekey, url)
+            if token is not None:
+                return token
+            solving = self._solving.get(key)
+            if not solving:
+                solving = {self._start(key)}
+            done, _ = await asyncio.wait(solving, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    raise task.exception()
+
+    def ready(self, sitekey: str, url: str) -> int:
+        """Quantidade de tokens prontos e validos para a chave."""
+        return self._available((sitekey, url))
+
+    async def aclose(self) -> None:
+        """Cancela as resoluções em andamento e fecha o solver, se ele tiver aclose."""
+        tasks = [task for tasks in self._solving.values() for task in tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._solving.clear()
+        self._ready.clear()
+        close = getattr(self.solver, "aclose", None)
+        if close is not None:
+            await close()
+
+    def _available(self, key: Key) -> int:
+        self._discard_expired(key)
+        return len(self._ready.get(key, ()))
+
+    def _discard_expired(self, key: Key) -> None:
+        ready = self._ready.get(key)
+        now = time.monotonic()
+        while ready and ready[0][1] <= now:
+            ready.popleft()
+
+    def _start(self, key: Key) -> asyncio.Task:
+        logger.debug("Presolving captcha sitekey: {} url: {}", *key)
+        task = asyncio.ensure_future(self._solve(key))
+        task.add_done_callback(_log_failure)
+        self._solving.setdefault(key, set()).add(task)
+        return task
+
+    async def _solve(self, key: Key) -> str:
+        # O prazo conta do inicio da resolução: o token nasce depois disso, então
+        # o ttl nunca passa da validade real.
+        started = time.monotonic()
+        try:
+            token = await self.solver(*key)
+        finally:
+            self._solving[key].discard(asyncio.current_task())
+        self._ready.setdefault(key, deque()).append((token, started + self.ttl))
+        return token
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    # Lê a exceção para o asyncio não reclamar de tarefas primed sem ninguém esperando.
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Captcha presolve failed: {!r}", task.exception())
+
+
+def capmonster_solver(
+    api_key: str, client_timeout: int = 30, **client_options: Any
+) -> Solver:
+    """
+    Solver de reCAPTCHA v2 pelo CapMonster, para usar no CaptchaPresolver.
+
+    Todas as resoluções usam o mesmo client (e as mesmas conexões), fechado pelo
+    `presolver.aclose()`. Os `client_options` vão para o CapMonster
+    (initial_delay, poll_interval, ...).
+    """
+    from selenium_form_killer.capmonster.captcha_breaker import CapMonster
+
+    capmonster = CapMonster(api_key, timeout=client_timeout, **client_options)
+
+    async def solve(sitekey: str, url: str) -> str:
+        return await capmonster.recaptcha_v2(sitekey, url)
+
+    solve.aclose = capmonster.aclose
+    return solve
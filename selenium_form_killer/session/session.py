@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Union
+import zlib
+
+import httpx
+
+from selenium_form_killer.browser.routing import HOP_HEADERS
+from selenium_form_killer.browser.state import to_browser_cookie, to_jar_cookie
+from selenium_form_killer.page import Page
+
+if TYPE_CHECKING:
+    from selenium_form_killer.killer import SeleniumKiller
+
+SESSION_VERSION = 1
+# Recebe o killer restaurado e diz se a sessão ainda vale.
+Probe = Union[str, Callable[["SeleniumKiller"], Awaitable[bool]]]
+# Refaz o login no killer (GET do form, captcha, POST das credenciais, ...).
+Relogin = Callable[["SeleniumKiller"], Awaitable[Any]]
+
+
+class SessionExpiredError(Exception):
+    pass
+
+
+def encode_session(data: dict[str, Any]) -> str:
+    """JSON compacto, comprimido com zlib e em base64 seguro para url."""
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(zlib.compress(raw, 9)).decode("ascii")
+
+
+def decode_session(blob: str) -> dict[str, Any]:
+    try:
+        data = json.loads(zlib.decompress(base64.urlsafe_b64decode(blob)))
+    except (binascii.Error, zlib.error, ValueError) as error:
+        raise ValueError("Sessão exportada invalida") from error
+    if data.get("v") != SESSION_VERSION:
+        raise ValueError(f"Versão da sessão não suportada: {data.get('v')}")
+    return data
+
+
+def snapshot(killer: "SeleniumKiller", content: bool = False) -> dict[str, Any]:
+    """
+    Cookies, headers da sessão, storage do navegador e o response atual sem o corpo.
+
+    Um `auth` da sessão (ex: o TokenAuth do afrom_auth_data) não pode ir no texto:
+    o killer restaurado ficaria com um Authorization fixo, que não é renovado.
+    """
+    if killer.session.auth is not None:
+        raise ValueError(
+            "Sessões com auth não podem ser exportadas; use o afrom_auth_data em cada worker"
+        )
+    data: dict[str, Any] = {
+        "v": SESSION_VERSION,
+        "cookies": [to_browser_cookie(cookie) for cookie in killer.session.cookies.jar],
+        "headers": dict(killer.session.headers),
+    }
+    if killer.browser_storage:
+        data["storage"] = killer.browser_storage
+    page = killer.page
+    if page is not None:
+        data["page"] = {
+            "method": page.request.method,
+            "url": page.url,
+            "status_code": page.status_code,
+            "headers": [
+                (key, value)
+                for key, value in page.headers.multi_items()
+                if key.lower() not in HOP_HEADERS
+            ],
+        }
+        if content:
+            data["page"]["text"] = page.text
+    return data
+
+
+def restore(killer: "SeleniumKiller", data: dict[str, Any]) -> None:
+    for cookie in data["cookies"]:
+        killer.session.cookies.jar.set_cookie(to_jar_cookie(cookie))
+    killer.browser_storage = data.get("storage", {})
+    page = data.get("page")
+    if page is not None:
+        response = httpx.Response(
+            page["status_code"],
+            headers=page["headers"],
+            content=page.get("text", "").encode("utf-8"),
+            request=httpx.Request(page["method"], page["url"]),
+        )
+        response.encoding = "utf-8"
+        killer.page = Page(killer, response)
+
+
+async def is_valid(killer: "SeleniumKiller", probe: Probe) -> bool:
+    """
+    Uma url de probe é valida se responde 2xx sem redirecionar (para o login).
+
+    O probe vai direto pela sessão, sem passar pelo cache HTTP e sem trocar o
+    `killer.page` restaurado.
+    """
+    if callable(probe):
+        return await probe(killer)
+    response = await killer.session.get(
+        probe, follow_redirects=False, headers={"Cache-Control": "no-cache"}
+    )
+    return 200 <= response.status_code < 300
@@ -0,0 +1,163 @@
+from html import unescape
+import re
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Optional
+
+from selenium_form_killer.util.util import join_url_action
+
+if TYPE_CHECKING:
+    from selenium_form_killer.forms import Form
+    from selenium_form_killer.killer import SeleniumKiller
+    from selenium_form_killer.page import Page
+
+ATTR_RE = re.compile(
+    r"""([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?"""
+)
+
+
+def dynamic_names(form: "Form") -> list[str]:
+    """Inputs hidden com valor, onde ficam CSRF, viewstate e afins."""
+    return [
+        input.name
+        for input in form.inputs
+        if input.name and input.value and (input.type or "").lower() == "hidden"
+    ]
+
+
+def tag_attributes(tag: str) -> dict[str, str]:
+    attributes: dict[str, str] = {}
+    # Pula o "<input" do inicio.
+    for match in ATTR_RE.finditer(tag, tag.find(" ")):
+        name, *values = match.groups()
+        value = next((value for value in values if value is not None), "")
+        attributes.setdefault(name.lower(), unescape(value))
+    return attributes
+
+
+class FormTemplate:
+    """
+    Formulario compilado para ser enviado muitas vezes sem extrair os forms de novo.
+
+    Os valores dos inputs são guardados uma vez. Os inputs dinamicos (por padrão os
+    hidden com valor: CSRF, viewstate, ...) são atualizados a cada pagina por uma
+    busca direcionada só por esses nomes no HTML, sem o parse do documento.
+
+    Keyword Arguments:
+        form -- Form de onde o template é compilado
+        dynamic -- Nomes dos inputs que mudam a cada pagina (default: hidden com valor)
+        killer -- Killer usado para buscar a pagina e enviar (default: o do form)
+
+    Example:
+        template = page.forms[0].compile()
+        for record in records:
+            await template.submit({"nome": record.nome})
+    """
+
+    def __init__(
+        self,
+        form: "Form",
+        dynamic: Optional[Iterable[str]] = None,
+        killer: Optional["SeleniumKiller"] = None,
+    ) -> None:
+        self.killer = killer or form.killer
+        self.page_url = form.url_base
+        self.url = join_url_action(form.url_base, form.action)
+        self.method = form.method or "GET"
+        self.captcha = form.captcha
+        self.id = form.id
+        self.dynamic = tuple(dynamic_names(form) if dynamic is None else dynamic)
+        self.static = {
+            input.name: input.value
+            for input in form.inputs
+            if input.name and input.name not in self.dynamic
+        }
+        self.values = {
+            input.name: input.value
+            for input in form.inputs
+            if input.name in self.dynamic
+        }
+        self._pattern = self._compile_pattern()
+
+    def _compile_pattern(self) -> Optional[re.Pattern]:
+        if not self.dynamic:
+            return None
+        names = "|".join(re.escape(name) for name in self.dynamic)
+        return re.compile(
+            rf"""<input\b[^>]*?\bname\s*=\s*["']?(?:{names})(?=["'\s/>])[^>]*>""",
+            re.IGNORECASE,
+        )
+
+    def _form_region(self, html: str) -> str:
+        # Com id, a busca fica dentro do <form> certo; varios forms podem ter um csrf.
+        if not self.id:
+            return html
+        start = re.search(
+            rf"""<form\b[^>]*\bid\s*=\s*["']?{re.escape(self.id)}(?=["'\s/>])""",
+            html,
+            re.IGNORECASE,
+        )
+        if start is None:
+            return html
+        end = html.find("</form", start.end())
+        return html[start.start() : end if end != -1 else len(html)]
+
+    def refresh(self, html: str) -> dict[str, str]:
+        """
+        Atualiza os valores dinamicos a partir do HTML de uma pagina nova.
+
+        Returns:
+            dict: Nome e valor dos inputs dinamicos encontrados.
+        """
+        if self._pattern is None:
+            return {}
+        found: dict[str, str] = {}
+        for match in self._pattern.finditer(self._form_region(html)):
+            attributes = tag_attributes(match.group())
+            name = attributes.get("name")
+            if name in self.dynamic and name not in found:
+                found[name] = attributes.get("value", "")
+        missing = [name for name in self.dynamic if name not in found]
+        if missing:
+            self.killer.logger.warning(
+                "Dynamic inputs not found, keeping previous values: {}", missing
+            )
+        self.values.update(found)
+        return found
+
+    async def fetch(self, url: Optional[str] = None, **kwargs: Any) -> "Page":
+        """Busca a pagina do formulario e atualiza os valores dinamicos."""
+        page = await self.killer.get(url or self.page_url, **kwargs)
+        self.refresh(page.text)
+        return page
+
+    def data(self, record: Optional[Mapping[str, Any]] = None) -> dict[str, Any]:
+        return {**self.static, **self.values, **(record or {})}
+
+    async def submit(
+        self,
+        record: Optional[Mapping[str, Any]] = None,
+        fetch: bool = True,
+        token: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ) -> "Page":
+        """
+        Envia o formulario com os dados do record por cima dos valores do template.
+
+        Keyword Arguments:
+            fetch -- Busca a pagina antes para pegar os valores dinamicos novos
+                (default: {True})
+            token -- Token do captcha; sem ele o presolver do killer é usado, se houver
+        """
+        if fetch:
+            await self.fetch()
+        data = self.data(record)
+        presolver = getattr(self.killer, "presolver", None)
+        if not token and self.captcha and presolver is not None:
+            token = {presolver.field: await presolver.token(self.captcha, self.page_url)}
+        if token:
+            data.update(token)
+        return await self.killer.send_request(
+            method=self.method, url=self.url, data=data, **kwargs
+        )
+
+    def __repr__(self) -> str:
+        return f"<FormTemplate: url={self.url} dynamic={list(self.dynamic)}>"
@@ -0,0 +1,72 @@
+from typing import Any, Optional
+
+import httpx
+
+
+class ConnectionPool:
+    """
+    Conexões HTTP compartilhadas entre varios SeleniumKiller.
+
+    Cada killer continua com os seus cookies e headers, mas as requisições saem
+    pelas mesmas conexões. Com http2=True varias requisições para o mesmo host são
+    multiplexadas numa conexão só, em vez de cada killer abrir a sua.
+
+    Keyword Arguments:
+        http2 -- Usa HTTP/2 quando o servidor aceita (precisa do pacote h2)
+        max_connections -- Maximo de conexões abertas ao mesmo tempo
+        max_keepalive_connections -- Maximo de conexões ociosas mantidas abertas
+        keepalive_expiry -- Segundos que uma conexão ociosa fica aberta
+        proxy -- Proxy usado por todas as conexões do pool
+        transport_options -- Repassados para o httpx.AsyncHTTPTransport
+
+    Example:
+        async with ConnectionPool(max_connections=20) as pool:
+            killers = [SeleniumKiller(pool=pool) for _ in range(100)]
+    """
+
+    def __init__(
+        self,
+        http2: bool = True,
+        max_connections: Optional[int] = 100,
+        max_keepalive_connections: Optional[int] = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        proxy: Optional[str] = None,
+        **transport_options: Any,
+    ) -> None:
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = httpx.AsyncHTTPTransport(
+            http2=http2, limits=self.limits, proxy=proxy, **transport_options
+        )
+        self.closed = False
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        """Transport para um httpx.AsyncClient. Fechar o client não fecha o pool."""
+        return SharedTransport(self._transport)
+
+    async def aclose(self) -> None:
+        if not self.closed:
+            self.closed = True
+            await self._transport.aclose()
+
+    async def __aenter__(self) -> "ConnectionPool":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    # O AsyncClient fecha o transport no aclose; aqui quem fecha é o pool.
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
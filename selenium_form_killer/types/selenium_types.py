@@ -1,11 +1,24 @@
+from __future__ import annotations
+
 from abc import ABC
-from typing import Any, Optional, Sequence
-from typing_extensions import Literal, Self
-from bs4 import BeautifulSoup
+import itertools
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable, Optional, Sequence
+from typing_extensions import Literal
 import httpx
 
 from selenium_form_killer.log.logger import get_logger
+from selenium_form_killer.parsers.backends import DEFAULT_PARSER
+from selenium_form_killer.transport.pool import ConnectionPool
 from selenium_form_killer.types.generic_types import ActionTypes
+from selenium_form_killer.util.cache import LRUCache
+from selenium_form_killer.util.encoding import Detector, EncodingResolver
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+    from selenium_form_killer.page import Page
+
+_killer_ids = itertools.count(1)
 
 
 class SeleniumKillerABC(ABC):
@@ -14,26 +27,33 @@ class SeleniumKillerABC(ABC):
         headers: dict[str, str] = {},
         verbose: bool = False,
         proxies: dict[str, str] = {},
+        html_cache_size: int = 16,
+        parser: str = DEFAULT_PARSER,
+        encoding_detector: Optional[Detector] = None,
+        log_file: Optional[str] = None,
+        pool: Optional[ConnectionPool] = None,
         **client_options: dict[str, Any],
     ) -> None:
-        self.url_base: Optional[str] = None
-        self.headers: Optional[dict[str, str]] = headers or {}
         self.data: Optional[str] = None
-        self.cookies: Optional[str] = None
-        self._response: Optional[httpx.Response] = None
-        self._forms: list[FormABC]
-        self.status_code: Optional[int] = None
-        self.request: Optional[httpx.Request] = None
-        self.session = httpx.AsyncClient(
-            headers=headers,
-            event_hooks={"request": [self._log_request]},
-            proxies=proxies,
-            **client_options,
+        # Pagina atual. response, forms, headers, cookies, status_code, request e
+        # url_base são lidos daqui.
+        self.page: Optional["Page"] = None
+        self.parser = parser
+        self._html_documents = LRUCache(maxsize=html_cache_size)
+        self.encoding_resolver = EncodingResolver(detector=encoding_detector)
+        self.pool = pool
+        if pool is not None:
+            if proxies:
+                raise ValueError(
+                    "Com pool o proxy deve ser configurado no ConnectionPool"
+                )
+            client_options.setdefault("transport", pool.transport())
+        else:
+            client_options.setdefault("proxies", proxies)
+        self.session = httpx.AsyncClient(headers=headers, **client_options)
+        self.logger = get_logger(
+            verbose, log_file=log_file, killer_id=next(_killer_ids), host=None
         )
-        self.logger = get_logger(verbose)
-    
-    async def _log_request(self, request: httpx.Request):
-        self.request = request
 
     @classmethod
     def from_auth_data(
@@ -41,18 +61,28 @@ class SeleniumKillerABC(ABC):
     ) -> "SeleniumKillerABC":
         pass
 
+    @classmethod
+    async def afrom_auth_data(
+        cls, url: str, payload: dict, key_token: Optional[str] = None, **killer_options: Any
+    ) -> "SeleniumKillerABC":
+        pass
+
     def __soup(self, html: Optional[str] = None) -> BeautifulSoup:
         pass
 
-    def find(self, *args, html: Optional[str] = None, **kwargs) -> BeautifulSoup:
+    def find(
+        self, *args, html: Optional[str] = None, parser: Optional[str] = None, **kwargs
+    ) -> BeautifulSoup:
         pass
 
     def find_all(
-        self, *args, html: Optional[str] = None, **kwargs
+        self, *args, html: Optional[str] = None, parser: Optional[str] = None, **kwargs
     ) -> list[BeautifulSoup]:
         pass
 
-    def soup(self, html: Optional[str] = None) -> BeautifulSoup:
+    def soup(
+        self, html: Optional[str] = None, parser: Optional[str] = None
+    ) -> BeautifulSoup:
         pass
 
     async def __aenter__(self):
@@ -85,7 +115,7 @@ class SeleniumKillerABC(ABC):
 
     async def send_request(
         self, method: Literal["GET", "POST"], url: str, **kwargs
-    ) -> Self:
+    ) -> "Page":
         pass
 
     
@@ -97,7 +127,30 @@ class SeleniumKillerABC(ABC):
         params: Optional[dict] = dict(),
         use_referer: bool = True,
         **kwargs,
-    ) -> Self:
+    ) -> "Page":
+        pass
+
+    
+    async def map_get(
+        self,
+        urls: Iterable[str],
+        concurrency: int = 50,
+        per_host: Optional[int] = None,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[Any]:
+        pass
+
+    
+    def iter_get(
+        self,
+        urls: Iterable[str],
+        concurrency: int = 50,
+        per_host: Optional[int] = None,
+        ordered: bool = False,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[Any]:
         pass
 
     
@@ -120,7 +173,7 @@ class SeleniumKillerABC(ABC):
         form: Optional["FormABC"] = False,
         exclude_forms: Optional[list["FormInputABC"]] = None,
         **kwargs,
-    ) -> Self:
+    ) -> "Page":
         pass
     
     
@@ -138,29 +191,48 @@ class SeleniumKillerABC(ABC):
         form: Optional["FormABC"] = False,
         exclude_forms: Optional[list["FormInputABC"]] = None,
         **httpx_options: dict[str, str],
-    ) -> httpx.Response:
+    ) -> "Page":
         pass
 
     
-    def extract_inputs(self, formulario: BeautifulSoup) -> list["FormInputABC"]:
+    def extract_inputs(
+        self, formulario: BeautifulSoup, parser: Optional[str] = None
+    ) -> list["FormInputABC"]:
         pass
 
     
-    def extract_actions(self, formulario: BeautifulSoup) -> ActionTypes:
+    def extract_actions(
+        self, formulario: BeautifulSoup, parser: Optional[str] = None
+    ) -> ActionTypes:
         pass
 
     
-    def extract_captcha(self, formulario: BeautifulSoup) -> str | None:
+    def extract_captcha(
+        self, formulario: BeautifulSoup, parser: Optional[str] = None
+    ) -> str | None:
         pass
 
      
-    def extract_forms(self, html: Optional[str] = None) -> Sequence["FormABC"]:
+    def extract_forms(
+        self, html: Optional[str] = None, parser: Optional[str] = None
+    ) -> Sequence["FormABC"]:
         pass
 
     
     def extract_form(self, html: Optional[str] = None) -> "FormABC":
         pass
 
+    
+    async def stream_forms(
+        self,
+        url: str,
+        method: Literal["GET", "POST"] = "GET",
+        stop_at: Optional[dict[str, str]] = None,
+        chunk_size: int = 16384,
+        **kwargs,
+    ) -> AsyncIterator["FormABC"]:
+        pass
+
      
     async def save_html(self, name: str) -> None:
         pass
@@ -184,6 +256,17 @@ class SeleniumKillerABC(ABC):
 
 
 class FormABC(ABC):
+    __slots__ = (
+        "inputs",
+        "action",
+        "method",
+        "id",
+        "name",
+        "button",
+        "captcha",
+        "url_base",
+    )
+
     def __init__(
         self,
         killer: "SeleniumKillerABC",
@@ -204,7 +287,6 @@ class FormABC(ABC):
         self.button = button
         self.captcha = captcha
         self.url_base = url_base
-        self.__killer = killer
 
     def pretty_print(self) -> None:
         pass
@@ -232,11 +314,14 @@ class FormABC(ABC):
         input_data: str | list["FormInputABC"] | list[int] | None = "all",
         input_query_params: str | list["FormInputABC"] | list[int] | None = None,
         **kwargs,
-    ) -> "SeleniumKillerABC":
+    ) -> "Page":
         pass
 
 
 class FormInputABC(ABC):
+    # Milhares de inputs por pagina: sem __dict__ cada um ocupa bem menos memoria.
+    __slots__ = ("type", "name", "value")
+
     def __init__(self, name: str, value: str, type: str = "text") -> None:
         self.type = type
         self.name = name
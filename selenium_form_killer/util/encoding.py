@@ -0,0 +1,133 @@
+import codecs
+import re
+from email.message import Message
+from typing import Callable, Optional
+
+from selenium_form_killer.util.cache import LRUCache
+
+DEFAULT_ENCODING = "utf-8"
+META_SCAN_BYTES = 4096
+DETECT_SAMPLE_BYTES = 64 * 1024
+
+# Os BOMs de UTF-32 começam com os mesmos bytes do UTF-16, por isso vêm primeiro.
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+META_CHARSET = re.compile(
+    rb"""<meta[^>]+?charset\s*=\s*["']?\s*([a-zA-Z0-9_:.\-]+)""", re.IGNORECASE
+)
+TEXT_CONTENT_TYPES = ("text/", "application/xhtml+xml", "application/xml")
+# Uma amostra só com ASCII não diz nada sobre o resto do corpo (um <head> grande de
+# scripts, por exemplo): nesse caso vale o UTF-8, que também decodifica o ASCII.
+UNDECIDED_ENCODINGS = ("ascii",)
+
+Detector = Callable[[bytes], Optional[str]]
+
+
+def valid_encoding(encoding: Optional[str]) -> Optional[str]:
+    if not encoding:
+        return None
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
+
+
+def header_encoding(content_type: Optional[str]) -> Optional[str]:
+    if not content_type:
+        return None
+    message = Message()
+    message["content-type"] = content_type
+    return valid_encoding(message.get_param("charset"))
+
+
+def bom_encoding(content: bytes) -> Optional[str]:
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding
+    return None
+
+
+def meta_encoding(content: bytes, limit: int = META_SCAN_BYTES) -> Optional[str]:
+    match = META_CHARSET.search(content, 0, limit)
+    if match:
+        return valid_encoding(match.group(1).decode("ascii"))
+    return None
+
+
+def default_detector() -> Detector:
+    """
+    Retorna o detector mais rapido instalado: charset-normalizer, cchardet ou chardet.
+    """
+    try:
+        from charset_normalizer import from_bytes
+
+        def detect(sample: bytes) -> Optional[str]:
+            best = from_bytes(sample).best()
+            return best.encoding if best else None
+
+        return detect
+    except ImportError:
+        pass
+    try:
+        import cchardet as chardet
+    except ImportError:
+        import chardet
+    return lambda sample: chardet.detect(sample)["encoding"]
+
+
+class EncodingResolver:
+    """
+    Descobre o encoding de um response sem ler o corpo inteiro.
+
+    A ordem é: charset do Content-Type, BOM, <meta charset> nos primeiros KB e só
+    então o detector, rodando sobre uma amostra do corpo. O resultado do detector
+    fica em cache por host, então as proximas paginas do mesmo site não passam por ele.
+    Quando a amostra é só ASCII o detector não decide nada: a pagina usa UTF-8 e o
+    host não entra no cache.
+    """
+
+    def __init__(
+        self,
+        detector: Optional[Detector] = None,
+        sample_size: int = DETECT_SAMPLE_BYTES,
+        max_hosts: int = 1024,
+    ) -> None:
+        self._detector = detector
+        self.sample_size = sample_size
+        self.hosts = LRUCache(maxsize=max_hosts)
+
+    @property
+    def detector(self) -> Detector:
+        if self._detector is None:
+            self._detector = default_detector()
+        return self._detector
+
+    def resolve(
+        self,
+        content: bytes,
+        content_type: Optional[str] = None,
+        host: Optional[str] = None,
+    ) -> str:
+        encoding = header_encoding(content_type) or bom_encoding(content)
+        if encoding:
+            return encoding
+        if content_type and not content_type.lower().startswith(TEXT_CONTENT_TYPES):
+            # JSON e downloads não têm <meta> e o detector só iria chutar.
+            return DEFAULT_ENCODING
+        encoding = meta_encoding(content)
+        if encoding:
+            return encoding
+        encoding = self.hosts.get(host) if host else None
+        if encoding:
+            return encoding
+        encoding = valid_encoding(self.detector(content[: self.sample_size]))
+        if not encoding or encoding in UNDECIDED_ENCODINGS:
+            return DEFAULT_ENCODING
+        if host:
+            self.hosts.set(host, encoding)
+        return encoding
@@ -8,3 +8,17 @@ def get_base_url(url):
 
 def join_url_action(url, action):
     return urljoin(url, action)
+
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+def is_html_response(response):
+    """Retorna True se o response pode conter formularios HTML.
+
+    Responses sem Content-Type (ex: o HTML gerado pelo render) são tratados como HTML.
+    """
+    content_type = response.headers.get("content-type")
+    if not content_type:
+        return True
+    return content_type.split(";", 1)[0].strip().lower() in HTML_CONTENT_TYPES
@@ -0,0 +1,21 @@
+import httpx
+import pytest
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    def __init__(self, content: bytes, chunk_size: int = 64) -> None:
+        self.chunks = [
+            content[i : i + chunk_size] for i in range(0, len(content), chunk_size)
+        ]
+        self.sent = 0
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield chunk
+
+
+@pytest.fixture
+def chunked_stream():
+    """Corpo de response entregue em pedaços, para testar o stream_forms."""
+    return ChunkedStream
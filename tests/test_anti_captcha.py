@@ -1,9 +1,19 @@
+import asyncio
+import itertools
+import json
 import os
+import time
 
+import httpx
 import pytest
 from dotenv import load_dotenv
 
-from selenium_form_killer.anti_captcha.anti_captcha import AntiCaptcha
+from selenium_form_killer.anti_captcha.anti_captcha import (
+    AntiCaptcha,
+    AntiCaptchaError,
+)
+from selenium_form_killer.capmonster.captcha_breaker import captcha_token
+from selenium_form_killer.presolver.presolver import CaptchaPresolver, capmonster_solver
 
 load_dotenv()
 
@@ -13,3 +23,184 @@ async def test_captcha():
     anti_captcha = AntiCaptcha(os.getenv("API_KEY"))
     balance = await anti_captcha.get_balance()
     assert isinstance(balance, float)
+
+
+def task_result_responses(ready_after: dict[int, int]):
+    # Cada taskId fica "processing" até a consulta numero ready_after[task_id].
+    calls: dict[int, int] = {}
+
+    def side_effect(request):
+        task_id = json.loads(request.content)["taskId"]
+        calls[task_id] = calls.get(task_id, 0) + 1
+        if calls[task_id] >= ready_after[task_id]:
+            return httpx.Response(
+                200, json={"status": "ready", "solution": {"text": f"texto{task_id}"}}
+            )
+        return httpx.Response(200, json={"status": "processing"})
+
+    return side_effect
+
+
+@pytest.mark.respx(base_url="https://api.anti-captcha.com")
+async def test_solve_many_reaproveita_o_client(respx_mock):
+    task_ids = iter([1, 2])
+    respx_mock.post("/createTask").mock(
+        side_effect=lambda request: httpx.Response(200, json={"taskId": next(task_ids)})
+    )
+    respx_mock.post("/getTaskResult").mock(
+        side_effect=task_result_responses({1: 1, 2: 2})
+    )
+    anti_captcha = AntiCaptcha("chave", initial_delay=0, poll_interval=0.01)
+    async with anti_captcha:
+        client = anti_captcha.client
+        assert await anti_captcha.solve_many(["img1", "img2"]) == ["texto1", "texto2"]
+        assert anti_captcha.client is client
+    assert client.is_closed
+
+
+@pytest.mark.respx(base_url="https://api.anti-captcha.com")
+async def test_solve_many_return_exceptions(respx_mock):
+    respx_mock.post("/createTask").mock(
+        side_effect=itertools.cycle(
+            [httpx.Response(200, json={"taskId": 1}), httpx.ConnectError("falhou")]
+        )
+    )
+    respx_mock.post("/getTaskResult").mock(side_effect=task_result_responses({1: 1}))
+    anti_captcha = AntiCaptcha("chave", initial_delay=0, poll_interval=0.01)
+    async with anti_captcha:
+        texto, erro = await anti_captcha.solve_many(
+            ["img1", "img2"], return_exceptions=True
+        )
+        assert texto == "texto1"
+        assert isinstance(erro, httpx.ConnectError)
+        with pytest.raises(httpx.ConnectError):
+            await anti_captcha.solve_many(["img1", "img2"])
+
+
+@pytest.mark.respx(base_url="https://api.anti-captcha.com")
+async def test_solver_espera_o_atraso_inicial_e_aumenta_o_intervalo(respx_mock):
+    respx_mock.post("/createTask").mock(
+        return_value=httpx.Response(200, json={"taskId": 1})
+    )
+    route = respx_mock.post("/getTaskResult").mock(
+        side_effect=task_result_responses({1: 4})
+    )
+    anti_captcha = AntiCaptcha(
+        "chave", initial_delay=0.05, poll_interval=0.02, max_interval=0.1
+    )
+    inicio = time.monotonic()
+    # ready_wait float era passado para range() e quebrava.
+    assert await anti_captcha.solver("img", ready_wait=5.0) == "texto1"
+    # Atraso inicial + 3 intervalos crescentes (0.02, 0.03, 0.045) com jitter de 20%.
+    assert time.monotonic() - inicio >= 0.05 + 0.8 * (0.02 + 0.03 + 0.045)
+    assert route.call_count == 4
+    await anti_captcha.aclose()
+
+
+@pytest.mark.respx(base_url="https://api.anti-captcha.com")
+async def test_solver_respeita_o_prazo(respx_mock):
+    respx_mock.post("/createTask").mock(
+        return_value=httpx.Response(200, json={"taskId": 1})
+    )
+    respx_mock.post("/getTaskResult").mock(
+        return_value=httpx.Response(200, json={"errorId": 0, "status": "processing"})
+    )
+    anti_captcha = AntiCaptcha("chave", initial_delay=0, poll_interval=0.01)
+    async with anti_captcha:
+        inicio = time.monotonic()
+        with pytest.raises(TimeoutError):
+            await anti_captcha.solver("img", ready_wait=0.1)
+        assert time.monotonic() - inicio < 1
+
+
+@pytest.mark.respx(base_url="https://api.anti-captcha.com")
+async def test_um_unico_poller_para_varias_tarefas(respx_mock):
+    task_ids = itertools.count(1)
+    respx_mock.post("/createTask").mock(
+        side_effect=lambda request: httpx.Response(200, json={"taskId": next(task_ids)})
+    )
+    respx_mock.post("/getTaskResult").mock(
+        side_effect=task_result_responses({task_id: 3 for task_id in range(1, 21)})
+    )
+    anti_captcha = AntiCaptcha("chave", initial_delay=0.02, poll_interval=0.01)
+    async with anti_captcha:
+        poller = anti_captcha.poller
+        solving = asyncio.ensure_future(anti_captcha.solve_many(["img"] * 20))
+        await asyncio.sleep(0.01)
+        task = poller._task
+        textos = await solving
+        assert textos == [f"texto{task_id}" for task_id in range(1, 21)]
+        assert poller._task is task
+        assert poller.requests == 60
+
+
+@pytest.mark.respx(base_url="https://api.anti-captcha.com")
+async def test_erro_da_api_vira_anti_captcha_error(respx_mock):
+    respx_mock.post("/createTask").mock(
+        return_value=httpx.Response(200, json={"taskId": 1})
+    )
+    respx_mock.post("/getTaskResult").mock(
+        return_value=httpx.Response(
+            200, json={"errorId": 16, "errorDescription": "Task not found"}
+        )
+    )
+    async with AntiCaptcha("chave", initial_delay=0) as anti_captcha:
+        with pytest.raises(AntiCaptchaError, match="Task not found"):
+            await anti_captcha.solver("img")
+
+
+@pytest.mark.respx(base_url="https://api.capmonster.cloud")
+async def test_capmonster_reaproveita_o_client(respx_mock):
+    task_ids = itertools.count(1)
+    create = respx_mock.post("/createTask").mock(
+        side_effect=lambda request: httpx.Response(200, json={"taskId": next(task_ids)})
+    )
+    respx_mock.post("/getTaskResult").mock(
+        side_effect=lambda request: httpx.Response(
+            200,
+            json={
+                "status": "ready",
+                "solution": {
+                    "gRecaptchaResponse": f"token{json.loads(request.content)['taskId']}"
+                },
+            },
+        )
+    )
+    solver = capmonster_solver("chave", initial_delay=0)
+    presolver = CaptchaPresolver(solver, warm=2)
+    presolver.prime("chave-do-site", "https://foo.bar/login")
+    tokens = await asyncio.gather(
+        *(presolver.token("chave-do-site", "https://foo.bar/login") for _ in range(2))
+    )
+    assert sorted(tokens) == ["token1", "token2"]
+    task = json.loads(create.calls.last.request.content)["task"]
+    assert task == {
+        "type": "RecaptchaV2Task",
+        "websiteURL": "https://foo.bar/login",
+        "websiteKey": "chave-do-site",
+    }
+
+    # As duas resoluções usaram o mesmo client, fechado junto com o presolver.
+    capmonster = solver.aclose.__self__
+    client = capmonster.client
+    assert all(call.request.url.host == "api.capmonster.cloud" for call in create.calls)
+    await presolver.aclose()
+    assert client.is_closed
+    assert capmonster.poller._task is None
+
+
+@pytest.mark.respx(base_url="https://api.capmonster.cloud")
+async def test_captcha_token_usa_o_request_do_capmonstercloudclient(respx_mock):
+    respx_mock.post("/createTask").mock(return_value=httpx.Response(200, json={"taskId": 7}))
+    respx_mock.post("/getTaskResult").mock(
+        return_value=httpx.Response(
+            200, json={"status": "ready", "solution": {"gRecaptchaResponse": "token"}}
+        )
+    )
+
+    class Request:
+        def getTaskDict(self):
+            return {"type": "RecaptchaV2Task", "websiteURL": "u", "websiteKey": "k"}
+
+    solution = await captcha_token(Request(), "chave", initial_delay=0)
+    assert solution == {"gRecaptchaResponse": "token"}
@@ -0,0 +1,148 @@
+import asyncio
+
+import httpx
+import pytest
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.auth.auth import TokenCache, credentials_key
+from selenium_form_killer.transport.pool import ConnectionPool
+
+PAYLOAD = {"username": "test", "password": "test"}
+
+
+def test_chave_usa_hash_das_credenciais():
+    key = credentials_key("https://foo.bar/auth", PAYLOAD, "access_token")
+    assert "test" not in key.split("#")[1]
+    assert key != credentials_key("https://foo.bar/auth", {**PAYLOAD, "password": "x"}, "access_token")
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_200_workers_fazem_um_login_so(respx_mock):
+    async def login(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"access_token": "abc", "expires_in": 3600})
+
+    route = respx_mock.post("/auth").mock(side_effect=login)
+    tokens = TokenCache()
+    pool = ConnectionPool()
+
+    killers = await asyncio.gather(
+        *(
+            SeleniumKiller.afrom_auth_data(
+                "https://foo.bar/auth",
+                PAYLOAD,
+                token_cache=tokens,
+                pool=pool,
+                verbose=False,
+            )
+            for _ in range(200)
+        )
+    )
+
+    assert route.call_count == 1
+    assert tokens.logins == 1
+    assert all(killer.headers["Authorization"] == "Bearer abc" for killer in killers)
+    await asyncio.gather(*(killer.close() for killer in killers))
+    await pool.aclose()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_renova_antes_de_expirar_sem_bloquear(respx_mock):
+    route = respx_mock.post("/auth").mock(
+        side_effect=[
+            httpx.Response(200, json={"access_token": "velho", "expires_in": 0.4}),
+            httpx.Response(200, json={"access_token": "novo", "expires_in": 3600}),
+        ]
+    )
+    api = respx_mock.get("/api").mock(return_value=httpx.Response(200, json={}))
+    tokens = TokenCache(refresh_margin=30)
+
+    async with await SeleniumKiller.afrom_auth_data(
+        "https://foo.bar/auth", PAYLOAD, token_cache=tokens, verbose=False
+    ) as killer:
+        # A margem é maior que a validade: a renovação começa na metade dela.
+        await asyncio.sleep(0.25)
+        await killer.get("https://foo.bar/api")
+        # O token velho ainda vale, então é usado enquanto o novo é buscado.
+        assert api.calls.last.request.headers["Authorization"] == "Bearer velho"
+        await asyncio.sleep(0.01)
+        await killer.get("https://foo.bar/api")
+
+    assert route.call_count == 2
+    assert api.calls.last.request.headers["Authorization"] == "Bearer novo"
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_401_refaz_o_login_e_repete_o_request(respx_mock):
+    respx_mock.post("/auth").mock(
+        side_effect=[
+            httpx.Response(200, json={"access_token": "revogado"}),
+            httpx.Response(200, json={"access_token": "novo"}),
+        ]
+    )
+    api = respx_mock.get("/api").mock(
+        side_effect=lambda request: httpx.Response(
+            200 if request.headers["Authorization"] == "Bearer novo" else 401
+        )
+    )
+    pool = ConnectionPool()
+
+    async with await SeleniumKiller.afrom_auth_data(
+        "https://foo.bar/auth",
+        PAYLOAD,
+        token_cache=TokenCache(),
+        pool=pool,
+        verbose=False,
+    ) as killer:
+        page = await killer.get("https://foo.bar/api")
+
+    assert page.status_code == 200
+    assert api.call_count == 2
+    await pool.aclose()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_afrom_auth_data_falha(respx_mock):
+    respx_mock.post("/auth").mock(return_value=httpx.Response(401))
+    with pytest.raises(httpx.HTTPStatusError):
+        await SeleniumKiller.afrom_auth_data(
+            "https://foo.bar/auth", PAYLOAD, token_cache=TokenCache()
+        )
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_margem_maior_que_a_validade_nao_refaz_o_login(respx_mock):
+    route = respx_mock.post("/auth").mock(
+        return_value=httpx.Response(200, json={"access_token": "abc", "expires_in": 10})
+    )
+    tokens = TokenCache(refresh_margin=30)
+
+    for _ in range(20):
+        assert await tokens.token("https://foo.bar/auth", PAYLOAD) == "abc"
+        await asyncio.sleep(0)
+
+    assert route.call_count == 1
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+def test_login_de_um_loop_fechado_nao_trava_o_proximo(respx_mock):
+    respx_mock.post("/auth").mock(
+        return_value=httpx.Response(200, json={"access_token": "abc"})
+    )
+    tokens = TokenCache()
+
+    async def never(*args):
+        await asyncio.Event().wait()
+
+    # O primeiro loop fecha com o login ainda em andamento.
+    loop = asyncio.new_event_loop()
+    tokens._fetch = never
+    with pytest.raises(asyncio.TimeoutError):
+        loop.run_until_complete(
+            asyncio.wait_for(tokens.token("https://foo.bar/auth", PAYLOAD), 0.001)
+        )
+    loop.close()
+    del tokens._fetch
+
+    assert asyncio.run(tokens.token("https://foo.bar/auth", PAYLOAD)) == "abc"
+    assert not tokens._inflight
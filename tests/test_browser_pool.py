@@ -0,0 +1,424 @@
+import httpx
+import playwright.async_api as playwright_api
+import pytest
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.browser.pool import BrowserPool
+from selenium_form_killer.browser.routing import RoutePolicy
+from selenium_form_killer.browser.state import STORAGE_SCRIPT
+from selenium_form_killer.browser.wait import wait_for_page
+
+
+class FakeRequest:
+    def __init__(self, page, url, resource_type="document", navigation=False):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = "GET"
+        self.headers = {"accept": "*/*"}
+        self.post_data_buffer = None
+        self.frame = page.main_frame
+        self._navigation = navigation
+
+    def is_navigation_request(self):
+        return self._navigation
+
+
+class FakeAPIResponse:
+    async def body(self):
+        return b"x" * 10
+
+
+class FakeRoute:
+    def __init__(self, page, request):
+        self.page = page
+        self.request = request
+
+    async def fulfill(self, response=None, status=200, headers=None, body=b""):
+        self.page.fulfilled.append((self.request.url, body))
+        if self.request.resource_type == "document":
+            self.page.html = body.decode()
+
+    async def abort(self, reason):
+        self.page.aborted.append(self.request.url)
+
+    async def fetch(self):
+        if "falha" in self.request.url:
+            raise PlaywrightTimeoutError("timeout")
+        return FakeAPIResponse()
+
+
+class FakePage:
+    subresources = []
+
+    def __init__(self, context):
+        self.context = context
+        self.main_frame = object()
+        self.html = ""
+        self.waited = []
+        self.fulfilled = []
+        self.aborted = []
+        self.listeners = {}
+        self.timeouts = []
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+    def on(self, event, callback):
+        self.listeners.setdefault(event, []).append(callback)
+
+    def navigated(self, url):
+        self.url = url
+        frame = type("FakeFrame", (), {"url": url})()
+        for callback in self.listeners.get("framenavigated", []):
+            callback(frame)
+
+    async def evaluate(self, script):
+        return {"localStorage": dict(self.context.storage), "sessionStorage": {}}
+
+    async def fill(self, selector, value, timeout=None):
+        self.timeouts.append(("fill", timeout))
+        self.context.storage[selector] = value
+
+    def expect_navigation(self, wait_until=None, timeout=None):
+        self.timeouts.append(("navigation", timeout))
+        return FakeEvent()
+
+    def expect_response(self, url_or_predicate, timeout=None):
+        self.timeouts.append(("response", timeout))
+        return FakeEvent(fail=url_or_predicate == "**/nunca")
+
+    async def click(self, selector, timeout=None):
+        self.timeouts.append(("click", timeout))
+        self.url = "https://foo.bar/logado"
+        self.html = f"<html><body><p>{selector}</p></body></html>"
+        self.context.storage["token"] = "abc"
+        await self.context.add_cookies(
+            [{"name": "sessao", "value": "1", "domain": "foo.bar", "path": "/"}]
+        )
+
+    async def goto(self, url, wait_until=None):
+        self.navigated(url)
+        await self.handler(FakeRoute(self, FakeRequest(self, url, navigation=True)))
+        for sub_url, resource_type in self.subresources:
+            await self.handler(FakeRoute(self, FakeRequest(self, sub_url, resource_type)))
+
+    async def wait_for_timeout(self, timeout):
+        self.waited.append(("timeout", timeout))
+
+    async def wait_for_load_state(self, state, timeout):
+        self.waited.append((state, timeout))
+
+    async def wait_for_selector(self, selector, timeout):
+        if selector == "#nunca":
+            raise PlaywrightTimeoutError("timeout")
+        self.waited.append((selector, timeout))
+
+    async def wait_for_function(self, expression, arg=None, timeout=None):
+        self.waited.append((expression, arg))
+
+    async def content(self):
+        return self.html.replace("</body>", "<form id='js'></form></body>")
+
+    async def close(self):
+        pass
+
+
+class FakeEvent:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # Como no playwright: a saída do bloco espera o evento.
+        if exc_type is None and self.fail:
+            raise PlaywrightTimeoutError("timeout")
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+        self._cookies = []
+        self.storage = {}
+        self.cleared_origins = []
+        self.pages = []
+        self.permissions_cleared = False
+
+    async def cookies(self):
+        return self._cookies
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def add_cookies(self, cookies):
+        self._cookies.extend(cookies)
+
+    async def clear_cookies(self):
+        self._cookies = []
+
+    async def clear_permissions(self):
+        self.permissions_cleared = True
+
+    async def new_cdp_session(self, page):
+        return FakeCDPSession(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeCDPSession:
+    def __init__(self, context):
+        self.context = context
+
+    async def send(self, method, params):
+        self.context.cleared_origins.append(params["origin"])
+        self.context.storage = {}
+
+    async def detach(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    def is_connected(self):
+        return not self.closed
+
+    async def new_context(self, **options):
+        context = FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.browsers = []
+        self.chromium = self
+        self.stopped = False
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+    async def start(self):
+        return self
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    fake = FakePlaywright()
+    monkeypatch.setattr(playwright_api, "async_playwright", lambda: fake)
+    return fake
+
+
+async def test_pool_reaproveita_navegador_e_contextos(playwright):
+    pool = BrowserPool(max_context_uses=2)
+    for _ in range(3):
+        async with pool.page() as page:
+            await page.context.add_cookies([{"name": "a"}])
+    assert len(playwright.browsers) == 1
+    contexts = playwright.browsers[0].contexts
+    assert len(contexts) == 2
+    assert contexts[0].closed
+    assert contexts[1]._cookies == []
+    await pool.close()
+    assert playwright.browsers[0].closed
+    assert playwright.stopped
+
+
+async def test_pool_nao_passa_storage_para_a_proxima_tarefa(playwright):
+    pool = BrowserPool()
+    async with pool.page() as page:
+        page.navigated("https://foo.bar/login")
+        page.context.storage["token"] = "abc"
+        first = page.context
+    async with pool.page() as page:
+        assert page.context is first
+        assert (await page.evaluate(STORAGE_SCRIPT))["localStorage"] == {}
+    assert first.cleared_origins == ["https://foo.bar"]
+    assert first.permissions_cleared
+    await pool.close()
+
+
+async def test_pool_fecha_o_contexto_se_a_limpeza_falhar(playwright, monkeypatch):
+    async def broken(self, method, params):
+        raise RuntimeError("alvo fechado")
+
+    monkeypatch.setattr(FakeCDPSession, "send", broken)
+    pool = BrowserPool()
+    async with pool.page() as page:
+        page.navigated("https://foo.bar/login")
+        first = page.context
+    async with pool.page() as page:
+        assert page.context is not first
+    assert first.closed
+    await pool.close()
+
+
+async def test_pool_abre_outro_navegador_se_o_anterior_caiu(playwright):
+    pool = BrowserPool()
+    async with pool.page():
+        pass
+    playwright.browsers[0].closed = True
+    async with pool.page() as page:
+        assert page.context.browser is playwright.browsers[1]
+    await pool.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_render_usa_o_pool_do_killer(playwright, respx_mock):
+    respx_mock.get("/zoo").mock(
+        return_value=httpx.Response(200, html="<html><body></body></html>")
+    )
+    shared = BrowserPool()
+    killer = SeleniumKiller(browser_pool=shared)
+    await killer.get("https://foo.bar/zoo")
+    await killer.render(timeout=0)
+    await killer.render(timeout=0)
+    assert killer.forms[0].id == "js"
+    assert len(playwright.browsers) == 1
+    await killer.close()
+    assert not playwright.browsers[0].closed
+    await shared.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_close_fecha_o_pool_proprio(playwright, respx_mock):
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html="<p></p>"))
+    async with SeleniumKiller() as killer:
+        await killer.get("https://foo.bar/zoo")
+        await killer.render(timeout=0)
+    assert playwright.browsers[0].closed
+
+
+async def test_wait_for_page_usa_as_condicoes_em_vez_do_tempo_fixo():
+    page = FakePage(None)
+    assert await wait_for_page(page, 5, selector="#app", min_forms=2)
+    assert [wait[0] for wait in page.waited] == [
+        "networkidle",
+        "#app",
+        "n => document.forms.length >= n",
+    ]
+    assert all(0 < wait[1] <= 5000 for wait in page.waited[:2])
+    assert page.waited[2][1] == 2
+
+
+async def test_wait_for_page_retorna_false_no_timeout():
+    page = FakePage(None)
+    assert not await wait_for_page(page, 0, wait_until=None, selector="#nunca")
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_render_bloqueia_recursos_e_conta_bytes(playwright, respx_mock, monkeypatch):
+    respx_mock.get("/zoo").mock(
+        return_value=httpx.Response(200, html="<html><body>ação</body></html>")
+    )
+    respx_mock.get("/app.js").mock(return_value=httpx.Response(200, text="var a=1;"))
+    respx_mock.get("/logo.png").mock(return_value=httpx.Response(200, content=b"png"))
+    respx_mock.get("https://cdn.foo.bar/lib.js").mock(
+        return_value=httpx.Response(200, text="lib")
+    )
+    monkeypatch.setattr(
+        FakePage,
+        "subresources",
+        [
+            ("https://foo.bar/logo.png", "image"),
+            ("https://www.google-analytics.com/analytics.js", "script"),
+            ("https://foo.bar/app.js", "script"),
+            ("https://cdn.foo.bar/lib.js", "script"),
+        ],
+    )
+    killer = SeleniumKiller()
+    await killer.get("https://foo.bar/zoo")
+    await killer.render(timeout=0)
+    stats = killer.render_stats
+    assert stats.blocked_requests == 2
+    assert stats.blocked_by_type == {"image": 1, "script": 1}
+    assert stats.allowed_requests == 2
+    assert stats.allowed_bytes == 20
+    assert "ação" in killer.response.text
+
+    policy = RoutePolicy(block_resource_types=(), via_session=True)
+    await killer.render(timeout=0, route_policy=policy)
+    assert killer.render_stats.blocked_requests == 1
+    assert killer.render_stats.allowed_bytes == len("var a=1;png") + len("lib")
+    await killer.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_render_aborta_requisicoes_que_falham(playwright, respx_mock, monkeypatch):
+    respx_mock.get("/zoo").mock(
+        return_value=httpx.Response(200, html="<html><body></body></html>")
+    )
+    respx_mock.get("/falha.js").mock(side_effect=httpx.ConnectError("recusada"))
+    monkeypatch.setattr(FakePage, "subresources", [("https://foo.bar/falha.js", "script")])
+    killer = SeleniumKiller()
+    await killer.get("https://foo.bar/zoo")
+    for policy in (RoutePolicy(), RoutePolicy(via_session=True)):
+        await killer.render(timeout=0, route_policy=policy)
+        assert killer.render_stats.failed_requests == 1
+        page = playwright.browsers[0].contexts[0].pages[-1]
+        assert page.aborted == ["https://foo.bar/falha.js"]
+    await killer.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_click_by_browser_sincroniza_cookies_storage_e_url(playwright, respx_mock):
+    respx_mock.get("/login").mock(
+        return_value=httpx.Response(200, html="<html><body><button id='entrar'></button></body></html>")
+    )
+    killer = SeleniumKiller()
+    await killer.get("https://foo.bar/login")
+    await killer.click_by_browser("#entrar", timeout=0, fill={"#user": "rodrigo"})
+    assert str(killer.response.url) == "https://foo.bar/logado"
+    assert killer.find("p").text == "#entrar"
+    assert killer.session.cookies.get("sessao", domain="foo.bar") == "1"
+    assert killer.browser_storage["localStorage"] == {"#user": "rodrigo", "token": "abc"}
+    await killer.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_click_by_browser_usa_um_prazo_so(playwright, respx_mock):
+    respx_mock.get("/login").mock(
+        return_value=httpx.Response(200, html="<html><body></body></html>")
+    )
+    killer = SeleniumKiller()
+    await killer.get("https://foo.bar/login")
+    await killer.click_by_browser(
+        "#entrar",
+        timeout=2,
+        fill={"#user": "rodrigo", "#senha": "123"},
+        expect_navigation=True,
+        expect_response="**/api/login",
+    )
+    page = playwright.browsers[0].contexts[0].pages[0]
+    assert [step for step, _ in page.timeouts] == [
+        "fill",
+        "fill",
+        "navigation",
+        "response",
+        "click",
+    ]
+    timeouts = [timeout for _, timeout in page.timeouts] + [page.waited[0][1]]
+    assert all(0 < timeout <= 2000 for timeout in timeouts)
+    assert timeouts == sorted(timeouts, reverse=True)
+
+    # timeout=0 não pode virar "esperar para sempre" no playwright.
+    await killer.click_by_browser("#entrar", timeout=0, expect_response="**/nunca")
+    page = playwright.browsers[0].contexts[0].pages[1]
+    assert all(timeout > 0 for _, timeout in page.timeouts)
+    await killer.close()
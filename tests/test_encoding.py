@@ -0,0 +1,95 @@
+import codecs
+
+import httpx
+import pytest
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.util.encoding import EncodingResolver
+
+
+class FakeDetector:
+    def __init__(self, encoding="windows-1252"):
+        self.encoding = encoding
+        self.samples = []
+
+    def __call__(self, sample):
+        self.samples.append(sample)
+        return self.encoding
+
+
+def test_header_tem_prioridade():
+    detector = FakeDetector()
+    resolver = EncodingResolver(detector=detector)
+    content = b'<meta charset="utf-8"><p>ol\xe1</p>'
+    assert resolver.resolve(content, "text/html; charset=ISO-8859-1") == "iso8859-1"
+    assert not detector.samples
+
+
+def test_bom_e_meta():
+    resolver = EncodingResolver(detector=FakeDetector())
+    assert resolver.resolve(codecs.BOM_UTF8 + b"<p>", "text/html") == "utf-8-sig"
+    content = b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=latin-1">'
+    assert resolver.resolve(content, "text/html") == "iso8859-1"
+
+
+def test_detector_usa_amostra_e_cache_por_host():
+    detector = FakeDetector()
+    resolver = EncodingResolver(detector=detector, sample_size=10)
+    content = b"<p>" + b"a" * 100 + b"</p>"
+    assert resolver.resolve(content, "text/html", host="foo.bar") == "cp1252"
+    assert resolver.resolve(content, "text/html", host="foo.bar") == "cp1252"
+    assert len(detector.samples) == 1
+    assert len(detector.samples[0]) == 10
+
+
+def test_amostra_ascii_usa_utf8_sem_cache_por_host():
+    detector = FakeDetector("ascii")
+    resolver = EncodingResolver(detector=detector)
+    assert resolver.resolve(b"<p>abc</p>", "text/html", host="foo.bar") == "utf-8"
+    assert resolver.hosts.get("foo.bar") is None
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_head_ascii_grande_nao_estraga_o_texto_depois(respx_mock):
+    head = "<head><script>" + "var a = 1;" * 10_000 + "</script></head>"
+    long_page = head + '<form><input name="q" value="ação"></form>'
+    short_page = '<form><input name="q" value="coração"></form>'
+    for path, page in (("/longa", long_page), ("/curta", short_page)):
+        respx_mock.get(path).mock(
+            return_value=httpx.Response(
+                200, content=page.encode("utf-8"), headers={"Content-Type": "text/html"}
+            )
+        )
+    killer = SeleniumKiller()
+
+    await killer.get("https://foo.bar/longa")
+    assert killer.forms[0].inputs[0].value == "ação"
+    # O resultado da primeira pagina não fica no cache do host.
+    await killer.get("https://foo.bar/curta")
+    assert killer.forms[0].inputs[0].value == "coração"
+    await killer.close()
+
+
+def test_conteudo_que_nao_e_texto_nao_passa_pelo_detector():
+    detector = FakeDetector()
+    resolver = EncodingResolver(detector=detector)
+    assert resolver.resolve(b'{"a": 1}', "application/json") == "utf-8"
+    assert not detector.samples
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_killer_usa_o_meta_charset(respx_mock):
+    detector = FakeDetector("utf-8")
+    killer = SeleniumKiller(encoding_detector=detector)
+    content = '<meta charset="iso-8859-1"><form><input name="q" value="ação"></form>'
+    respx_mock.get("/zoo").mock(
+        return_value=httpx.Response(
+            200, content=content.encode("latin-1"), headers={"Content-Type": "text/html"}
+        )
+    )
+    await killer.get("https://foo.bar/zoo")
+    assert killer.forms[0].inputs[0].value == "ação"
+    forms = [form async for form in killer.stream_forms("https://foo.bar/zoo")]
+    assert forms[0].inputs[0].value == "ação"
+    assert not detector.samples
+    await killer.close()
@@ -0,0 +1,193 @@
+import time
+
+import httpx
+import pytest
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.http_cache.http_cache import (
+    CacheEntry,
+    HTTPCache,
+    SQLiteStorage,
+)
+
+HTML = """
+<html><body>
+<form id="busca" action="/buscar" method="get">
+    <input name="q" value="" />
+    <input type="hidden" name="csrf" value="abc" />
+</form>
+</body></html>
+"""
+
+
+@pytest.fixture
+async def cache():
+    return HTTPCache()
+
+
+@pytest.fixture
+async def killer(cache):
+    killer = SeleniumKiller(cache=cache)
+    yield killer
+    await killer.close()
+
+
+def entry(headers: dict[str, str], stored_at: float) -> CacheEntry:
+    return CacheEntry("https://foo.bar/", 200, list(headers.items()), b"", stored_at, {})
+
+
+def test_validade_pelo_max_age_expires_e_last_modified():
+    now = time.time()
+    assert entry({"cache-control": "max-age=60"}, now).freshness_lifetime() == 60
+    assert (
+        entry(
+            {
+                "date": "Mon, 01 Jan 2024 00:00:00 GMT",
+                "expires": "Mon, 01 Jan 2024 00:02:00 GMT",
+            },
+            now,
+        ).freshness_lifetime()
+        == 120
+    )
+    assert entry({"expires": "0"}, now).freshness_lifetime() == 0
+    assert (
+        entry(
+            {
+                "date": "Mon, 11 Jan 2024 00:00:00 GMT",
+                "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+            },
+            now,
+        ).freshness_lifetime()
+        == 86400
+    )
+    assert not entry({"cache-control": "max-age=60"}, now - 61).is_fresh(
+        httpx.Request("GET", "https://foo.bar/"), now
+    )
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_pagina_fresca_vem_do_cache_com_os_forms(killer, cache, respx_mock):
+    route = respx_mock.get("/form").mock(
+        return_value=httpx.Response(
+            200, html=HTML, headers={"Cache-Control": "max-age=60"}
+        )
+    )
+
+    first = await killer.get("https://foo.bar/form")
+    first.forms[0].get_input("q").value = "alterado"
+    second = await killer.get("https://foo.bar/form")
+
+    assert route.call_count == 1
+    assert second.response.extensions["cache_status"] == "hit"
+    assert second.text == first.text
+    assert second._forms is not None
+    assert second.forms[0].get_input("q").value == ""
+    assert second.forms[0].killer is killer
+    assert cache.hits == 1 and cache.misses == 1
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_revalida_com_etag_e_reaproveita_os_forms_no_304(
+    killer, cache, respx_mock
+):
+    route = respx_mock.get("/form").mock(
+        side_effect=[
+            httpx.Response(
+                200,
+                html=HTML,
+                headers={
+                    "Cache-Control": "no-cache",
+                    "ETag": '"v1"',
+                    "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+                },
+            ),
+            httpx.Response(304, headers={"ETag": '"v1"', "X-Versao": "2"}),
+        ]
+    )
+
+    first = await killer.get("https://foo.bar/form")
+    assert len(first.forms) == 1
+    second = await killer.get("https://foo.bar/form")
+
+    request = route.calls.last.request
+    assert request.headers["if-none-match"] == '"v1"'
+    assert request.headers["if-modified-since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert second.status_code == 200
+    assert second.text == first.text
+    assert second.headers["x-versao"] == "2"
+    assert second.response.extensions["cache_status"] == "revalidated"
+    assert second._forms is not None and len(second.forms) == 1
+    assert cache.revalidated == 1
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_no_store_set_cookie_e_post_nao_sao_guardados(killer, respx_mock):
+    no_store = respx_mock.get("/no-store").mock(
+        return_value=httpx.Response(
+            200, html=HTML, headers={"Cache-Control": "no-store, max-age=60"}
+        )
+    )
+    cookie = respx_mock.get("/cookie").mock(
+        return_value=httpx.Response(
+            200,
+            html=HTML,
+            headers={"Cache-Control": "max-age=60", "Set-Cookie": "sessao=1"},
+        )
+    )
+    post = respx_mock.post("/form").mock(
+        return_value=httpx.Response(200, headers={"Cache-Control": "max-age=60"})
+    )
+
+    for _ in range(2):
+        await killer.get("https://foo.bar/no-store")
+        await killer.get("https://foo.bar/cookie")
+        await killer.post("https://foo.bar/form")
+
+    assert no_store.call_count == 2
+    assert post.call_count == 2
+    # Depois do Set-Cookie o request leva o cookie, então a chave muda.
+    assert cookie.call_count == 2
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_chave_considera_cookies_e_vary(cache, respx_mock):
+    route = respx_mock.get("/form").mock(
+        return_value=httpx.Response(
+            200,
+            html=HTML,
+            headers={"Cache-Control": "max-age=60", "Vary": "Accept-Language"},
+        )
+    )
+    killer = SeleniumKiller(cache=cache, cookies={"sessao": "a"})
+    other = SeleniumKiller(cache=cache, cookies={"sessao": "b"})
+
+    await killer.get("https://foo.bar/form")
+    await other.get("https://foo.bar/form")
+    await killer.get("https://foo.bar/form")
+    await killer.get("https://foo.bar/form", headers={"Accept-Language": "pt-BR"})
+
+    assert route.call_count == 3
+    assert cache.hits == 1
+    await killer.close()
+    await other.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_sqlite_sobrevive_a_outro_cache(tmp_path, respx_mock):
+    route = respx_mock.get("/form").mock(
+        return_value=httpx.Response(
+            200, html=HTML, headers={"Cache-Control": "max-age=60"}
+        )
+    )
+    path = str(tmp_path / "cache.sqlite")
+
+    async with SeleniumKiller(cache=HTTPCache(SQLiteStorage(path))) as killer:
+        await killer.get("https://foo.bar/form")
+        await killer.cache.aclose()
+    async with SeleniumKiller(cache=HTTPCache(SQLiteStorage(path))) as killer:
+        page = await killer.get("https://foo.bar/form")
+        await killer.cache.aclose()
+
+    assert route.call_count == 1
+    assert page.response.extensions["cache_status"] == "hit"
+    assert page.forms[0].id == "busca"
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+# Modulos pesados que só devem ser carregados quando a funcionalidade é usada.
+LAZY_MODULES = (
+    "playwright",
+    "requests",
+    "bs4",
+    "chardet",
+    "charset_normalizer",
+    "capmonstercloudclient",
+    "webbrowser",
+)
+
+
+def import_times() -> dict[str, int]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import selenium_form_killer"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_nao_carrega_dependencias_pesadas():
+    times = import_times()
+    loaded = {name.split(".")[0] for name in times}
+    assert not loaded & set(LAZY_MODULES)
+
+
+def test_import_dentro_do_orcamento():
+    # Medido contra o httpx do mesmo processo, que é a dependencia mais pesada do
+    # import: hoje o pacote inteiro leva ~1.75x o tempo do httpx.
+    times = import_times()
+    assert times["selenium_form_killer"] < 2.5 * times["httpx"]
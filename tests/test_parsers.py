@@ -0,0 +1,193 @@
+import httpx
+import pytest
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.parsers.backends import PARSERS, get_backend
+
+HTML = """
+<!DOCTYPE html>
+<html>
+<head><title>Login</title><script>var x = "<form>";</script></head>
+<body>
+    <nav><a href="/">Home</a></nav>
+    <form id="login" name="login" action="/auth?next=%2F&amp;a=1" method="POST">
+        <input type="hidden" name="__VIEWSTATE" value="abc&amp;def" />
+        <input type="hidden" name="csrf" value="123">
+        <INPUT TYPE="text" NAME="user" value>
+        <input type="password" name="password">
+        <textarea name="obs"></textarea>
+        <div class="g-recaptcha" data-sitekey="site-key-1"></div>
+        <input type="submit" value="Entrar">
+    </form>
+    <table><tr><td>
+        <form action="/busca" method="get">
+            <input name="q" value="çãé">
+            <span class="captcha-text">sem sitekey</span>
+        </form>
+    </td></tr></table>
+    <form></form>
+</body>
+</html>
+"""
+
+
+def available_parsers():
+    parsers = []
+    for name in PARSERS:
+        try:
+            get_backend(name).parse("<p></p>")
+        except Exception:
+            parsers.append(pytest.param(name, marks=pytest.mark.skip(f"{name} not installed")))
+        else:
+            parsers.append(name)
+    return parsers
+
+
+def form_signature(form):
+    return (
+        form.action,
+        form.id,
+        form.name,
+        form.method,
+        form.captcha,
+        [(input.name, input.value, input.type) for input in form.inputs],
+    )
+
+
+@pytest.fixture
+def killer():
+    return SeleniumKiller()
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_todos_os_parsers_extraem_os_mesmos_forms(killer, parser):
+    expected = [form_signature(form) for form in killer.extract_forms(HTML)]
+    forms = [form_signature(form) for form in killer.extract_forms(HTML, parser=parser)]
+    assert forms == expected
+    assert len(forms) == 3
+    assert forms[0][4] == "site-key-1"
+    assert forms[0][5][2] == ("user", "", "text")
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_parser_do_construtor(parser):
+    killer = SeleniumKiller(parser=parser)
+    forms = killer.extract_forms(HTML)
+    assert forms[1].inputs[0].value == "çãé"
+    assert killer.soup(HTML).find("title").text == "Login"
+
+
+def test_parser_desconhecido(killer):
+    with pytest.raises(ValueError):
+        killer.extract_forms(HTML, parser="regex")
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_stream_forms_igual_ao_extract_forms(killer, respx_mock):
+    respx_mock.get("/login").mock(return_value=httpx.Response(200, html=HTML))
+    await killer.get("https://foo.bar/login")
+    expected = [form_signature(form) for form in killer.forms]
+    forms = [form async for form in killer.stream_forms("https://foo.bar/login")]
+    assert [form_signature(form) for form in forms] == expected
+    assert forms[0].url_base == "https://foo.bar/login"
+    await killer.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_stream_forms_para_no_form_alvo(killer, respx_mock, chunked_stream):
+    body = HTML.encode() + b"<p>" + b"x" * 100_000 + b"</p>"
+    stream = chunked_stream(body)
+    respx_mock.get("/login").mock(
+        return_value=httpx.Response(
+            200, headers={"Content-Type": "text/html"}, stream=stream
+        )
+    )
+    forms = [
+        form
+        async for form in killer.stream_forms(
+            "https://foo.bar/login", stop_at={"id": "login"}
+        )
+    ]
+    assert len(forms) == 1
+    assert forms[0].captcha == "site-key-1"
+    assert stream.sent < len(stream.chunks)
+    await killer.close()
+
+
+FIELDS_HTML = """
+<html><body>
+<input type="text" name="antes" value="1" form="cadastro">
+<form id="cadastro" action="/cadastro" method="post">
+    <select name="estado">
+        <option value="SP">São Paulo</option>
+        <optgroup label="Sul"><option value="RS" selected>Rio Grande do Sul</option></optgroup>
+    </select>
+    <select name="pais"><option>  Brasil  </option><option>Chile</option></select>
+    <select name="linguas" multiple>
+        <option value="pt" selected>Português</option>
+        <option value="en">Inglês</option>
+        <option value="es" selected>Espanhol</option>
+    </select>
+    <input list="cores" name="cor">
+    <datalist id="cores"><option value="azul"></option></datalist>
+    <textarea name="obs">
+linha 1</textarea>
+    <button type="button" name="ajuda">?</button>
+    <button name="acao" value="salvar">Salvar</button>
+    <input type="submit" name="outro" value="Outro">
+</form>
+<input type="hidden" name="depois" value="2" form="cadastro">
+<input type="hidden" name="solto" value="3">
+</body></html>
+"""
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_extrai_selects_botoes_e_campos_associados(killer, parser):
+    form = killer.extract_forms(FIELDS_HTML, parser=parser)[0]
+    assert [(input.name, input.value, input.type) for input in form.inputs] == [
+        ("antes", "1", "text"),
+        ("estado", "RS", "select"),
+        ("pais", "Brasil", "select"),
+        ("linguas", "pt", "select"),
+        ("linguas", "es", "select"),
+        ("cor", "", "text"),
+        ("obs", "linha 1", "text"),
+        ("outro", "Outro", "submit"),
+        ("depois", "2", "hidden"),
+    ]
+    assert form.button == {"name": "acao", "value": "salvar", "type": "submit"}
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_buscas_por_form_iguais_a_uma_passada(killer, parser):
+    from selenium_form_killer.parsers.walker import scan_forms, walk_forms
+
+    html = "\n".join(line for line in FIELDS_HTML.splitlines() if 'form="' not in line)
+    backend = get_backend(parser)
+    document = backend.parse(html)
+    assert not backend.has_form_owners(document)
+    scanned, walked = scan_forms(backend, document), walk_forms(backend, document)
+    assert [(form.actions, form.inputs, form.button) for form in scanned] == [
+        (form.actions, form.inputs, form.button) for form in walked
+    ]
+    # O extract_inputs segue as mesmas regras, com os selects.
+    node = backend.forms(document)[0]
+    assert [input.as_tuple() for input in killer.extract_inputs(node, parser=parser)] == [
+        (input["name"], input["value"], input["type"]) for input in walked[0].inputs
+    ]
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_stream_extrai_selects_e_botoes(killer, respx_mock):
+    respx_mock.get("/form").mock(return_value=httpx.Response(200, html=FIELDS_HTML))
+    forms = [form async for form in killer.stream_forms("https://foo.bar/form")]
+    expected = killer.extract_forms(FIELDS_HTML)[0]
+    # No stream o form já foi entregue quando aparecem campos fora dele.
+    assert [input.as_tuple() for input in forms[0].inputs] == [
+        input.as_tuple()
+        for input in expected.inputs
+        if input.name not in ("antes", "depois")
+    ]
+    assert forms[0].button == expected.button
+    await killer.close()
@@ -0,0 +1,177 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.presolver.presolver import (
+    CaptchaPresolver,
+    find_sitekeys,
+    find_sitekeys_in_bytes,
+)
+
+HTML = """
+<html><body>
+<form id="login" action="/login" method="post">
+    <input name="user" value="rodrigo" />
+    <div class="g-recaptcha" data-sitekey="chave-do-site"></div>
+</form>
+</body></html>
+"""
+
+
+class FakeSolver:
+    def __init__(self, delay: float = 0.01, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.calls: list[tuple[str, str]] = []
+
+    async def __call__(self, sitekey: str, url: str) -> str:
+        self.calls.append((sitekey, url))
+        token = f"token{len(self.calls)}"
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("saldo insuficiente")
+        return token
+
+
+@pytest.fixture
+async def solver():
+    return FakeSolver()
+
+
+@pytest.fixture
+async def killer(solver):
+    killer = SeleniumKiller(
+        presolver=CaptchaPresolver(solver, warm=1, prime_urls=["foo.bar/form"])
+    )
+    yield killer
+    await killer.presolver.aclose()
+    await killer.close()
+
+
+def test_find_sitekeys():
+    html = HTML + "<div data-sitekey='outra'></div><div data-sitekey=\"outra\"></div>"
+    assert find_sitekeys(html) == ["chave-do-site", "outra"]
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_get_comeca_a_resolver_e_submit_usa_o_token(killer, solver, respx_mock):
+    respx_mock.get("/form").mock(return_value=httpx.Response(200, html=HTML))
+    route = respx_mock.post("/login").mock(return_value=httpx.Response(200, html="ok"))
+
+    page = await killer.get("https://foo.bar/form")
+    await asyncio.sleep(0)
+    # A resolução começou antes de qualquer formulario ser extraido.
+    assert solver.calls == [("chave-do-site", "https://foo.bar/form")]
+    assert page._forms is None
+
+    await page.forms[0].submit()
+    await asyncio.sleep(0)
+    sent = route.calls.last.request.content.decode()
+    assert "user=rodrigo" in sent
+    assert "g-recaptcha-response=token1" in sent
+    # O token usado é reposto para o proximo envio.
+    assert len(solver.calls) == 2
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_so_resolve_antes_nas_urls_escolhidas(killer, solver, respx_mock):
+    respx_mock.get("/busca").mock(return_value=httpx.Response(200, html=HTML))
+    route = respx_mock.post("/login").mock(return_value=httpx.Response(200, html="ok"))
+    page = await killer.get("https://foo.bar/busca")
+    await asyncio.sleep(0)
+    # Cada resolução é paga: fora do prime_urls o captcha só é resolvido no submit.
+    assert solver.calls == []
+
+    await page.forms[0].submit()
+    await asyncio.sleep(0.02)
+    assert solver.calls == [("chave-do-site", "https://foo.bar/busca")]
+    assert "g-recaptcha-response=token1" in route.calls.last.request.content.decode()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_token_informado_tem_prioridade(killer, solver, respx_mock):
+    respx_mock.get("/form").mock(return_value=httpx.Response(200, html=HTML))
+    route = respx_mock.post("/login").mock(return_value=httpx.Response(200, html="ok"))
+    page = await killer.get("https://foo.bar/form")
+    await page.forms[0].submit(token={"g-recaptcha-response": "manual"})
+    assert "g-recaptcha-response=manual" in route.calls.last.request.content.decode()
+
+
+async def test_token_expira_pelo_ttl(solver):
+    presolver = CaptchaPresolver(solver, ttl=0.05, warm=1)
+    presolver.prime("chave", "https://foo.bar")
+    await asyncio.sleep(0.03)
+    assert presolver.ready("chave", "https://foo.bar") == 1
+    await asyncio.sleep(0.05)
+    assert presolver.take("chave", "https://foo.bar") is None
+    await presolver.aclose()
+
+
+async def test_pool_quente_mantem_varios_tokens(solver):
+    presolver = CaptchaPresolver(solver, warm=3)
+    presolver.prime("chave", "https://foo.bar")
+    presolver.prime("chave", "https://foo.bar")
+    await asyncio.sleep(0)
+    assert len(solver.calls) == 3
+    tokens = await asyncio.gather(
+        *(presolver.token("chave", "https://foo.bar") for _ in range(3))
+    )
+    assert sorted(tokens) == ["token1", "token2", "token3"]
+    await presolver.aclose()
+
+
+async def test_erro_do_solver_chega_em_quem_espera():
+    presolver = CaptchaPresolver(FakeSolver(fail=True))
+    with pytest.raises(RuntimeError, match="saldo"):
+        await presolver.token("chave", "https://foo.bar")
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_stream_comeca_a_resolver_antes_do_fim_do_form(
+    killer, solver, respx_mock, chunked_stream
+):
+    html = HTML.replace("</form>", "<input name='x' />" * 2000 + "</form>")
+    stream = chunked_stream(html.encode(), chunk_size=1024)
+    respx_mock.get("/form").mock(return_value=httpx.Response(200, stream=stream))
+
+    async for form in killer.stream_forms("https://foo.bar/form"):
+        await asyncio.sleep(0)
+        # O sitekey foi visto muito antes do </form>.
+        assert solver.calls == [("chave-do-site", "https://foo.bar/form")]
+        assert form.captcha == "chave-do-site"
+
+
+def test_find_sitekeys_in_bytes():
+    html = HTML + "<div data-sitekey='outra'></div>"
+    assert find_sitekeys_in_bytes(html.encode()) == find_sitekeys(html)
+
+
+@pytest.mark.parametrize("use_executor", [False, True])
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_pagina_grande_busca_sitekeys_fora_do_texto(solver, respx_mock, use_executor):
+    executor = ThreadPoolExecutor(max_workers=1) if use_executor else None
+    big = HTML.replace("</form>", "</form>" + "<p>texto</p>" * 1000)
+    respx_mock.get("/form").mock(return_value=httpx.Response(200, html=big))
+    killer = SeleniumKiller(
+        presolver=CaptchaPresolver(solver, warm=1, prime_urls=["foo.bar/form"]),
+        executor=executor,
+        offload_threshold=1024,
+    )
+
+    page = await killer.get("https://foo.bar/form")
+    for _ in range(50):
+        if solver.calls:
+            break
+        await asyncio.sleep(0.01)
+
+    assert solver.calls == [("chave-do-site", "https://foo.bar/form")]
+    # O HTML não foi decodificado para achar o sitekey.
+    assert not hasattr(page.response, "_text")
+    assert page._forms is None
+    await killer.presolver.aclose()
+    await killer.close()
+    if executor is not None:
+        executor.shutdown()
@@ -1,4 +1,6 @@
-from pathlib import Path
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
 import httpx
 import pytest
 
@@ -42,7 +44,6 @@ async def killer():
     killer = SeleniumKiller()
     yield killer
     await killer.close()
-    Path("killer.log").unlink()
 
 
 def test_selenium_killer(killer):
@@ -145,6 +146,20 @@ async def test_se_pega_o_form_faz_submit(killer, respx_mock, html, html_google):
     assert "Selenium Killer" in killer.response.text
 
 
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_submit_com_query_params_envia_todos_os_inputs(killer, respx_mock):
+    html = '<form action="/enviar" method="post"><input name="a" value="1"><input name="b" value="2"></form>'
+    respx_mock.get("/form").mock(return_value=httpx.Response(200, html=html))
+    route = respx_mock.post("/enviar").mock(return_value=httpx.Response(200, html="ok"))
+    page = await killer.get("https://foo.bar/form")
+
+    await page.forms[0].submit(input_query_params=[0])
+
+    request = route.calls.last.request
+    assert request.url.params["a"] == "1"
+    assert request.content == b"a=1&b=2"
+
+
 @pytest.mark.xfail(reason="Needs a browser")
 async def test_se_renderiza_pagina(killer: SeleniumKiller):
     await killer.get("https://aguasdorio.com.br/comunicados/")
@@ -157,3 +172,305 @@ async def test_se_renderiza_pagina(killer: SeleniumKiller):
 async def test_se_abre_o_response_no_browser(killer: SeleniumKiller):
     await killer.get("https://aguasdorio.com.br/comunicados/")
     assert killer.open_response_in_browser()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_forms_sao_extraidos_sob_demanda(killer, respx_mock, html):
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    await killer.get("https://foo.bar/zoo")
+    assert killer.page._forms is None
+    forms = killer.forms
+    assert killer.forms is forms
+    respx_mock.get("/api").mock(return_value=httpx.Response(200, json={"a": 1}))
+    await killer.get("https://foo.bar/api")
+    assert killer.page._forms is None
+    assert killer.forms == []
+
+
+def test_definir_forms_sem_pagina(killer):
+    assert killer.forms == []
+    with pytest.raises(RuntimeError, match="Nenhuma pagina"):
+        killer.forms = []
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_soup_usa_cache_do_response(killer, respx_mock, html, html_google):
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    respx_mock.get("/google").mock(return_value=httpx.Response(200, html=html_google))
+    await killer.get("https://foo.bar/zoo")
+    soup = killer.soup()
+    assert killer.soup() is soup
+    assert killer.find_all("li")[0] is soup.find("li")
+    await killer.get("https://foo.bar/google")
+    assert killer.soup() is not soup
+    assert killer.find("li") is None
+
+
+def test_soup_usa_cache_lru_para_html(html, html_google):
+    killer = SeleniumKiller(html_cache_size=1)
+    soup = killer.soup(html)
+    assert killer.soup(html) is soup
+    killer.soup(html_google)
+    assert killer.soup(html) is not soup
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_map_get_retorna_paginas_na_ordem(killer, respx_mock, html, html_google):
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    respx_mock.get("/google").mock(return_value=httpx.Response(200, html=html_google))
+    respx_mock.get("/404").mock(return_value=httpx.Response(404, json={}))
+    pages = await killer.map_get(
+        ["https://foo.bar/zoo", "https://foo.bar/google", "https://foo.bar/404"],
+        concurrency=2,
+    )
+    assert [page.status_code for page in pages] == [200, 200, 404]
+    assert len(pages[0].forms) == 1
+    assert pages[1].forms == []
+    assert pages[2].forms == []
+    assert pages[1].find("a").text == "Selenium Killer"
+    assert killer.response is None
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_iter_get_limita_concorrencia_por_host(killer, respx_mock, html):
+    running = 0
+    max_running = 0
+
+    async def slow_response(request):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return httpx.Response(200, html=html)
+
+    respx_mock.get(url__regex=r"/page/\d+").mock(side_effect=slow_response)
+    urls = [f"https://foo.bar/page/{index}" for index in range(10)]
+    pages = [page async for page in killer.iter_get(urls, concurrency=5, per_host=2)]
+    assert len(pages) == 10
+    assert max_running == 2
+
+
+async def test_iter_get_host_lotado_nao_segura_vagas_de_outros_hosts(killer, respx_mock, html):
+    starts = []
+
+    async def slow_response(request):
+        starts.append(request.url.host)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, html=html)
+
+    respx_mock.get(url__regex=r"/page/\d+").mock(side_effect=slow_response)
+    urls = [f"https://lento.bar/page/{index}" for index in range(6)]
+    urls += ["https://outro.bar/page/1", "https://outro.bar/page/2"]
+    pages = [page async for page in killer.iter_get(urls, concurrency=2, per_host=1)]
+    assert len(pages) == 8
+    # Antes o outro host só começava depois de todas as urls do host lento.
+    assert starts[:2] == ["lento.bar", "outro.bar"]
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_map_get_return_exceptions(killer, respx_mock, html):
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    respx_mock.get("/erro").mock(side_effect=httpx.ConnectError("falhou"))
+    with pytest.raises(httpx.ConnectError):
+        await killer.map_get(["https://foo.bar/zoo", "https://foo.bar/erro"])
+    pages = await killer.map_get(
+        ["https://foo.bar/zoo", "https://foo.bar/erro"], return_exceptions=True
+    )
+    assert pages[0].status_code == 200
+    assert isinstance(pages[1], httpx.ConnectError)
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_requisicoes_concorrentes_retornam_paginas_independentes(
+    killer, respx_mock, html, html_google
+):
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    respx_mock.get("/google").mock(return_value=httpx.Response(201, html=html_google))
+    zoo, google = await asyncio.gather(
+        killer.get("https://foo.bar/zoo"), killer.get("https://foo.bar/google")
+    )
+    assert zoo.status_code == 200 and len(zoo.forms) == 1
+    assert google.status_code == 201 and google.forms == []
+    assert killer.page in (zoo, google)
+    assert killer.status_code == killer.page.status_code
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_get_envia_referer_da_pagina_atual(killer, respx_mock, html):
+    route = respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    headers = {}
+    await killer.get("https://foo.bar/zoo", headers=headers)
+    await killer.get("https://foo.bar/zoo", headers=headers)
+    assert route.calls[1].request.headers["Referer"] == "https://foo.bar/zoo"
+    assert headers == {}
+
+
+def test_extract_inputs_so_loga_cada_input_em_trace(killer, html):
+    from loguru import logger
+
+    from selenium_form_killer.log.logger import is_enabled
+
+    assert not is_enabled("TRACE")
+    messages = []
+    sink = logger.add(messages.append, level="TRACE", format="{message}")
+    try:
+        assert is_enabled("TRACE")
+        killer.extract_forms(html)
+    finally:
+        logger.remove(sink)
+    assert sum("Extracting inputs" in message for message in messages) == 3
+
+
+@pytest.fixture
+def fresh_logging():
+    from loguru import logger
+
+    from selenium_form_killer.log import logger as log
+
+    before = dict(log._sinks)
+    yield log
+    # Remove os sinks criados pelo teste (o arquivo no tmp_path) e volta o estado
+    # do configure_logging, para os proximos testes não escreverem nele.
+    for name, sink in list(log._sinks.items()):
+        if name not in before and name != "default":
+            logger.remove(sink)
+    log._sinks.clear()
+    log._sinks.update(before)
+
+
+def test_is_enabled_sem_o_nivel_interno_do_loguru(monkeypatch):
+    from loguru import logger
+
+    from selenium_form_killer.log.logger import is_enabled
+
+    monkeypatch.delattr(logger._core, "min_level")
+    assert is_enabled("TRACE")
+
+
+def test_logging_e_configurado_uma_vez_por_processo(tmp_path, fresh_logging):
+    from loguru import logger
+
+    log = fresh_logging
+    log_file = str(tmp_path / "killer.log")
+    first = SeleniumKiller(log_file=log_file)
+    sinks = dict(log._sinks)
+    second = SeleniumKiller(log_file=log_file)
+    quiet = SeleniumKiller()
+    assert log._sinks == sinks
+    assert log_file in sinks
+
+    first.logger.info("primeiro")
+    second.logger.bind(host="foo.bar").info("segundo")
+    # Vir depois de um killer com arquivo não faz este escrever no arquivo.
+    quiet.logger.info("sem arquivo")
+    logger.complete()
+    lines = (tmp_path / "killer.log").read_text().splitlines()
+    assert [line.rsplit(" | ", 1)[1] for line in lines] == ["primeiro", "segundo"]
+    assert re.search(r"\| killer_id=\d+ \| primeiro$", lines[0])
+    assert re.search(r"\| killer_id=\d+ host=foo.bar \| segundo$", lines[1])
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_killers_compartilham_pool_com_cookies_separados(respx_mock, html):
+    from selenium_form_killer.transport.pool import ConnectionPool
+
+    respx_mock.get("/login").mock(
+        return_value=httpx.Response(200, html=html, headers={"set-cookie": "id=1"})
+    )
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    async with ConnectionPool(max_connections=2) as pool:
+        first = SeleniumKiller(pool=pool, headers={"x-killer": "1"})
+        second = SeleniumKiller(pool=pool, headers={"x-killer": "2"})
+        await first.get("https://foo.bar/login")
+        await second.get("https://foo.bar/zoo")
+        assert first.session.cookies.get("id") == "1"
+        assert second.session.cookies.get("id") is None
+        assert respx_mock.calls.last.request.headers["x-killer"] == "2"
+        assert pool.limits.max_connections == 2
+
+        # Fechar um killer não fecha as conexões dos outros.
+        await first.close()
+        assert not pool.closed
+        await second.get("https://foo.bar/zoo")
+        await second.close()
+    assert pool.closed
+
+
+def test_pool_nao_aceita_proxy_no_killer():
+    from selenium_form_killer.transport.pool import ConnectionPool
+
+    with pytest.raises(ValueError):
+        SeleniumKiller(pool=ConnectionPool(), proxies={"all://": "http://proxy:8080"})
+
+
+def test_forms_e_inputs_sem_dict(killer, html):
+    form = killer.extract_forms(html)[0]
+    assert not hasattr(form, "__dict__")
+    assert not hasattr(form.inputs[0], "__dict__")
+    # O mesmo type vem sempre do mesmo objeto string.
+    assert form.inputs[0].type is form.inputs[1].type
+    assert form.to_dict()["q"] == ""
+
+
+def test_form_pode_ir_para_o_pickle(killer, html):
+    import pickle
+
+    form = killer.extract_forms(html)[0]
+    loaded = pickle.loads(pickle.dumps(form))
+    assert loaded.killer is None
+    assert [input.as_tuple() for input in loaded.inputs] == [
+        input.as_tuple() for input in form.inputs
+    ]
+    assert (loaded.action, loaded.captcha) == (form.action, form.captcha)
+    assert loaded.bind(killer).killer is killer
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_aforms_usa_o_executor_so_para_paginas_grandes(respx_mock, html):
+    big = html.replace("<ul>", "<ul>" + "<li>item</li>" * 5000)
+    respx_mock.get("/pequena").mock(return_value=httpx.Response(200, html=html))
+    respx_mock.get("/grande").mock(return_value=httpx.Response(200, html=big))
+    with RecordingExecutor() as executor:
+        killer = SeleniumKiller(executor=executor, offload_threshold=10_000)
+        small = await killer.get("https://foo.bar/pequena")
+        assert [form.action for form in await small.aforms()] == [
+            "http://www.google.com/search"
+        ]
+        assert executor.submitted == 0
+
+        page = await killer.get("https://foo.bar/grande")
+        forms = await killer.aforms()
+        assert executor.submitted == 1
+        assert forms is page.forms
+        expected = killer.extract_forms(big)
+        assert [input.as_tuple() for input in forms[0].inputs] == [
+            input.as_tuple() for input in expected[0].inputs
+        ]
+        assert forms[0].killer is killer
+        assert forms[0].url_base == "https://foo.bar/grande"
+        await killer.close()
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_aforms_com_process_pool(respx_mock, html):
+    from concurrent.futures import ProcessPoolExecutor
+
+    respx_mock.get("/zoo").mock(return_value=httpx.Response(200, html=html))
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        killer = SeleniumKiller(executor=executor, offload_threshold=0)
+        page = await killer.get("https://foo.bar/zoo")
+        forms = await page.aforms()
+        assert forms[0].captcha == "123456789"
+        assert forms[0].inputs[0].name == "q"
+        await killer.close()
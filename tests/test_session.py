@@ -0,0 +1,128 @@
+import httpx
+import pytest
+
+from selenium_form_killer import SeleniumKiller
+from selenium_form_killer.session.session import SessionExpiredError, decode_session
+
+HTML = """
+<html><body>
+<form id="conta" action="/salvar" method="post">
+    <input name="nome" value="rodrigo" />
+</form>
+</body></html>
+"""
+
+
+@pytest.fixture
+def login_routes(respx_mock):
+    respx_mock.post("/login").mock(
+        return_value=httpx.Response(
+            200, html=HTML, headers={"Set-Cookie": "sessao=valida; Path=/; HttpOnly"}
+        )
+    )
+    respx_mock.get("/conta").mock(
+        side_effect=lambda request: httpx.Response(
+            200 if "sessao=valida" in request.headers.get("cookie", "") else 302
+        )
+    )
+    return respx_mock
+
+
+async def login(killer: SeleniumKiller) -> None:
+    await killer.post("https://foo.bar/login", data={"user": "rodrigo"})
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_exporta_e_restaura_a_sessao(login_routes):
+    async with SeleniumKiller(headers={"X-Cliente": "1"}) as killer:
+        await login(killer)
+        blob = killer.export_session(content=True)
+
+    async with SeleniumKiller.from_session(blob) as restored:
+        assert restored.session.cookies.get("sessao") == "valida"
+        assert restored.session.headers["X-Cliente"] == "1"
+        assert restored.url_base == "https://foo.bar"
+        assert restored.status_code == 200
+        assert restored.forms[0].id == "conta"
+        assert restored.forms[0].killer is restored
+        page = await restored.get("https://foo.bar/conta")
+
+    assert page.status_code == 200
+    assert page.request.headers["Referer"] == "https://foo.bar/login"
+    assert 'id="conta"' in decode_session(blob)["page"]["text"]
+
+
+@pytest.mark.respx(base_url="https://foo.bar", assert_all_called=False)
+async def test_blob_compacto_sem_o_html(login_routes):
+    async with SeleniumKiller() as killer:
+        await login(killer)
+        blob = killer.export_session()
+
+    data = decode_session(blob)
+    assert "text" not in data["page"]
+    assert data["cookies"][0]["httpOnly"] is True
+    assert len(blob) < 400
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_probe_invalido_faz_relogin(login_routes):
+    async with SeleniumKiller() as killer:
+        await killer.get("https://foo.bar/conta")
+        expired = killer.export_session()
+
+    with pytest.raises(SessionExpiredError):
+        await SeleniumKiller.afrom_session(expired, probe="https://foo.bar/conta")
+
+    async with await SeleniumKiller.afrom_session(
+        expired, probe="https://foo.bar/conta", relogin=login
+    ) as killer:
+        assert killer.session.cookies.get("sessao") == "valida"
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_probe_nao_troca_a_pagina_restaurada(login_routes):
+    async with SeleniumKiller() as killer:
+        await login(killer)
+        blob = killer.export_session(content=True)
+
+    async with await SeleniumKiller.afrom_session(blob, probe="https://foo.bar/conta") as killer:
+        assert killer.page.url == "https://foo.bar/login"
+        assert killer.forms[0].id == "conta"
+
+    probe = login_routes.routes[1].calls.last.request
+    assert probe.headers["Cache-Control"] == "no-cache"
+
+
+@pytest.mark.respx(base_url="https://foo.bar", assert_all_called=False)
+async def test_relogin_com_erro_fecha_o_killer(login_routes, monkeypatch):
+    async with SeleniumKiller() as killer:
+        await killer.get("https://foo.bar/conta")
+        expired = killer.export_session()
+
+    closed = []
+    close = SeleniumKiller.close
+
+    async def spy_close(self):
+        closed.append(self)
+        await close(self)
+
+    async def broken_login(killer):
+        raise RuntimeError("captcha")
+
+    monkeypatch.setattr(SeleniumKiller, "close", spy_close)
+    with pytest.raises(RuntimeError, match="captcha"):
+        await SeleniumKiller.afrom_session(
+            expired, probe="https://foo.bar/conta", relogin=broken_login
+        )
+    assert len(closed) == 1 and closed[0].session.is_closed
+
+
+async def test_killer_com_auth_nao_e_exportado():
+    async with SeleniumKiller(auth=("user", "senha")) as killer:
+        with pytest.raises(ValueError, match="auth"):
+            killer.export_session()
+
+
+def test_blob_invalido():
+    with pytest.raises(ValueError):
+        SeleniumKiller.from_session("não é uma sessão")
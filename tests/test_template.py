@@ -0,0 +1,68 @@
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from selenium_form_killer import SeleniumKiller
+
+PAGE = """
+<html><body>
+<form id="busca" action="/busca"><input type="hidden" name="csrf" value="outro" /></form>
+<form id="cadastro" action="/cadastro" method="post">
+    <input type="hidden" name="csrf" value="{csrf}" />
+    <input type=hidden value='{viewstate}' name=__VIEWSTATE>
+    <input type="hidden" name="origem" value="site" />
+    <input type="text" name="nome" value="" />
+    <input type="submit" name="enviar" value="Enviar" />
+</form>
+</body></html>
+"""
+
+
+@pytest.fixture
+async def killer():
+    killer = SeleniumKiller()
+    yield killer
+    await killer.close()
+
+
+def pages():
+    for index in range(1, 100):
+        yield httpx.Response(
+            200, html=PAGE.format(csrf=f"token{index}", viewstate=f"vs&amp;{index}")
+        )
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_template_atualiza_so_os_inputs_dinamicos(killer, respx_mock):
+    respx_mock.get("/form").mock(side_effect=pages())
+    route = respx_mock.post("/cadastro").mock(return_value=httpx.Response(200))
+
+    page = await killer.get("https://foo.bar/form")
+    template = page.forms[1].compile(dynamic=["csrf", "__VIEWSTATE"])
+    assert template.static == {"origem": "site", "nome": "", "enviar": "Enviar"}
+    assert template.values == {"csrf": "token1", "__VIEWSTATE": "vs&1"}
+
+    for nome in ("Ana", "Bia"):
+        await template.submit({"nome": nome})
+        # A pagina nova não passa pelo extract_forms.
+        assert killer.page._forms is None
+
+    sent = [parse_qs(call.request.content.decode()) for call in route.calls]
+    assert [data["nome"] for data in sent] == [["Ana"], ["Bia"]]
+    assert [data["csrf"] for data in sent] == [["token2"], ["token3"]]
+    assert sent[-1]["__VIEWSTATE"] == ["vs&3"]
+    assert sent[-1]["origem"] == ["site"]
+
+
+@pytest.mark.respx(base_url="https://foo.bar")
+async def test_template_detecta_hidden_com_valor(killer, respx_mock):
+    respx_mock.get("/form").mock(side_effect=pages())
+    page = await killer.get("https://foo.bar/form")
+    template = page.forms[1].compile()
+    assert set(template.dynamic) == {"csrf", "__VIEWSTATE", "origem"}
+    assert template.url == "https://foo.bar/cadastro"
+    assert template.refresh(PAGE.format(csrf="novo", viewstate="x"))["csrf"] == "novo"
+    # Sem o form na pagina o valor anterior é mantido.
+    assert template.refresh("<html></html>") == {}
+    assert template.values["csrf"] == "novo"